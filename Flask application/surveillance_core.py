@@ -4,24 +4,83 @@ import time
 import logging
 from datetime import datetime
 import os
-from detector import ObjectDetector
+import numpy as np
+from detector import ObjectDetector, detection_centers, empty_detections, merge_rois, zone_rois
 from alert_system import AlertSystem
 from database import DatabaseManager
+from video_sources import create_video_source
+from batch_collector import BatchCollector
+from motion_engine import MotionDetector
+from rate_policy import InferenceRatePolicy
+from zone_index import ZoneIndex
+from tracker import ObjectTracker
+from detection_cache import DetectionCache
+from inference_executor import InferenceExecutor
 
 class SurveillanceCore:
-    def __init__(self, config):
+    def __init__(self, config, camera_id='default', source=None, detector=None, batch_collector=None):
         self.config = config
-        self.detector = ObjectDetector(config.MODEL_PATH, config.CONFIDENCE_THRESHOLD)
+        self.camera_id = camera_id
+        self.source = source if source is not None else config.CAMERA_INDEX
+        
+        # Cores for several cameras can share one detector and batch collector
+        self.detector = detector or create_detector(config)
+        self.batch_collector = batch_collector
         self.alert_system = AlertSystem(config)
-        self.db_manager = DatabaseManager(config.DATABASE_PATH)
+        self.db_manager = DatabaseManager(config.DATABASE_PATH,
+                                          write_behind=getattr(config, 'DATABASE_WRITE_BEHIND', None))
         
         self.cap = None
         self.running = False
-        self.current_frame = None
-        self.detections = []
+        self.current_frame = None  # raw frame; overlays are rendered on demand
+        self.current_overlay = None
+        self.frame_seq = 0
+        self.rendered_frame = (-1, None)  # (frame_seq, frame with overlays)
+        self.detections = empty_detections()
         self.alert_count = 0
         self.system_status = "Initializing"
         
+        # Inference scheduling: 'fixed' cadence or gated by MOG2 motion
+        self.inference_mode = getattr(config, 'INFERENCE_MODE', 'fixed')
+        self.rate_policy = None
+        if self.inference_mode == 'motion':
+            self.rate_policy = InferenceRatePolicy(**config.INFERENCE_RATE_POLICY)
+        
+        # Region-of-interest inference around zones and motion blobs
+        self.roi_config = getattr(config, 'ROI_INFERENCE', {'enabled': False})
+        self.roi_enabled = self.roi_config.get('enabled', False)
+        self.zone_roi_cache = {}
+        
+        # Zone bitmask raster, rebuilt when the zones or resolution change
+        self.zone_index = ZoneIndex(config.RESTRICTED_ZONES)
+        
+        # Tracking between detector keyframes; zone state per track id
+        tracker_config = dict(getattr(config, 'TRACKER', {'enabled': False}))
+        self.tracker = ObjectTracker(**tracker_config) if tracker_config.pop('enabled', False) else None
+        self.track_zones = {}
+        
+        # Reuse detections while the scene is unchanged
+        cache_config = dict(getattr(config, 'DETECTION_CACHE', {'enabled': False}))
+        self.detection_cache = DetectionCache(**cache_config) if cache_config.pop('enabled', False) else None
+        
+        # Inference off the capture loop (latest frame wins when it falls behind)
+        self.inference_executor = None
+        if getattr(config, 'INFERENCE_ASYNC', False):
+            self.inference_executor = InferenceExecutor(
+                self._infer, max_queue=getattr(config, 'INFERENCE_QUEUE_SIZE', 1),
+                name=f"inference-{camera_id}"
+            )
+        
+        # MOG2 motion feeds both the rate policy and ROI selection
+        self.motion_detector = None
+        if self.rate_policy or (self.roi_enabled and 'motion' in self.roi_config.get('sources', [])):
+            self.motion_detector = MotionDetector(
+                motion_threshold=0,
+                scale=getattr(config, 'MOTION_SCALE', 1.0),
+                morph_kernel=getattr(config, 'MOTION_MORPH_KERNEL', 3),
+                merge_distance=getattr(config, 'MOTION_MERGE_DISTANCE', 20)
+            )
+        
         # Setup logging
         self.setup_logging()
     
@@ -42,14 +101,15 @@ class SurveillanceCore:
     def initialize_camera(self):
         """Initialize camera/video source"""
         try:
-            self.cap = cv2.VideoCapture(self.config.CAMERA_INDEX)
-            if not self.cap.isOpened():
-                raise Exception("Could not open video source")
-            
-            # Set camera properties
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.config.FRAME_WIDTH)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.config.FRAME_HEIGHT)
-            self.cap.set(cv2.CAP_PROP_FPS, self.config.FPS)
+            # Camera index, stream URL, video file or synthetic source
+            self.cap = create_video_source(
+                self.source,
+                width=self.config.FRAME_WIDTH,
+                height=self.config.FRAME_HEIGHT,
+                fps=self.config.FPS
+            )
+            if not self.cap.open():
+                raise Exception(f"Could not open video source: {self.cap.describe()}")
             
             self.system_status = "Camera Ready"
             logging.info("Camera initialized successfully")
@@ -62,12 +122,21 @@ class SurveillanceCore:
     
     def start_surveillance(self):
         """Start the surveillance system"""
+        if self.detector.load_error:
+            # Without a model every frame would silently yield no detections
+            self.system_status = f"Model Error: {self.detector.load_error}"
+            logging.error(f"Not starting surveillance, model failed to load: {self.detector.load_error}")
+            return False
+        
         if not self.initialize_camera():
             return False
         
         self.running = True
         self.system_status = "Active"
         
+        if self.inference_executor:
+            self.inference_executor.start()
+        
         # Start surveillance thread
         surveillance_thread = threading.Thread(target=self._surveillance_loop)
         surveillance_thread.daemon = True
@@ -81,9 +150,15 @@ class SurveillanceCore:
         self.running = False
         self.system_status = "Stopped"
         
+        if self.inference_executor:
+            self.inference_executor.stop()
+        
         if self.cap:
             self.cap.release()
         
+        # Write alerts still queued for the database
+        self.db_manager.flush()
+        
         logging.info("Surveillance system stopped")
     
     def _surveillance_loop(self):
@@ -95,33 +170,50 @@ class SurveillanceCore:
             try:
                 ret, frame = self.cap.read()
                 if not ret:
+                    if self.cap.finished:
+                        logging.info(f"Video source finished: {self.cap.describe()}")
+                        self.stop_surveillance()
+                        break
                     logging.warning("Failed to read frame from camera")
                     continue
                 
                 frame_count += 1
+                captured_at = time.time()
+                
+                motion_blobs = self.motion_detector.detect(frame) if self.motion_detector else []
                 
-                # Process every nth frame for better performance
-                if frame_count % 3 == 0:  # Process every 3rd frame
-                    # Detect objects
-                    detections = self.detector.detect_objects(frame)
-                    human_detections = self.detector.filter_human_detections(detections)
-                    
-                    # Check for intrusions in restricted zones
-                    self._check_zone_intrusions(human_detections, frame.shape)
-                    
-                    # Store current detections
-                    self.detections = human_detections
+                if self.tracker:
+                    # Predict track positions for frames without inference
+                    self.detections = self.tracker.predict()
                 
-                # Draw annotations
-                annotated_frame = self.detector.draw_detections(
-                    frame, self.detections, self.config.RESTRICTED_ZONES
-                )
+                if self._should_run_inference(motion_blobs, frame_count):
+                    if self.inference_executor:
+                        # Hand the frame to the executor and keep capturing
+                        self.inference_executor.submit(frame_count, frame, motion_blobs, captured_at)
+                    else:
+                        self._apply_detections(self._infer(frame, motion_blobs), frame.shape)
                 
-                # Add system info overlay
-                self._add_system_overlay(annotated_frame)
+                if self.inference_executor:
+                    # Results finished since the last frame, in frame order; each
+                    # belongs to an older frame than the one just captured
+                    for result in self.inference_executor.poll():
+                        self._apply_detections(result['detections'], result['frame_shape'],
+                                               frame_count - result['seq'], result['timestamp'])
                 
-                # Store current frame for web streaming
-                self.current_frame = annotated_frame
+                if self.tracker:
+                    # Zone entry/exit per tracked person
+                    self._update_track_zones(self.detections, frame.shape)
+                
+                # Store the raw frame and its overlay metadata for web streaming;
+                # boxes, zones and counters are only drawn when a viewer asks
+                self.current_overlay = {
+                    'detections': self.detections,
+                    'status': self.system_status,
+                    'alert_count': self.alert_count,
+                    'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                }
+                self.current_frame = frame
+                self.frame_seq = frame_count
                 
                 # Calculate and display FPS
                 if frame_count % 30 == 0:
@@ -130,72 +222,292 @@ class SurveillanceCore:
                     start_time = time.time()
                     logging.debug(f"Processing FPS: {fps:.1f}")
                 
-                # Small delay to prevent CPU overload
-                time.sleep(0.033)  # ~30 FPS
-                
             except Exception as e:
                 logging.error(f"Error in surveillance loop: {str(e)}")
                 time.sleep(1)
     
+    def _should_run_inference(self, motion_blobs, frame_count):
+        """Decide whether to run the object detector on this frame"""
+        if self.rate_policy is None:
+            # Process every nth frame for better performance
+            return frame_count % self.config.FIXED_INFERENCE_INTERVAL == 0
+        
+        # Cheap MOG2 foreground area drives the inference rate
+        motion_area = sum(blob['area'] for blob in motion_blobs)
+        return self.rate_policy.should_infer(motion_area)
+    
+    def _infer(self, frame, motion_blobs):
+        """Detect humans in a frame (runs on the executor thread when async)"""
+        # Detect objects (or reuse them for an unchanged scene)
+        detections = self._detect_cached(frame, motion_blobs)
+        return self.detector.filter_human_detections(detections)
+    
+    def _apply_detections(self, human_detections, frame_shape, frames_ago=0, timestamp=None):
+        """Feed an inference result into tracking, zone checks and the rate policy
+        
+        `frames_ago` and `timestamp` place a late (asynchronous) result at the
+        frame it was computed on.
+        """
+        if self.tracker:
+            self.detections = self.tracker.update(human_detections, frames_ago)
+        else:
+            # Check for intrusions in restricted zones
+            self._check_zone_intrusions(human_detections, frame_shape)
+            self.detections = human_detections
+        
+        if self.rate_policy:
+            self.rate_policy.notify_detections(len(human_detections), timestamp)
+    
+    def _detect_cached(self, frame, motion_blobs):
+        """Run the detector unless the scene matches the last inferred frame"""
+        if self.detection_cache is None:
+            return self._run_detector(frame, motion_blobs)
+        
+        fingerprint = self.detection_cache.fingerprint(frame)
+        detections = self.detection_cache.lookup(fingerprint)
+        if detections is None:
+            detections = self._run_detector(frame, motion_blobs)
+            if self.detector.is_ready():
+                self.detection_cache.store(fingerprint, detections)
+        return detections
+    
+    def _run_detector(self, frame, motion_blobs):
+        """Run the detector on the full frame or on the regions of interest"""
+        detect_batch = None
+        if self.batch_collector:
+            # Batched with other cameras when the detector is shared
+            detect_batch = lambda frames, imgsz=None: [
+                future.result() for future in
+                [self.batch_collector.submit(f, self.camera_id, imgsz) for f in frames]]
+        
+        if self.roi_enabled:
+            rois = merge_rois(self._roi_rects(frame.shape, motion_blobs), frame.shape,
+                              self.roi_config.get('padding', 32))
+            return self.detector.detect_objects_roi(
+                frame, rois, self.roi_config.get('max_coverage', 0.6), detect_batch
+            )
+        
+        if detect_batch:
+            return detect_batch([frame])[0]
+        return self.detector.detect_objects(frame)
+    
+    def _roi_rects(self, frame_shape, motion_blobs):
+        """Collect candidate regions from the restricted zones and motion blobs"""
+        sources = self.roi_config.get('sources', ['motion'])
+        rects = []
+        
+        if 'zones' in sources:
+            # Zone rectangles only change with the resolution
+            key = frame_shape[:2]
+            if key not in self.zone_roi_cache:
+                self.zone_roi_cache[key] = zone_rois(self.config.RESTRICTED_ZONES, frame_shape)
+            rects.extend(self.zone_roi_cache[key])
+        
+        if 'motion' in sources:
+            min_area = self.roi_config.get('min_motion_area', 200)
+            rects.extend((x, y, x + w, y + h) for blob in motion_blobs if blob['area'] >= min_area
+                         for x, y, w, h in [blob['bbox']])
+        
+        return rects
+    
     def _check_zone_intrusions(self, human_detections, frame_shape):
         """Check for human intrusions in restricted zones"""
-        for detection in human_detections:
-            for zone in self.config.RESTRICTED_ZONES:
-                if self.detector.is_in_zone(detection['bbox'], zone['coords'], frame_shape):
-                    # Trigger alert
-                    self.alert_system.trigger_alert(
-                        alert_type="Human Intrusion",
-                        zone_name=zone['name'],
-                        confidence=detection['confidence'] * 100,
-                        coordinates=detection['bbox'],
-                        cap=self.cap
-                    )
-                    
-                    # Log to database
-                    self.db_manager.add_alert(
-                        alert_type="Human Intrusion",
-                        confidence=detection['confidence'],
-                        zone_name=zone['name'],
-                        coordinates=detection['bbox']
-                    )
-                    
-                    self.alert_count += 1
-                    
-                    logging.warning(f"INTRUSION DETECTED in {zone['name']} - Confidence: {detection['confidence']:.2f}")
-    
-    def _add_system_overlay(self, frame):
+        if len(human_detections) == 0:
+            return
+        
+        # Classify all detection centers against every zone in one lookup
+        self.zone_index.set_zones(self.config.RESTRICTED_ZONES)
+        membership = self.zone_index.membership(detection_centers(human_detections), frame_shape)
+        for zone_idx, zone in enumerate(self.zone_index.zones):
+            inside = membership[:, zone_idx]
+            for bbox, confidence in zip(human_detections['bbox'][inside].tolist(),
+                                        human_detections['confidence'][inside].tolist()):
+                self._raise_intrusion(zone, bbox, confidence)
+    
+    def _update_track_zones(self, tracks, frame_shape):
+        """Raise an intrusion once when a track enters a zone and log when it leaves"""
+        self.zone_index.set_zones(self.config.RESTRICTED_ZONES)
+        zones = self.zone_index.zones
+        membership = self.zone_index.membership(detection_centers(tracks), frame_shape)
+        
+        # Keep the zone state of tracks that are alive but missed on this keyframe
+        active_ids = self.tracker.active_ids()
+        track_zones = {track_id: inside for track_id, inside in self.track_zones.items()
+                       if track_id in active_ids}
+        
+        for row, (track_id, bbox, confidence) in enumerate(zip(tracks['track_id'].tolist(),
+                                                               tracks['bbox'].tolist(),
+                                                               tracks['confidence'].tolist())):
+            inside = set(np.flatnonzero(membership[row]).tolist())
+            previous = track_zones.get(track_id, set())
+            for zone_idx in sorted(inside - previous):
+                self._raise_intrusion(zones[zone_idx], bbox, confidence, track_id)
+            for zone_idx in sorted(previous - inside):
+                if zone_idx < len(zones):
+                    logging.info(f"Track #{track_id} left {zones[zone_idx]['name']}")
+            track_zones[track_id] = inside
+        
+        self.track_zones = track_zones
+    
+    def _raise_intrusion(self, zone, bbox, confidence, track_id=None):
+        """Alert, log and record one human intrusion"""
+        # Trigger alert
+        self.alert_system.trigger_alert(
+            alert_type="Human Intrusion",
+            zone_name=zone['name'],
+            confidence=confidence * 100,
+            coordinates=bbox,
+            cap=self.cap
+        )
+        
+        # Log to database
+        self.db_manager.add_alert(
+            alert_type="Human Intrusion",
+            confidence=confidence,
+            zone_name=zone['name'],
+            coordinates=bbox
+        )
+        
+        self.alert_count += 1
+        
+        track = f" (track #{track_id})" if track_id is not None else ""
+        logging.warning(f"INTRUSION DETECTED in {zone['name']}{track} - Confidence: {confidence:.2f}")
+    
+    def _add_system_overlay(self, frame, overlay):
         """Add system information overlay to frame"""
         height, width = frame.shape[:2]
         
         # System status
-        status_color = (0, 255, 0) if self.system_status == "Active" else (0, 0, 255)
-        cv2.putText(frame, f"Status: {self.system_status}", (10, 30),
+        status_color = (0, 255, 0) if overlay['status'] == "Active" else (0, 0, 255)
+        cv2.putText(frame, f"Status: {overlay['status']}", (10, 30),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, status_color, 2)
         
         # Timestamp
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        cv2.putText(frame, timestamp, (10, height - 20),
+        cv2.putText(frame, overlay['timestamp'], (10, height - 20),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
         
         # Detection count
-        detection_count = len(self.detections)
+        detection_count = len(overlay['detections'])
         cv2.putText(frame, f"Detections: {detection_count}", (10, 60),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
         
         # Alert count
-        cv2.putText(frame, f"Alerts: {self.alert_count}", (10, 90),
+        cv2.putText(frame, f"Alerts: {overlay['alert_count']}", (10, 90),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
     
-    def get_current_frame(self):
-        """Get current processed frame for web streaming"""
-        return self.current_frame
+    def get_current_frame(self, overlay=True):
+        """Get current frame for web streaming, with overlays rendered once per frame"""
+        frame, metadata, seq = self.current_frame, self.current_overlay, self.frame_seq
+        if not overlay or frame is None:
+            return frame
+        
+        rendered_seq, rendered = self.rendered_frame
+        if rendered_seq != seq:
+            # draw_detections draws into a copy, the raw frame stays untouched
+            rendered = self.detector.draw_detections(frame, metadata['detections'], self.config.RESTRICTED_ZONES)
+            self._add_system_overlay(rendered, metadata)
+            self.rendered_frame = (seq, rendered)
+        return rendered
+    
+    def get_overlay(self):
+        """Overlay metadata of the current frame (boxes, labels, zones) for client-side rendering"""
+        metadata = self.current_overlay
+        if metadata is None:
+            return None
+        height, width = self.current_frame.shape[:2]
+        return {
+            'seq': self.frame_seq,
+            'width': width,
+            'height': height,
+            'boxes': self.detector.describe_detections(metadata['detections']),
+            'zones': [{'name': zone['name'], 'coords': zone['coords']} for zone in self.config.RESTRICTED_ZONES],
+            'status': metadata['status'],
+            'alert_count': metadata['alert_count'],
+            'timestamp': metadata['timestamp']
+        }
     
     def get_system_status(self):
         """Get current system status"""
-        return {
+        if self.detector.load_error:
+            self.system_status = f"Model Error: {self.detector.load_error}"
+        
+        status = {
+            'camera_id': self.camera_id,
             'status': self.system_status,
             'running': self.running,
+            'ready': self.detector.load_error is None and self.detector.is_ready(),
             'alert_count': self.alert_count,
             'detection_count': len(self.detections),
+            'model_ready': self.detector.is_ready(),
+            'model_error': self.detector.load_error,
             'timestamp': datetime.now().isoformat()
-        }
\ No newline at end of file
+        }
+        if self.batch_collector:
+            status['batching'] = self.batch_collector.get_stats()
+        if self.rate_policy:
+            status['inference_policy'] = self.rate_policy.get_stats()
+        if self.tracker:
+            status['active_tracks'] = len(self.tracker)
+        if self.detection_cache:
+            status['detection_cache'] = self.detection_cache.get_stats()
+        if self.inference_executor:
+            status['inference'] = self.inference_executor.get_stats()
+        if self.db_manager.writer:
+            status['database'] = self.db_manager.get_writer_stats()
+        return status
+
+
+def create_detector(config):
+    """Create the ObjectDetector for the configured inference backend"""
+    return ObjectDetector(
+        config.MODEL_PATH,
+        config.CONFIDENCE_THRESHOLD,
+        backend=getattr(config, 'INFERENCE_BACKEND', 'ultralytics'),
+        int8=getattr(config, 'INFERENCE_INT8', False),
+        num_threads=getattr(config, 'INFERENCE_THREADS', 0),
+        warmup_shape=(config.FRAME_HEIGHT, config.FRAME_WIDTH),
+        load_async=getattr(config, 'MODEL_LOAD_ASYNC', False)
+    )
+
+
+def create_multi_camera_cores(config, detector=None):
+    """Create one SurveillanceCore per entry in config.CAMERA_SOURCES
+    
+    All cores share a single ObjectDetector (`detector`, or one built from
+    the config) and a BatchCollector, so frames from different cameras are
+    run through the model together. Start them with start_multi_camera_cores
+    and stop them with stop_multi_camera_cores, which also stops the
+    collector thread.
+    """
+    detector = detector or create_detector(config)
+    batch_collector = BatchCollector(
+        detector,
+        max_batch_size=config.INFERENCE_BATCH_SIZE,
+        max_wait=config.INFERENCE_BATCH_WAIT
+    )
+    
+    cores = {}
+    for i, entry in enumerate(config.CAMERA_SOURCES or [config.CAMERA_INDEX]):
+        if not isinstance(entry, dict):
+            entry = {'source': entry}
+        camera_id = str(entry.get('id', f"cam{i}"))
+        cores[camera_id] = SurveillanceCore(
+            config, camera_id=camera_id, source=entry.get('source'),
+            detector=detector, batch_collector=batch_collector
+        )
+    return cores
+
+
+def start_multi_camera_cores(cores):
+    """Start surveillance on every core; returns the ids of those that started"""
+    return [camera_id for camera_id, core in cores.items() if core.start_surveillance()]
+
+
+def stop_multi_camera_cores(cores):
+    """Stop every core, then the batch collectors they share"""
+    for core in cores.values():
+        core.stop_surveillance()
+    collectors = {id(core.batch_collector): core.batch_collector
+                  for core in cores.values() if core.batch_collector}
+    for batch_collector in collectors.values():
+        batch_collector.stop()
@@ -1,17 +1,27 @@
 from flask import Flask, render_template, jsonify, Response, flash, redirect, url_for, request
-import cv2
+import functools
 import json
 from datetime import datetime, timedelta
 import threading
 import time
-# Import the fixed surveillance system
-from surveillance_core import SurveillanceCore  # Make sure this imports your updated class
+from config import Config
+from startup import BackgroundLoader
+from event_bus import EventBus, format_sse
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'
 
 # Initialize surveillance system
-config = {}
-surveillance = SurveillanceCore(config)
+config = {
+    'camera_sources': Config.CAMERA_SOURCES,
+    'frame_buffer_size': Config.FRAME_BUFFER_SIZE,
+    'camera_probe_cache': Config.CAMERA_PROBE_CACHE,
+    'camera_probe_timeout': Config.CAMERA_PROBE_TIMEOUT,
+    'camera_ready_timeout': Config.CAMERA_READY_TIMEOUT,
+    'execution_mode': Config.EXECUTION_MODE,
+    'motion_scale': Config.MOTION_SCALE,
+    'motion_morph_kernel': Config.MOTION_MORPH_KERNEL,
+    'motion_merge_distance': Config.MOTION_MERGE_DISTANCE
+}
 
 # Storage for live detection data
 live_detections = []
@@ -22,6 +32,10 @@ live_stats = {
     'zone_activity_count': 0
 }
 
+# Pushes detections and status changes to /events subscribers
+event_bus = EventBus(tick=Config.EVENTS_TICK, history=Config.EVENTS_HISTORY,
+                     max_lag=Config.EVENTS_MAX_LAG)
+
 def detection_callback(detection_data):
     """Callback function to receive live detection data"""
     global live_detections, live_stats
@@ -31,8 +45,10 @@ def detection_callback(detection_data):
         'time': datetime.now().strftime('%H:%M:%S'),
         'type': detection_data.get('type', 'Unknown'),
         'zone': detection_data.get('zone', 'Unknown'),
+        'camera': detection_data.get('camera', 'default'),
         'severity': detection_data.get('severity', 'Low'),
         'confidence': detection_data.get('confidence', 0),
+        'regions': detection_data.get('regions', 1),
         'timestamp': datetime.now().isoformat()
     }
     
@@ -44,7 +60,9 @@ def detection_callback(detection_data):
     
     # Update live stats
     live_stats['alerts_today'] += 1
-    print(f"🔔 New detection: {detection_entry['type']} in {detection_entry['zone']}")
+    event_bus.publish('detections', detection_entry)
+    event_bus.publish('stats', dict(live_stats))
+    print(f"🔔 New detection: {detection_entry['type']} in {detection_entry['zone']} ({detection_entry['camera']})")
 
 def update_stats_periodically():
     """Update statistics periodically"""
@@ -69,27 +87,83 @@ def update_stats_periodically():
                     most_common_zone = max(set(zones), key=zones.count)
                     live_stats['most_active_zone'] = most_common_zone
                     live_stats['zone_activity_count'] = zones.count(most_common_zone)
+                event_bus.publish('stats', dict(live_stats))
             
         except Exception as e:
             print(f"❌ Error updating stats: {e}")
         
         time.sleep(30)
 
-# Start stats update thread
-stats_thread = threading.Thread(target=update_stats_periodically, daemon=True)
-stats_thread.start()
+def create_surveillance():
+    """Import and build the surveillance system (runs in the background loader)"""
+    global stream_hub
+    
+    # Heavy imports (OpenCV, NumPy, capture/detection modules) are deferred to here
+    from surveillance_core import SurveillanceCore
+    from stream_hub import StreamHub
+    surveillance = SurveillanceCore(config)
+    surveillance.set_detection_callback(detection_callback)
+    
+    # Encodes each processed frame once for all /video_feed viewers
+    stream_hub = StreamHub(surveillance, default_quality=Config.STREAM_JPEG_QUALITY,
+                           max_variants=Config.STREAM_MAX_VARIANTS)
+    return surveillance
+
+stream_hub = None
+stats_thread = None
+services_lock = threading.Lock()
+
+# Loads the surveillance system in the background so the web UI is reachable immediately
+surveillance_loader = BackgroundLoader('Surveillance system', create_surveillance)
+
+def start_services():
+    """Start the event bus, the stats thread and the background surveillance loader
+    
+    Nothing is started at import time: worker processes of the 'processes'
+    execution mode re-import the main module when they are spawned.
+    Safe to call more than once.
+    """
+    global stats_thread
+    with services_lock:
+        if stats_thread is not None:
+            return
+        event_bus.start()
+        stats_thread = threading.Thread(target=update_stats_periodically, daemon=True)
+        stats_thread.start()
+        surveillance_loader.start()
+
+@app.before_request
+def ensure_services_started():
+    """Start the services on the first request when served by an external WSGI server"""
+    start_services()
+
+def get_surveillance(timeout=0):
+    """Get the surveillance system, or None while it is still loading"""
+    return surveillance_loader.get(timeout)
+
+def not_ready_response():
+    """503 response for endpoints that need the surveillance system"""
+    return jsonify({'error': 'Surveillance system is starting', 'startup': surveillance_loader.status()}), 503
 
 @app.route('/')
 def index():
-    system_status = surveillance.get_system_status()
+    surveillance = get_surveillance()
+    system_status = surveillance.get_system_status() if surveillance else {'running': False, 'ready': False}
     return render_template('index.html', stats=live_stats, system_status=system_status)
 
 @app.route('/start_surveillance', methods=['POST'])
 def start_surveillance():
     try:
+        surveillance = get_surveillance(timeout=Config.STARTUP_WAIT_TIMEOUT)
+        if surveillance is None:
+            flash('Surveillance system is still loading, please try again shortly.', 'error')
+            return redirect(url_for('index'))
+        
         # Set the detection callback before starting
         surveillance.set_detection_callback(detection_callback)
         success = surveillance.start_surveillance()
+        stream_hub.reset()
+        event_bus.publish('status', build_status())
         if success:
             flash('Surveillance system started successfully!', 'success')
         else:
@@ -102,7 +176,12 @@ def start_surveillance():
 @app.route('/stop_surveillance', methods=['POST'])
 def stop_surveillance():
     try:
+        surveillance = get_surveillance()
+        if surveillance is None:
+            flash('Surveillance system is not running.', 'error')
+            return redirect(url_for('index'))
         surveillance.stop_surveillance()
+        event_bus.publish('status', build_status())
         flash('Surveillance system stopped successfully!', 'success')
     except Exception as e:
         flash(f'Error stopping surveillance: {str(e)}', 'error')
@@ -122,72 +201,187 @@ def test_camera():
     except Exception as e:
         return jsonify({'status': 'error', 'message': f'Camera test error: {str(e)}'})
 
-@app.route('/status')
-def get_status():
+def build_status():
+    """System status for /status (shared with the ASGI server)"""
     try:
-        status = surveillance.get_system_status()
+        # Readiness is reported even while the system is still loading
+        surveillance = get_surveillance()
+        status = surveillance.get_system_status() if surveillance else {'running': False}
         status.update({
+            'ready': surveillance_loader.ready,
+            'startup': surveillance_loader.status(),
             'current_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             'detection_count': len(live_detections),
             'alert_count': live_stats['alerts_today'],
             'last_detection': live_detections[0] if live_detections else None
         })
-        return jsonify(status)
+        if stream_hub:
+            status['streaming'] = stream_hub.get_stats()
+        status['events'] = event_bus.get_stats()
+        return status
     except Exception as e:
-        return jsonify({'error': str(e), 'running': False})
+        return {'error': str(e), 'running': False}
+
+@app.route('/status')
+def get_status():
+    return jsonify(build_status())
+
+def parse_event_cursor(value):
+    """Event id a client resumes after (Last-Event-ID), None to start from now"""
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+def generate_events(cursor=None):
+    """Generate the Server-Sent Events stream of one subscriber
+    
+    Each message is a batch of the detections, stats and status published
+    during one event bus tick. An idle stream gets a keepalive comment every
+    EVENTS_KEEPALIVE seconds.
+    """
+    if cursor is None:
+        cursor = event_bus.last_id
+    yield 'retry: 2000\n\n'
+    while True:
+        events = event_bus.read(cursor, timeout=Config.EVENTS_KEEPALIVE)
+        if not events:
+            yield ': keepalive\n\n'
+            continue
+        for event_id, event, data in events:
+            yield format_sse(event_id, event, data)
+            cursor = event_id
+
+@app.route('/events')
+def events():
+    """Server-push channel for detections and status (replaces polling)"""
+    cursor = parse_event_cursor(request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+    return Response(generate_events(cursor), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/recent_alerts')
 def get_recent_alerts():
     return jsonify(live_detections[:10])
 
-def generate_frames():
-    """Generate frames for video streaming with error handling"""
+def mjpeg_part(jpeg):
+    """Wrap JPEG bytes as one part of the multipart MJPEG stream"""
+    return b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n'
+
+@functools.lru_cache(maxsize=16)
+def encoded_placeholder(kind, message=None):
+    """Placeholder/error frame, built and JPEG-encoded once and then reused"""
+    import cv2
+    frame = create_no_camera_frame() if kind == 'no_camera' else create_error_frame(message)
+    ret, buffer = cv2.imencode('.jpg', frame)
+    return buffer.tobytes()
+
+def parse_stream_options(args):
+    """Read the profile/width/height/quality/fps query parameters of /video_feed
+    
+    Returns None for profile=auto (picked per client while streaming).
+    Raises ValueError for an unknown profile or a malformed value.
+    """
+    profile = args.get('profile')
+    if profile == 'auto':
+        return None
+    if profile is not None and profile not in Config.STREAM_PROFILES:
+        raise ValueError(f"Unknown stream profile: {profile}")
+    
+    options = dict(Config.STREAM_PROFILES[profile or 'full'])
+    for key, cast, low, high in (('width', int, 16, 4096), ('height', int, 16, 4096),
+                                 ('quality', int, 10, 95), ('fps', float, 0.5, 60)):
+        value = args.get(key)
+        if value is not None:
+            options[key] = min(max(cast(value), low), high)
+    return options
+
+def wants_overlay(args):
+    """Whether a /video_feed client wants overlays burned into the frames (overlay=0 for raw video)"""
+    return args.get('overlay', '1').lower() not in ('0', 'false', 'no', 'off')
+
+def generate_frames(surveillance, camera_id=None, options=None, overlay=True):
+    """Generate frames for video streaming with error handling
+    
+    Only frames with a new sequence number are sent. Placeholder and error
+    frames are sent once when the state changes and then repeated only every
+    STREAM_KEEPALIVE seconds, so idle viewers cost next to nothing.
+    
+    `options` (width, height, quality, fps) picks the variant this client
+    gets; None adapts the profile to how fast the client takes the frames.
+    With `overlay` the boxes and status text are rendered into the frames;
+    otherwise the raw video is sent and /overlay has the metadata.
+    """
     consecutive_failures = 0
     max_failures = 10
+    last_seq = -1
+    placeholder = None  # placeholder currently shown instead of live video
+    last_sent = 0
+    adaptive = None
+    if options is None:
+        from stream_hub import AdaptiveProfile
+        adaptive = AdaptiveProfile(Config.STREAM_AUTO_LADDER, congested=Config.STREAM_AUTO_CONGESTED)
     
-    while True:
-        try:
-            if not surveillance.is_running():
-                # Show "No Camera" message
-                blank_frame = create_no_camera_frame()
-                ret, buffer = cv2.imencode('.jpg', blank_frame)
-                if ret:
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
-                time.sleep(0.5)
-                continue
-            
-            frame = surveillance.get_processed_frame()
-            if frame is not None:
-                # Reset failure counter on success
-                consecutive_failures = 0
+    stream_hub.add_viewer(camera_id)
+    try:
+        while True:
+            try:
+                if not surveillance.is_camera_running(camera_id):
+                    # Show "No Camera" message
+                    if placeholder != 'no_camera' or time.time() - last_sent >= Config.STREAM_KEEPALIVE:
+                        yield mjpeg_part(encoded_placeholder('no_camera'))
+                        placeholder, last_sent = 'no_camera', time.time()
+                    time.sleep(0.5)
+                    last_seq = -1
+                    continue
+                
+                if adaptive:
+                    options = Config.STREAM_PROFILES[adaptive.profile]
                 
-                ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-                if ret:
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
+                # Frame rate cap: frames published meanwhile are skipped
+                if options['fps'] and placeholder is None:
+                    wait = last_sent + 1.0 / options['fps'] - time.time()
+                    if wait > 0:
+                        time.sleep(wait)
+                
+                # Wake up as soon as detection publishes a new frame; the hub
+                # encodes it once per variant for all viewers and slow viewers
+                # skip ahead
+                packet = stream_hub.next_frame(camera_id, last_seq, quality=options['quality'],
+                                               width=options['width'], height=options['height'],
+                                               overlay=overlay, timeout=0.5)
+                if packet is not None:
+                    last_seq, jpeg = packet
+                    if jpeg is None:
+                        # Overwritten before it could be encoded; wait for the next one
+                        continue
+                    # Reset failure counter on success
+                    consecutive_failures = 0
+                    send_start = time.time()
+                    yield mjpeg_part(jpeg)
+                    placeholder, last_sent = None, time.time()
+                    if adaptive:
+                        adaptive.record_send(last_sent - send_start, last_sent)
                 else:
                     consecutive_failures += 1
-            else:
+                    
+                # If too many consecutive failures, show error frame
+                if consecutive_failures > max_failures:
+                    if placeholder != 'error' or time.time() - last_sent >= Config.STREAM_KEEPALIVE:
+                        yield mjpeg_part(encoded_placeholder('error', "Camera Connection Lost"))
+                        placeholder, last_sent = 'error', time.time()
+                    
+            except Exception as e:
+                print(f"❌ Frame generation error: {e}")
                 consecutive_failures += 1
-                
-            # If too many consecutive failures, show error frame
-            if consecutive_failures > max_failures:
-                error_frame = create_error_frame("Camera Connection Lost")
-                ret, buffer = cv2.imencode('.jpg', error_frame)
-                if ret:
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + buffer.tobytes() + b'\r\n')
-                consecutive_failures = 0  # Reset to prevent spam
-                
-        except Exception as e:
-            print(f"❌ Frame generation error: {e}")
-            consecutive_failures += 1
-            
-        time.sleep(0.033)  # ~30 FPS
+                time.sleep(0.1)
+    finally:
+        # Client disconnected
+        stream_hub.remove_viewer(camera_id)
 
 def create_no_camera_frame():
     """Create a frame showing 'No Camera' message"""
+    import cv2
+    import numpy as np
     frame = np.zeros((480, 640, 3), dtype=np.uint8)
     text = "No Camera Connected"
     font = cv2.FONT_HERSHEY_SIMPLEX
@@ -207,6 +401,8 @@ def create_no_camera_frame():
 
 def create_error_frame(error_msg):
     """Create a frame showing error message"""
+    import cv2
+    import numpy as np
     frame = np.zeros((480, 640, 3), dtype=np.uint8)
     font = cv2.FONT_HERSHEY_SIMPLEX
     text_size = cv2.getTextSize(error_msg, font, 1, 2)[0]
@@ -215,26 +411,56 @@ def create_error_frame(error_msg):
     cv2.putText(frame, error_msg, (text_x, text_y), font, 1, (0, 0, 255), 2)
     return frame
 
-# Add numpy import for frame creation
-import numpy as np
-
 @app.route('/video_feed')
-def video_feed():
+@app.route('/video_feed/<camera_id>')
+def video_feed(camera_id=None):
     """Video streaming route"""
-    return Response(generate_frames(),
+    surveillance = get_surveillance()
+    if surveillance is None:
+        return not_ready_response()
+    camera_id = camera_id or request.args.get('camera')
+    if camera_id is not None and camera_id not in surveillance.get_camera_ids():
+        return jsonify({'error': f'Unknown camera: {camera_id}'}), 404
+    try:
+        options = parse_stream_options(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return Response(generate_frames(surveillance, camera_id, options, wants_overlay(request.args)),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
+@app.route('/overlay')
+@app.route('/overlay/<camera_id>')
+def overlay(camera_id=None):
+    """Overlay metadata (boxes, labels, status) of the latest frame for client-side rendering"""
+    surveillance = get_surveillance()
+    if surveillance is None:
+        return not_ready_response()
+    camera_id = camera_id or request.args.get('camera')
+    if camera_id is not None and camera_id not in surveillance.get_camera_ids():
+        return jsonify({'error': f'Unknown camera: {camera_id}'}), 404
+    return jsonify(surveillance.get_overlay(camera_id))
+
+@app.route('/cameras')
+def cameras():
+    """Per-camera health and FPS state"""
+    surveillance = get_surveillance()
+    if surveillance is None:
+        return not_ready_response()
+    return jsonify(surveillance.camera_manager.get_health())
+
 @app.route('/logs')
 def logs():
     """Logs page with live detection data"""
     log_entries = []
+    surveillance = get_surveillance()
+    running = surveillance is not None and surveillance.is_running()
     
     # Add system logs
     log_entries.append({
         'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'level': 'INFO',
-        'message': f'System Status: {"Running" if surveillance.is_running() else "Stopped"}',
-        'details': f'Camera: {"Connected" if surveillance.is_running() else "Disconnected"}'
+        'message': f'System Status: {"Running" if running else "Stopped" if surveillance else "Starting"}',
+        'details': f'Camera: {"Connected" if running else "Disconnected"}'
     })
     
     # Add detection logs
@@ -286,6 +512,9 @@ def clear_detections():
 @app.route('/debug')
 def debug_info():
     """Debug information page"""
+    surveillance = get_surveillance()
+    if surveillance is None:
+        return not_ready_response()
     debug_data = {
         'surveillance_running': surveillance.is_running(),
         'camera_working': surveillance.camera_debugger.is_camera_working() if hasattr(surveillance, 'camera_debugger') else False,
@@ -319,12 +548,14 @@ if __name__ == '__main__':
     print("Press Ctrl+C to stop the server")
     print("=" * 60)
     
+    start_services()
     try:
         app.run(debug=True, host='0.0.0.0', port=5000, threaded=True)
     except KeyboardInterrupt:
         print("\n🛑 Shutting down surveillance system...")
-        surveillance.stop_surveillance()
     except Exception as e:
         print(f"❌ Error starting server: {e}")
     finally:
-        surveillance.stop_surveillance()
+        surveillance = get_surveillance()
+        if surveillance:
+            surveillance.stop_surveillance()
@@ -0,0 +1,361 @@
+"""Asyncio (ASGI) serving mode for the surveillance web app
+
+    python asgi_server.py [--host 0.0.0.0] [--port 5000]
+
+/video_feed, /events and /status are served natively: each viewer is a
+coroutine that waits for frames from one shared pump per camera (and each
+event subscriber for one shared event bus pump), so open streams no longer
+pin a thread each. Every other route and template is the existing
+Flask app, run through asgiref's WSGI adapter.
+
+At most Config.ASGI_MAX_STREAMS streams are served at once; further
+/video_feed requests get a 503 with Retry-After. Load-test with
+`python benchmark.py --streams N --url http://host:5000/video_feed`.
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+from asgiref.wsgi import WsgiToAsgi
+from config import Config
+from event_bus import format_sse
+import app as web
+from stream_hub import AdaptiveProfile
+
+
+class FrameFeed:
+    """Fan processed frames of one camera out to viewer coroutines
+
+    A single pump task waits for new frames in a worker thread while the
+    camera has viewers; viewers just await the next frame event.
+    """
+
+    def __init__(self, surveillance, camera_id, pump_pool):
+        self.surveillance = surveillance
+        self.camera_id = camera_id
+        self.pump_pool = pump_pool
+        self.seq = -1
+        self.frame = None
+        self.metadata = None
+        self.new_frame = asyncio.Event()
+        self.subscribers = 0
+        self.task = None
+
+    def subscribe(self):
+        self.subscribers += 1
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._pump())
+
+    def unsubscribe(self):
+        self.subscribers -= 1
+
+    async def _pump(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self.subscribers:
+                if not self.surveillance.is_camera_running(self.camera_id):
+                    # Sequence numbers restart with the camera
+                    self.seq, self.frame, self.metadata = -1, None, None
+                    await asyncio.sleep(0.5)
+                    continue
+
+                packet = await loop.run_in_executor(
+                    self.pump_pool, self.surveillance.wait_for_frame_packet, self.camera_id, self.seq, 0.5)
+                if packet is not None:
+                    self.seq, self.frame, self.metadata = packet
+                    event, self.new_frame = self.new_frame, asyncio.Event()
+                    event.set()
+        except Exception as e:
+            print(f"❌ [{self.camera_id}] Frame pump error: {e}")
+        finally:
+            self.task = None
+
+    async def next_frame(self, after_seq, timeout=0.5):
+        """Wait for a frame newer than `after_seq` and get it as (seq, frame, metadata)"""
+        if self.seq <= after_seq:
+            try:
+                await asyncio.wait_for(self.new_frame.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.seq <= after_seq or self.frame is None:
+            return None
+        return self.seq, self.frame, self.metadata
+
+
+class AsgiServer:
+    """ASGI application: native async streaming/status, Flask for the rest"""
+
+    def __init__(self, flask_app, max_streams=100, encode_threads=2):
+        self.flask = WsgiToAsgi(flask_app)
+        self.max_streams = max_streams
+        self.active_streams = 0
+        self.rejected_streams = 0
+        self.feeds = {}
+        self.event_subscribers = 0
+        self.event_pump = None
+        self.new_events = None
+        # One pump thread per streamed camera, a few threads for JPEG encoding
+        self.pump_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix='frame-pump')
+        self.encode_pool = ThreadPoolExecutor(max_workers=encode_threads, thread_name_prefix='jpeg-encode')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+
+        path = scope['path']
+        if scope['type'] == 'http' and path == '/status':
+            return await self.status(send)
+        if scope['type'] == 'http' and path == '/events':
+            return await self.events(scope, receive, send)
+        if scope['type'] == 'http' and (path == '/video_feed' or path.startswith('/video_feed/')):
+            camera_id = path[len('/video_feed/'):] or None
+            return await self.video_feed(scope, receive, send, camera_id)
+        return await self.flask(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                web.start_services()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                surveillance = web.get_surveillance()
+                if surveillance:
+                    surveillance.stop_surveillance()
+                self.pump_pool.shutdown(wait=False)
+                self.encode_pool.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def send_json(send, status, data, headers=()):
+        body = json.dumps(data, default=str).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(len(body)).encode()), *headers]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def status(self, send):
+        status = web.build_status()
+        status['asgi'] = {
+            'streams': self.active_streams,
+            'max_streams': self.max_streams,
+            'rejected_streams': self.rejected_streams
+        }
+        await self.send_json(send, 200, status)
+
+    @staticmethod
+    def watch_disconnect(receive):
+        """Start a task that sets the returned event when the client goes away"""
+        disconnected = asyncio.Event()
+
+        async def watch():
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    disconnected.set()
+                    return
+
+        return disconnected, asyncio.get_running_loop().create_task(watch())
+
+    async def _pump_events(self):
+        loop = asyncio.get_running_loop()
+        last_id = web.event_bus.last_id
+        try:
+            while self.event_subscribers:
+                newest = await loop.run_in_executor(self.pump_pool, web.event_bus.wait, last_id, 0.5)
+                if newest != last_id:
+                    last_id = newest
+                    event, self.new_events = self.new_events, asyncio.Event()
+                    event.set()
+        finally:
+            self.event_pump = None
+
+    async def events(self, scope, receive, send):
+        """Server-push channel for detections and status"""
+        args = dict(parse_qsl(scope.get('query_string', b'').decode()))
+        headers = dict(scope.get('headers', []))
+        cursor = web.parse_event_cursor(headers.get(b'last-event-id', b'').decode() or args.get('last_event_id'))
+        if cursor is None:
+            cursor = web.event_bus.last_id
+
+        disconnected, watcher = self.watch_disconnect(receive)
+        closed = asyncio.get_running_loop().create_task(disconnected.wait())
+        if self.new_events is None:
+            self.new_events = asyncio.Event()
+        self.event_subscribers += 1
+        if self.event_pump is None:
+            self.event_pump = asyncio.get_running_loop().create_task(self._pump_events())
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [(b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'),
+                            (b'x-accel-buffering', b'no')]
+            })
+            await send({'type': 'http.response.body', 'body': b'retry: 2000\n\n', 'more_body': True})
+            while not disconnected.is_set():
+                events = web.event_bus.read(cursor, timeout=0)
+                for event_id, event, data in events:
+                    body = format_sse(event_id, event, data).encode()
+                    await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+                    cursor = event_id
+                if events:
+                    continue
+
+                waiter = asyncio.get_running_loop().create_task(self.new_events.wait())
+                done, _ = await asyncio.wait({waiter, closed}, timeout=Config.EVENTS_KEEPALIVE,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if not done:
+                    await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+        finally:
+            self.event_subscribers -= 1
+            watcher.cancel()
+            closed.cancel()
+
+    def get_feed(self, surveillance, camera_id):
+        camera_id = camera_id or surveillance.default_camera_id()
+        feed = self.feeds.get(camera_id)
+        if feed is None or feed.surveillance is not surveillance:
+            feed = self.feeds[camera_id] = FrameFeed(surveillance, camera_id, self.pump_pool)
+        return feed
+
+    async def video_feed(self, scope, receive, send, camera_id):
+        """Video streaming route"""
+        surveillance = web.get_surveillance()
+        if surveillance is None:
+            return await self.send_json(send, 503, {'error': 'Surveillance system is still loading',
+                                                    'startup': web.surveillance_loader.status()})
+        args = dict(parse_qsl(scope.get('query_string', b'').decode()))
+        camera_id = camera_id or args.get('camera')
+        if camera_id is not None and camera_id not in surveillance.get_camera_ids():
+            return await self.send_json(send, 404, {'error': f'Unknown camera: {camera_id}'})
+        try:
+            options = web.parse_stream_options(args)
+        except ValueError as e:
+            return await self.send_json(send, 400, {'error': str(e)})
+        overlay = web.wants_overlay(args)
+        if self.active_streams >= self.max_streams:
+            self.rejected_streams += 1
+            return await self.send_json(send, 503, {'error': 'Too many video streams', 'limit': self.max_streams},
+                                        headers=[(b'retry-after', b'5')])
+
+        disconnected, watcher = self.watch_disconnect(receive)
+        feed = self.get_feed(surveillance, camera_id)
+        self.active_streams += 1
+        feed.subscribe()
+        web.stream_hub.add_viewer(feed.camera_id)
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [(b'content-type', b'multipart/x-mixed-replace; boundary=frame'),
+                            (b'cache-control', b'no-cache')]
+            })
+            await self.stream_frames(send, surveillance, feed, options, overlay, disconnected)
+        finally:
+            # Client disconnected
+            web.stream_hub.remove_viewer(feed.camera_id)
+            feed.unsubscribe()
+            self.active_streams -= 1
+            watcher.cancel()
+
+    async def stream_frames(self, send, surveillance, feed, options, overlay, disconnected):
+        """Async counterpart of app.generate_frames for one viewer"""
+        loop = asyncio.get_running_loop()
+        consecutive_failures = 0
+        max_failures = 10
+        last_seq = -1
+        placeholder = None  # placeholder currently shown instead of live video
+        last_sent = 0
+        adaptive = None
+        if options is None:
+            adaptive = AdaptiveProfile(Config.STREAM_AUTO_LADDER, congested=Config.STREAM_AUTO_CONGESTED)
+
+        async def send_part(jpeg):
+            await send({'type': 'http.response.body', 'body': web.mjpeg_part(jpeg), 'more_body': True})
+
+        while not disconnected.is_set():
+            try:
+                if not surveillance.is_camera_running(feed.camera_id):
+                    # Show "No Camera" message
+                    if placeholder != 'no_camera' or time.time() - last_sent >= Config.STREAM_KEEPALIVE:
+                        await send_part(web.encoded_placeholder('no_camera'))
+                        placeholder, last_sent = 'no_camera', time.time()
+                    await asyncio.sleep(0.5)
+                    last_seq = -1
+                    continue
+
+                if adaptive:
+                    options = Config.STREAM_PROFILES[adaptive.profile]
+
+                # Frame rate cap: frames published meanwhile are skipped
+                if options['fps'] and placeholder is None:
+                    wait = last_sent + 1.0 / options['fps'] - time.time()
+                    if wait > 0:
+                        await asyncio.sleep(wait)
+
+                packet = await feed.next_frame(last_seq, timeout=0.5)
+                encoded = None
+                if packet is not None:
+                    # The hub encodes each frame once per variant for all viewers;
+                    # only the viewer that finds it not encoded yet uses the pool
+                    seq, frame, metadata = packet
+                    encoded = web.stream_hub.cached(feed.camera_id, seq, options['quality'],
+                                                    options['width'], options['height'], overlay)
+                    if encoded is None:
+                        encoded = await loop.run_in_executor(
+                            self.encode_pool, web.stream_hub.encode, feed.camera_id, seq, frame,
+                            options['quality'], options['width'], options['height'], overlay, metadata)
+                if encoded is not None:
+                    last_seq, jpeg = encoded
+                    if jpeg is None:
+                        # Overwritten before it could be encoded; wait for the next one
+                        continue
+                    # Reset failure counter on success
+                    consecutive_failures = 0
+                    send_start = time.time()
+                    await send_part(jpeg)
+                    placeholder, last_sent = None, time.time()
+                    if adaptive:
+                        adaptive.record_send(last_sent - send_start, last_sent)
+                else:
+                    consecutive_failures += 1
+
+                # If too many consecutive failures, show error frame
+                if consecutive_failures > max_failures:
+                    if placeholder != 'error' or time.time() - last_sent >= Config.STREAM_KEEPALIVE:
+                        await send_part(web.encoded_placeholder('error', "Camera Connection Lost"))
+                        placeholder, last_sent = 'error', time.time()
+
+            except Exception as e:
+                print(f"❌ Frame generation error: {e}")
+                consecutive_failures += 1
+                await asyncio.sleep(0.1)
+
+
+application = AsgiServer(web.app, max_streams=Config.ASGI_MAX_STREAMS, encode_threads=Config.ASGI_ENCODE_THREADS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the surveillance web app with asyncio (ASGI)")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    print("🚀 Starting Smart Surveillance System (ASGI mode)...")
+    print(f"📱 Dashboard: http://localhost:{args.port}")
+    print(f"📺 Up to {Config.ASGI_MAX_STREAMS} concurrent video streams")
+    uvicorn.run(application, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,375 @@
+"""Pipeline throughput benchmark that runs without a camera
+
+Feeds the motion surveillance pipeline from deterministic synthetic sources
+(or a recorded clip replayed at max rate), pushes every frame through capture
+and detection in lockstep and reports time per stage and throughput per
+camera.
+
+    python benchmark.py --cameras 4 --frames 600
+    python benchmark.py --source replay://recordings/lobby.mp4
+
+With --motion-scales it instead compares motion detection accuracy and
+throughput at several downscale factors against the synthetic ground truth:
+
+    python benchmark.py --motion-scales 1,0.5,0.25 --noise 8
+
+With --startup it measures how long the web app takes to import, answer
+/status and finish loading in the background, and fails when the time to
+first response exceeds --max-startup:
+
+    python benchmark.py --startup --max-startup 1.0
+
+With --streams it load-tests a running server by holding N concurrent
+/video_feed connections and reporting frames delivered and 503 rejections
+(see Config.ASGI_MAX_STREAMS):
+
+    python benchmark.py --streams 200 --url http://localhost:5000/video_feed?profile=tile
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import os
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+from motion_engine import MotionDetector
+from surveillance_core import SurveillanceCore
+from video_sources import LockstepSource, SyntheticSource
+
+
+def benchmark_pipeline(sources, timeout=120, execution_mode='threads'):
+    """Run the surveillance pipeline until every finite source is exhausted
+
+    Sources run in lockstep with the benchmark (see LockstepSource): a camera
+    only reads its next frame once the previous one came out of detection, so
+    every sequence number is analyzed and the counts are the same on every
+    run. Per frame, the capture stage is timed from the release of the
+    previous frame to its capture timestamp, and the detection stage from the
+    capture timestamp until the frame is published with its overlays.
+
+    Returns per-camera results with frame counts, stage times and throughput.
+    """
+    # Process mode cameras spawn their workers, so the semaphores must come
+    # from a spawn context to be handed to the capture process
+    semaphore = mp.get_context('spawn').Semaphore if execution_mode == 'processes' else threading.Semaphore
+    camera_ids = [f"cam{i}" for i in range(len(sources))]
+    credits = {camera_id: semaphore(0) for camera_id in camera_ids}
+    camera_sources = [{'id': camera_id, 'source': LockstepSource(source, credits[camera_id])}
+                      for camera_id, source in zip(camera_ids, sources)]
+    core = SurveillanceCore({
+        'camera_sources': camera_sources,
+        'camera_ready_timeout': 10,
+        'execution_mode': execution_mode
+    })
+
+    detections = {camera_id: 0 for camera_id in camera_ids}
+    stages = {camera_id: {'analyzed': 0, 'capture': 0.0, 'detection': 0.0,
+                          'first_seen': None, 'last_seen': None}
+              for camera_id in camera_ids}
+    last_processed = {camera_id: -1 for camera_id in camera_ids}
+
+    def on_detection(detection_data):
+        detections[detection_data['camera']] += 1
+
+    def consume(camera_id):
+        channel = core.get_processed_channel(camera_id)
+        stage = stages[camera_id]
+        released_at = None
+        while core.running:
+            packet = channel.wait(last_processed[camera_id], timeout=0.5)
+            if packet is None:
+                continue
+            # Capture timestamps come from time.time() in every execution mode
+            seen = time.time()
+            captured_at = channel.timestamp
+            if released_at is not None:
+                stage['capture'] += captured_at - released_at
+            stage['detection'] += seen - captured_at
+            stage['analyzed'] += 1
+            stage['first_seen'] = stage['first_seen'] or seen
+            stage['last_seen'] = seen
+            last_processed[camera_id] = packet[0]
+
+            # Let the camera read its next frame
+            released_at = time.time()
+            credits[camera_id].release()
+
+    core.set_detection_callback(on_detection)
+    start_time = time.time()
+    if not core.start_surveillance():
+        raise RuntimeError("Benchmark sources failed to start")
+
+    consumers = [threading.Thread(target=consume, args=(camera_id,), daemon=True)
+                 for camera_id in core.get_camera_ids()]
+    for consumer in consumers:
+        consumer.start()
+
+    # Wait until capture is finished and detection has caught up with it
+    cameras = core.camera_manager.cameras
+    while time.time() - start_time < timeout:
+        if all(camera.state == 'finished' and
+               last_processed[camera_id] >= camera.frame_buffer.latest_seq
+               for camera_id, camera in cameras.items()):
+            break
+        time.sleep(0.05)
+    elapsed = time.time() - start_time
+
+    core.stop_surveillance()
+
+    results = {}
+    for camera_id, camera in cameras.items():
+        stage = stages[camera_id]
+        analyzed = stage['analyzed']
+        span = (stage['last_seen'] - stage['first_seen']) if analyzed > 1 else 0.0
+        results[camera_id] = {
+            'frames_captured': camera.frames_captured,
+            'frames_analyzed': analyzed,
+            'capture_ms': stage['capture'] * 1000 / max(analyzed - 1, 1),
+            'detection_ms': stage['detection'] * 1000 / max(analyzed, 1),
+            'pipeline_fps': (analyzed - 1) / span if span else 0.0,
+            'detections': detections[camera_id]
+        }
+    return results, elapsed
+
+
+def print_results(results, elapsed):
+    """Print a benchmark results table"""
+    print("=" * 80)
+    print(f"{'camera':<10}{'captured':>10}{'analyzed':>10}{'capture ms':>12}{'detect ms':>12}"
+          f"{'pipeline fps':>14}{'detections':>12}")
+    for camera_id, result in results.items():
+        print(f"{camera_id:<10}{result['frames_captured']:>10}{result['frames_analyzed']:>10}"
+              f"{result['capture_ms']:>12.2f}{result['detection_ms']:>12.2f}"
+              f"{result['pipeline_fps']:>14.1f}{result['detections']:>12}")
+    total_analyzed = sum(result['frames_analyzed'] for result in results.values())
+    print("-" * 80)
+    print(f"⏱️  {elapsed:.2f}s total (including startup), {total_analyzed} frames analyzed, "
+          f"{sum(result['pipeline_fps'] for result in results.values()):.1f} frames/s across all cameras")
+    print("=" * 80)
+
+
+def box_iou(a, b):
+    """IoU of two (x1, y1, x2, y2) boxes"""
+    inter_w = min(a[2], b[2]) - max(a[0], b[0])
+    inter_h = min(a[3], b[3]) - max(a[1], b[1])
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    inter = inter_w * inter_h
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union
+
+
+def benchmark_motion(scales, frames=300, objects=3, seeds=(0,), noise=0,
+                     warmup=30, iou_threshold=0.3, motion_threshold=1000):
+    """Compare MotionDetector accuracy and speed across downscale factors
+
+    Frames come from synthetic sources whose object boxes are the ground truth.
+    The first `warmup` frames (background model still learning) are not scored.
+    A motion box matches an object when their IoU reaches `iou_threshold`.
+    """
+    results = {}
+    for scale in scales:
+        matched_objects = total_objects = matched_blobs = total_blobs = 0
+        detect_time = 0.0
+        scored_frames = 0
+
+        for seed in seeds:
+            source = SyntheticSource(objects=objects, seed=seed, realtime=False,
+                                     max_frames=frames, noise=noise)
+            source.open()
+            detector = MotionDetector(motion_threshold, scale=scale)
+
+            while True:
+                ret, frame = source.read()
+                if not ret:
+                    break
+                start_time = time.perf_counter()
+                blobs = detector.detect(frame)
+                detect_time += time.perf_counter() - start_time
+                if source.frame_index <= warmup:
+                    continue
+
+                truth = source.object_boxes()
+                boxes = [(x, y, x + w, y + h) for x, y, w, h in (blob['bbox'] for blob in blobs)]
+                matched_objects += sum(any(box_iou(t, b) >= iou_threshold for b in boxes) for t in truth)
+                matched_blobs += sum(any(box_iou(t, b) >= iou_threshold for t in truth) for b in boxes)
+                total_objects += len(truth)
+                total_blobs += len(boxes)
+                scored_frames += 1
+            source.release()
+
+        total_frames = frames * len(seeds)
+        results[scale] = {
+            'recall': matched_objects / total_objects if total_objects else 0.0,
+            'precision': matched_blobs / total_blobs if total_blobs else 0.0,
+            'blobs_per_frame': total_blobs / scored_frames if scored_frames else 0.0,
+            'ms_per_frame': detect_time * 1000 / total_frames,
+            'fps': total_frames / detect_time if detect_time else 0.0
+        }
+    return results
+
+
+def print_motion_results(results):
+    """Print a motion accuracy/throughput table, one row per scale"""
+    print("=" * 72)
+    print(f"{'scale':<10}{'recall':>10}{'precision':>12}{'blobs/frame':>14}{'ms/frame':>12}{'fps':>12}")
+    for scale, result in results.items():
+        print(f"{scale:<10}{result['recall']:>10.3f}{result['precision']:>12.3f}{result['blobs_per_frame']:>14.2f}"
+              f"{result['ms_per_frame']:>12.2f}{result['fps']:>12.1f}")
+    print("=" * 72)
+
+
+# Run in a fresh interpreter so imports are not already cached
+STARTUP_PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.start_services()
+response = app.app.test_client().get('/status')
+responded = time.perf_counter()
+app.surveillance_loader.get(timeout=120)
+loaded = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - start,
+    'first_response_seconds': responded - start,
+    'status_code': response.status_code,
+    'ready_seconds': loaded - start,
+    'state': app.surveillance_loader.state
+}))
+"""
+
+
+def benchmark_startup(runs=3):
+    """Measure app import, first /status response and background load times"""
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', STARTUP_PROBE], cwd=app_dir,
+                                capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def print_startup_results(results):
+    """Print a startup timing table, one row per run"""
+    print("=" * 72)
+    print(f"{'run':<6}{'import s':>12}{'first /status s':>18}{'ready s':>12}{'state':>12}")
+    for run, result in enumerate(results, 1):
+        print(f"{run:<6}{result['import_seconds']:>12.3f}{result['first_response_seconds']:>18.3f}"
+              f"{result['ready_seconds']:>12.3f}{result['state']:>12}")
+    print("=" * 72)
+
+
+async def _stream_client(url, duration):
+    """Hold one MJPEG connection for `duration` seconds, counting frames and bytes"""
+    parts = urlsplit(url)
+    target = parts.path + (f"?{parts.query}" if parts.query else '')
+    result = {'status': None, 'frames': 0, 'bytes': 0, 'error': None}
+    try:
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    except OSError as e:
+        result['error'] = str(e)
+        return result
+    try:
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n\r\n".encode())
+        await writer.drain()
+        result['status'] = int((await reader.readline()).split()[1])
+        if result['status'] != 200:
+            return result
+
+        boundary = b'--frame\r\n'
+        tail = b''
+        deadline = time.perf_counter() + duration
+        while (remaining := deadline - time.perf_counter()) > 0:
+            try:
+                chunk = await asyncio.wait_for(reader.read(65536), remaining)
+            except asyncio.TimeoutError:
+                break
+            if not chunk:
+                break
+            result['bytes'] += len(chunk)
+            # Carry the end of the previous chunk so split boundaries still count
+            data = tail + chunk
+            result['frames'] += data.count(boundary)
+            tail = data[-(len(boundary) - 1):]
+    except (OSError, IndexError, ValueError) as e:
+        result['error'] = str(e)
+    finally:
+        writer.close()
+    return result
+
+
+def benchmark_streams(url, clients, duration=10.0):
+    """Open `clients` concurrent /video_feed streams and collect per-client results"""
+    async def run():
+        return await asyncio.gather(*[_stream_client(url, duration) for _ in range(clients)])
+    return asyncio.run(run())
+
+
+def print_stream_results(results, duration):
+    """Print a stream load test summary"""
+    accepted = [result for result in results if result['status'] == 200]
+    rejected = sum(1 for result in results if result['status'] == 503)
+    failed = len(results) - len(accepted) - rejected
+    print("=" * 72)
+    print(f"clients: {len(results)}  accepted: {len(accepted)}  rejected (503): {rejected}  failed: {failed}")
+    if accepted:
+        rates = [result['frames'] / duration for result in accepted]
+        total_bytes = sum(result['bytes'] for result in accepted)
+        print(f"fps per client  min {min(rates):.1f}  avg {sum(rates) / len(rates):.1f}  max {max(rates):.1f}")
+        print(f"total {sum(rates):.1f} frames/s, {total_bytes * 8 / duration / 1e6:.1f} Mbit/s")
+    print("=" * 72)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Surveillance pipeline throughput benchmark")
+    parser.add_argument('--cameras', type=int, default=1, help="number of synthetic cameras")
+    parser.add_argument('--frames', type=int, default=300, help="frames per synthetic camera")
+    parser.add_argument('--objects', type=int, default=3, help="moving objects per synthetic camera")
+    parser.add_argument('--source', action='append', help="explicit source spec (repeatable)")
+    parser.add_argument('--mode', choices=['threads', 'processes'], default='threads',
+                        help="execution mode of the pipeline")
+    parser.add_argument('--timeout', type=float, default=120)
+    parser.add_argument('--motion-scales', help="comma-separated motion downscale factors to compare")
+    parser.add_argument('--noise', type=int, default=0, help="per-pixel noise of synthetic frames")
+    parser.add_argument('--startup', action='store_true', help="benchmark app startup instead")
+    parser.add_argument('--runs', type=int, default=3, help="startup benchmark runs")
+    parser.add_argument('--max-startup', type=float, help="fail if the first /status response is slower (s)")
+    parser.add_argument('--streams', type=int, help="load-test a running server with N concurrent streams")
+    parser.add_argument('--url', default='http://localhost:5000/video_feed', help="stream URL for --streams")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds to hold each stream")
+    args = parser.parse_args()
+
+    if args.streams:
+        print_stream_results(benchmark_streams(args.url, args.streams, args.duration), args.duration)
+        return
+
+    if args.startup:
+        results = benchmark_startup(args.runs)
+        print_startup_results(results)
+        worst = max(result['first_response_seconds'] for result in results)
+        if args.max_startup is not None and worst > args.max_startup:
+            print(f"❌ Startup regression: first /status after {worst:.3f}s (limit {args.max_startup}s)")
+            sys.exit(1)
+        return
+
+    if args.motion_scales:
+        scales = [float(scale) for scale in args.motion_scales.split(',')]
+        print_motion_results(benchmark_motion(scales, args.frames, args.objects,
+                                              range(args.cameras), args.noise))
+        return
+
+    sources = args.source or [
+        f"synthetic://?objects={args.objects}&seed={i}&realtime=0&max_frames={args.frames}&noise={args.noise}"
+        for i in range(args.cameras)
+    ]
+    results, elapsed = benchmark_pipeline(sources, args.timeout, args.mode)
+    print_results(results, elapsed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+import cv2
+import glob
+import json
+import os
+import sys
+import threading
+import time
+
+PROBE_CACHE_VERSION = 1
+
+
+def candidate_backends():
+    """Capture backends worth probing on this platform, in preference order"""
+    if sys.platform.startswith('win'):
+        names = ['CAP_DSHOW', 'CAP_MSMF', 'CAP_FFMPEG']
+    elif sys.platform == 'darwin':
+        names = ['CAP_AVFOUNDATION', 'CAP_FFMPEG']
+    else:
+        names = ['CAP_V4L2', 'CAP_GSTREAMER', 'CAP_FFMPEG']
+    return [(getattr(cv2, name), name[4:]) for name in names if hasattr(cv2, name)]
+
+
+def device_fingerprint():
+    """Describe the attached capture devices so the cache notices hardware changes"""
+    devices = []
+    for path in sorted(glob.glob('/dev/video*')):
+        try:
+            devices.append([path, os.stat(path).st_ctime])
+        except OSError:
+            continue
+    return {
+        'platform': sys.platform,
+        'opencv': cv2.__version__,
+        'devices': devices
+    }
+
+
+def probe_source(index, backend=None, cancelled=None):
+    """Open a camera index (optionally with a backend) and try to read one frame
+
+    With `cancelled` set (the probe was abandoned while opening) the device is
+    released right away instead of being read.
+    """
+    cap = cv2.VideoCapture(index, backend) if backend is not None else cv2.VideoCapture(index)
+    try:
+        if not cap.isOpened() or (cancelled is not None and cancelled.is_set()):
+            return None
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            return None
+        return {'index': index, 'backend': backend, 'width': frame.shape[1], 'height': frame.shape[0]}
+    finally:
+        cap.release()
+
+
+def probe_parallel(candidates, timeout=2.0):
+    """Probe (index, backend) candidates with a shared deadline
+
+    Each device index is probed in its own daemon thread, so different
+    devices are opened concurrently; the backends listed for one index are
+    tried one after another (two opens of the same device at once make one of
+    them fail) until one works. A hung driver call can't be interrupted, so
+    probes that miss the deadline are abandoned: they skip their remaining
+    backends and release the device as soon as the hung call returns.
+    Returns the successful results in candidate order.
+    """
+    results = [None] * len(candidates)
+    by_index = {}
+    for i, (index, backend) in enumerate(candidates):
+        by_index.setdefault(index, []).append((i, backend))
+    cancelled = threading.Event()
+    threads = []
+
+    def run(index, attempts):
+        for i, backend in attempts:
+            if cancelled.is_set():
+                return
+            try:
+                results[i] = probe_source(index, backend, cancelled)
+            except Exception:
+                results[i] = None
+            if results[i] is not None:
+                return
+
+    for index, attempts in by_index.items():
+        thread = threading.Thread(target=run, args=(index, attempts), daemon=True,
+                                  name=f"camera-probe-{index}")
+        thread.start()
+        threads.append(thread)
+
+    deadline = time.time() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.time()))
+    cancelled.set()
+
+    timed_out = sum(1 for thread in threads if thread.is_alive())
+    if timed_out:
+        print(f"⚠️ {timed_out} camera probe(s) timed out after {timeout:.1f}s")
+
+    return [result for result in results if result is not None]
+
+
+class CameraProbeCache:
+    """On-disk cache of the last successful camera discovery"""
+
+    def __init__(self, cache_path, max_age=24 * 3600):
+        self.cache_path = cache_path
+        self.max_age = max_age
+
+    def load(self):
+        """Get the cached result if it is still valid for the attached devices"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('version') != PROBE_CACHE_VERSION:
+            return None
+        if time.time() - entry.get('created', 0) > self.max_age:
+            return None
+        if entry.get('fingerprint') != json.loads(json.dumps(device_fingerprint())):
+            return None
+        return entry.get('result')
+
+    def save(self, result):
+        """Store a discovery result along with the current device fingerprint"""
+        if not self.cache_path:
+            return
+        try:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    'version': PROBE_CACHE_VERSION,
+                    'created': time.time(),
+                    'fingerprint': device_fingerprint(),
+                    'result': result
+                }, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"⚠️ Could not write camera probe cache: {e}")
+
+    def invalidate(self):
+        """Forget the cached result"""
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                os.remove(self.cache_path)
+            except OSError:
+                pass
+
+
+def discover_camera(indices=range(5), timeout=2.0, cache_path=None, max_age=24 * 3600, refresh=False):
+    """Find a working camera, using the on-disk cache when it is still valid
+
+    Returns a camera index, an (index, backend) tuple when only a specific
+    backend works, or None if nothing was found.
+    """
+    cache = CameraProbeCache(cache_path, max_age)
+
+    if not refresh:
+        cached = cache.load()
+        if cached is not None:
+            print(f"✅ Using cached camera source: {cached}")
+            return tuple(cached) if isinstance(cached, list) else cached
+
+    print("🔍 Testing camera sources...")
+    start_time = time.time()
+
+    # Every index with the default backend at once; the default index falls
+    # back to explicit backends in the same thread, so a hung probe of one
+    # device is never overlapped by a second open of it
+    candidates = [(index, None) for index in indices]
+    candidates += [(0, backend) for backend, _ in candidate_backends()]
+    found = probe_parallel(candidates, timeout)
+    result = None
+    if found:
+        best = found[0]
+        result = best['index'] if best['backend'] is None else (best['index'], best['backend'])
+
+    print(f"🔍 Camera discovery finished in {time.time() - start_time:.2f}s: {result}")
+
+    if result is not None:
+        cache.save(list(result) if isinstance(result, tuple) else result)
+    return result
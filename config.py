@@ -6,18 +6,145 @@ load_dotenv()
 class Config:
     # Database Configuration
     DATABASE_PATH = 'database/surveillance.db'
+    # Alerts and logs are queued and written in batches by a background thread
+    # on one WAL connection, so intrusions never wait on a commit
+    DATABASE_WRITE_BEHIND = {
+        'enabled': True,
+        'max_queue': 1000,  # rows waiting before new ones are dropped
+        'batch_size': 100,  # rows per transaction
+        'flush_interval': 0.5  # max seconds a row waits before being written
+    }
     
     # Camera Configuration
-    CAMERA_INDEX = 0  # 0 for default webcam, or IP camera URL
+    CAMERA_INDEX = 0  # 0 for default webcam, IP camera URL, video file or "synthetic://"
     FRAME_WIDTH = 640
     FRAME_HEIGHT = 480
     FPS = 30
     
+    # Multi-camera Configuration
+    # Each entry is {'id': 'lobby', 'source': 0} where source is a camera index,
+    # RTSP/HTTP URL or video file path. Leave empty to auto-detect one camera.
+    CAMERA_SOURCES = []
+    FRAME_BUFFER_SIZE = 8  # Preallocated frame slots per camera
+    
+    # Camera discovery (used when CAMERA_SOURCES is empty)
+    CAMERA_PROBE_CACHE = 'database/camera_probe_cache.json'
+    CAMERA_PROBE_TIMEOUT = 2.0  # seconds per discovery round
+    CAMERA_READY_TIMEOUT = 2.0  # seconds to wait for first frames on start
+    
+    # Video streaming
+    STREAM_JPEG_QUALITY = 85
+    STREAM_KEEPALIVE = 10  # seconds between repeats of an unchanged placeholder frame
+    
+    # Stream profiles for /video_feed?profile=<name>; width/height/quality/fps
+    # query parameters override them. None keeps the source size / frame rate.
+    # Clients asking for the same variant share one encoded copy per frame.
+    STREAM_PROFILES = {
+        'full': {'width': None, 'height': None, 'quality': 85, 'fps': None},
+        'medium': {'width': 480, 'height': None, 'quality': 70, 'fps': 15},
+        'low': {'width': 320, 'height': None, 'quality': 60, 'fps': 10},
+        'tile': {'width': 160, 'height': None, 'quality': 50, 'fps': 5}
+    }
+    # profile=auto starts at the first profile and steps down while sending
+    # to the client is blocked more than STREAM_AUTO_CONGESTED of the time
+    STREAM_AUTO_LADDER = ['full', 'medium', 'low', 'tile']
+    STREAM_AUTO_CONGESTED = 0.5
+    STREAM_MAX_VARIANTS = 16  # encoded variants cached by the stream hub
+    
+    # ASGI server mode (python asgi_server.py): each /video_feed viewer is a
+    # coroutine fed from one frame pump per camera instead of an OS thread
+    ASGI_MAX_STREAMS = 100  # concurrent /video_feed streams; more get 503
+    ASGI_ENCODE_THREADS = 2  # worker threads for JPEG encoding
+    
+    # Server-push events (/events, Server-Sent Events): detections and status
+    # changes published within EVENTS_TICK seconds are sent as one batch
+    EVENTS_TICK = 0.2
+    EVENTS_HISTORY = 500  # batches kept for clients resuming with Last-Event-ID
+    EVENTS_MAX_LAG = 50  # batches a slow client may fall behind before a resync
+    EVENTS_KEEPALIVE = 15  # seconds between keepalive comments on an idle stream
+    
+    # Startup: the surveillance system and model load in the background so the
+    # web UI and /status come up immediately (readiness is reported on /status)
+    STARTUP_WAIT_TIMEOUT = 30  # seconds "Start" waits for a system that is still loading
+    MODEL_LOAD_ASYNC = True
+    
+    # Execution mode: 'threads' (single process) or 'processes' (capture and
+    # detection per camera in worker processes, frames in shared memory)
+    EXECUTION_MODE = 'threads'
+    
+    # Motion detection: MOG2 runs on a grayscale copy downscaled by MOTION_SCALE
+    # (override per camera with 'motion_scale' in CAMERA_SOURCES entries;
+    # compare scales with `python benchmark.py --motion-scales 1,0.5,0.25`)
+    MOTION_SCALE = 0.5
+    MOTION_MORPH_KERNEL = 3  # open/close kernel size for mask cleanup, 0 to disable
+    MOTION_MERGE_DISTANCE = 20  # blobs closer than this many pixels are reported as one
+    
     # Detection Configuration
     CONFIDENCE_THRESHOLD = 0.5
     NMS_THRESHOLD = 0.4
     MODEL_PATH = 'models/yolov8n.pt'
     
+    # Inference backend: 'ultralytics' (PyTorch), 'onnxruntime' or 'openvino'.
+    # Exported models are cached next to MODEL_PATH and refreshed when it changes.
+    # The last two need the optional packages listed in requirements.txt.
+    INFERENCE_BACKEND = 'ultralytics'
+    INFERENCE_INT8 = False  # ONNX Runtime only: dynamically quantized INT8 weights
+    INFERENCE_THREADS = 0  # ONNX Runtime intra-op threads, 0 for all cores
+    
+    # Batched inference across cameras (shared ObjectDetector)
+    INFERENCE_BATCH_SIZE = 8  # max frames per model call
+    INFERENCE_BATCH_WAIT = 0.02  # seconds to wait for a batch to fill
+    
+    # Asynchronous inference: capture and display keep the camera rate while
+    # detection runs on its own thread on the newest frame (older ones dropped)
+    INFERENCE_ASYNC = True
+    INFERENCE_QUEUE_SIZE = 1  # pending frames before the oldest is dropped
+    
+    # Inference scheduling: 'fixed' runs YOLO every FIXED_INFERENCE_INTERVAL
+    # frames, 'motion' lets MOG2 activity decide how often it runs
+    INFERENCE_MODE = 'motion'
+    FIXED_INFERENCE_INTERVAL = 3
+    INFERENCE_RATE_POLICY = {
+        'motion_area': 1500,  # foreground pixels that count as activity
+        'active_interval': 3,  # frames between inferences while active (tracker fills the gaps)
+        'cooldown': 2.0,  # seconds to stay active after the last activity
+        'heartbeat': 5.0  # max seconds between inferences on a static scene
+    }
+    
+    # Multi-object tracking: stable ids between detector keyframes, so boxes
+    # move smoothly and each person raises one alert per zone entry
+    TRACKER = {
+        'enabled': True,
+        'iou_threshold': 0.3,
+        'max_distance': 0.5,  # centroid fallback, as a fraction of the box diagonal
+        'max_missed': 3,  # keyframes a track may go undetected before it is dropped
+        'max_predict_frames': 30  # stop extrapolating after this many frames
+    }
+    
+    # Static-scene cache: reuse the last detections while a tiny grayscale
+    # fingerprint of the frame stays within `threshold` mean gray levels
+    # and no fingerprint cell changes by `cell_threshold` or more
+    DETECTION_CACHE = {
+        'enabled': True,
+        'threshold': 3.0,
+        'cell_threshold': 12.0,
+        'refresh_interval': 5.0  # seconds before results are recomputed anyway
+    }
+    
+    # Region-of-interest inference: run the detector only on crops around the
+    # restricted zones and/or motion blobs instead of the full frame. When the
+    # padded regions cover more than `max_coverage` of the frame the full
+    # frame is used instead, so 'zones' only pays off for zones that are
+    # small together (the default Main Entrance alone covers 64%, which would
+    # make every call a full-frame one); the default crops around motion only.
+    ROI_INFERENCE = {
+        'enabled': True,
+        'sources': ['motion'],  # 'zones' and/or 'motion'
+        'padding': 32,  # pixels added around every region
+        'min_motion_area': 200,  # ignore smaller motion blobs
+        'max_coverage': 0.6  # run the full frame when regions cover more than this
+    }
+    
     # Alert Configuration
     ALERT_COOLDOWN = 30  # seconds between alerts
     RECORDING_DURATION = 10  # seconds
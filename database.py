@@ -1,14 +1,170 @@
 import sqlite3
 import os
-from datetime import datetime
+from datetime import datetime, timezone
+import atexit
 import json
 import logging
+import queue
+import threading
+import time
+
+class WriteBehindWriter:
+    """Batch INSERTs on a background thread over one long-lived WAL connection
+    
+    Callers (e.g. the capture loop) only enqueue (sql, params) rows on a
+    bounded queue. The writer thread commits them with executemany once
+    `batch_size` rows are waiting or `flush_interval` seconds after the first
+    one, so a burst of alerts costs one transaction instead of one fsync per
+    row. If the queue stays full for `put_timeout` seconds the row is dropped
+    and counted rather than stalling the caller. Pending rows are written on
+    flush(), close() and interpreter exit.
+    """
+    
+    def __init__(self, db_path, max_queue=1000, batch_size=100, flush_interval=0.5, put_timeout=0.05):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.closed = False
+        
+        # Statistics
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_time = 0.0
+        self.max_flush_time = 0.0
+        self.total_flush_time = 0.0
+        
+        self.thread = threading.Thread(target=self._run, daemon=True, name='db-writer')
+        self.thread.start()
+        atexit.register(self.close)
+    
+    def submit(self, sql, params):
+        """Queue one row for writing; returns False if it had to be dropped"""
+        if self.closed:
+            return False
+        try:
+            self.queue.put((sql, params), timeout=self.put_timeout)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logging.error(f"Database write queue full, dropped row ({self.dropped} dropped so far)")
+            return False
+    
+    def flush(self, timeout=5.0):
+        """Write everything queued so far; returns False on timeout
+        
+        The flush request waits for room on the queue like a row does, so a
+        full queue counts against `timeout` instead of blocking forever.
+        """
+        if self.closed or not self.thread.is_alive():
+            return False
+        deadline = time.time() + timeout
+        done = threading.Event()
+        try:
+            self.queue.put(('flush', done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(max(0.0, deadline - time.time()))
+    
+    def close(self, timeout=5.0):
+        """Write pending rows and stop the writer thread, waiting up to `timeout`"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.thread.is_alive():
+            deadline = time.time() + timeout
+            try:
+                self.queue.put(('close', None), timeout=timeout)
+            except queue.Full:
+                logging.error(f"Database writer still busy after {timeout}s, "
+                              f"closing with {self.queue.qsize()} rows unwritten")
+                return
+            self.thread.join(max(0.0, deadline - time.time()))
+    
+    def _run(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        try:
+            while True:
+                rows, control = self._collect()
+                if rows:
+                    self._write(conn, rows)
+                if control is not None:
+                    kind, done = control
+                    if done is not None:
+                        done.set()
+                    if kind == 'close':
+                        return
+        finally:
+            conn.close()
+    
+    def _collect(self):
+        """Wait for the next batch; returns (rows, control message or None)"""
+        item = self.queue.get()
+        if item[0] in ('flush', 'close'):
+            return [], item
+        rows = [item]
+        deadline = time.time() + self.flush_interval
+        while len(rows) < self.batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item[0] in ('flush', 'close'):
+                return rows, item
+            rows.append(item)
+        return rows, None
+    
+    def _write(self, conn, rows):
+        """Insert a batch in one transaction, one executemany per run of the same statement"""
+        started = time.time()
+        try:
+            with conn:
+                start = 0
+                for end in range(1, len(rows) + 1):
+                    if end == len(rows) or rows[end][0] != rows[start][0]:
+                        conn.executemany(rows[start][0], [params for _, params in rows[start:end]])
+                        start = end
+            self.written += len(rows)
+        except Exception as e:
+            self.failed += len(rows)
+            logging.error(f"Error writing {len(rows)} queued rows: {str(e)}")
+        
+        self.last_flush_time = time.time() - started
+        self.max_flush_time = max(self.max_flush_time, self.last_flush_time)
+        self.total_flush_time += self.last_flush_time
+        self.batches += 1
+    
+    def get_stats(self):
+        """Get queue depth, write counters and flush latency"""
+        return {
+            'queue_depth': self.queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'batches': self.batches,
+            'last_flush_ms': round(self.last_flush_time * 1000, 2),
+            'max_flush_ms': round(self.max_flush_time * 1000, 2),
+            'average_flush_ms': round(self.total_flush_time * 1000 / self.batches, 2) if self.batches else 0
+        }
 
 class DatabaseManager:
-    def __init__(self, db_path='database/surveillance.db'):
+    def __init__(self, db_path='database/surveillance.db', write_behind=None):
         self.db_path = db_path
         self.ensure_directory()
         self.init_database()
+        
+        # Alerts and logs go through a batched background writer when enabled;
+        # `write_behind` is {'enabled': True, ...WriteBehindWriter options}
+        writer_config = dict(write_behind or {'enabled': False})
+        self.writer = WriteBehindWriter(db_path, **writer_config) if writer_config.pop('enabled', False) else None
     
     def ensure_directory(self):
         """Ensure database directory exists"""
@@ -62,8 +218,23 @@ class DatabaseManager:
         except Exception as e:
             logging.error(f"Database initialization error: {str(e)}")
     
+    @staticmethod
+    def _now():
+        """Event time in SQLite CURRENT_TIMESTAMP format (queued rows are written later)"""
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+    
     def add_alert(self, alert_type, confidence, zone_name, coordinates, video_path=None):
-        """Add new alert to database"""
+        """Add new alert to database
+        
+        Returns the row id, or None when the row was handed to the
+        write-behind writer (or could not be written).
+        """
+        if self.writer:
+            self.writer.submit('''
+                INSERT INTO alerts (timestamp, alert_type, confidence, zone_name, coordinates, video_path)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (self._now(), alert_type, confidence, zone_name, json.dumps(coordinates), video_path))
+            return None
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
@@ -79,6 +250,7 @@ class DatabaseManager:
     
     def get_recent_alerts(self, limit=50):
         """Get recent alerts"""
+        self.flush()
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
@@ -94,6 +266,12 @@ class DatabaseManager:
     
     def add_log(self, level, message, module):
         """Add system log entry"""
+        if self.writer:
+            self.writer.submit('''
+                INSERT INTO system_logs (timestamp, log_level, message, module)
+                VALUES (?, ?, ?, ?)
+            ''', (self._now(), level, message, module))
+            return
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
@@ -105,8 +283,23 @@ class DatabaseManager:
         except Exception as e:
             logging.error(f"Error adding log: {str(e)}")
     
+    def flush(self):
+        """Write rows still queued in the write-behind writer"""
+        if self.writer:
+            self.writer.flush()
+    
+    def close(self):
+        """Flush and stop the write-behind writer"""
+        if self.writer:
+            self.writer.close()
+    
+    def get_writer_stats(self):
+        """Write-behind queue depth and flush latency (None when writes are synchronous)"""
+        return self.writer.get_stats() if self.writer else None
+    
     def get_system_stats(self):
         """Get system statistics"""
+        self.flush()
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
@@ -0,0 +1,106 @@
+import json
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+
+def format_sse(event_id, event, data):
+    """Format one Server-Sent Events message"""
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class EventBus:
+    """Coalesce server events per tick and fan them out to push subscribers
+
+    Events published within one `tick` become a single batch with an
+    increasing id: list events (detections) keep every entry in order, while
+    `coalesce` types (status snapshots, stats) keep only the latest value.
+    The last `history` batches are kept so a reconnecting client can resume
+    after its Last-Event-ID.
+
+    Subscribers only hold a cursor, never a queue: one that falls more than
+    `max_lag` batches behind (or past the history) gets a single 'resync'
+    event and skips to the newest batch instead of buffering the backlog.
+    """
+
+    def __init__(self, tick=0.2, history=500, max_lag=50, coalesce=('status', 'stats')):
+        self.tick = tick
+        self.max_lag = max_lag
+        self.coalesce = set(coalesce)
+        self.batches = deque(maxlen=history)  # (id, {event_type: data})
+        self.last_id = 0
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.pending_ready = threading.Condition(self.lock)
+        self.batch_ready = threading.Condition(self.lock)
+        self.thread = None
+
+        # Statistics
+        self.published = 0
+        self.resyncs = 0
+
+    def start(self):
+        """Start the batching thread"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True, name='event-bus')
+            self.thread.start()
+        return self
+
+    def publish(self, event_type, data):
+        """Queue an event for the next batch"""
+        with self.lock:
+            if event_type in self.coalesce:
+                self.pending[event_type] = data
+            else:
+                self.pending.setdefault(event_type, []).append(data)
+            self.published += 1
+            self.pending_ready.notify()
+
+    def _run(self):
+        while True:
+            with self.lock:
+                while not self.pending:
+                    self.pending_ready.wait()
+            # Let the rest of this tick's events arrive, then send them as one batch
+            time.sleep(self.tick)
+            with self.lock:
+                self.last_id += 1
+                self.batches.append((self.last_id, self.pending))
+                self.pending = {}
+                self.batch_ready.notify_all()
+
+    def wait(self, after_id, timeout=None):
+        """Block until a batch newer than `after_id` exists; returns the newest id"""
+        with self.lock:
+            self.batch_ready.wait_for(lambda: self.last_id != after_id, timeout)
+            return self.last_id
+
+    def read(self, cursor=None, timeout=None):
+        """Get (id, event, data) messages after `cursor`, waiting up to `timeout`
+
+        A None cursor starts from now. Returns an empty list on timeout.
+        """
+        with self.lock:
+            if cursor is None:
+                cursor = self.last_id
+            if cursor == self.last_id and timeout != 0:
+                self.batch_ready.wait_for(lambda: self.last_id != cursor, timeout)
+
+            if cursor == self.last_id:
+                return []
+            oldest = self.batches[0][0] if self.batches else self.last_id + 1
+            if cursor > self.last_id or cursor < oldest - 1 or self.last_id - cursor > self.max_lag:
+                # Unknown cursor (server restarted), history lost or too far behind
+                self.resyncs += 1
+                return [(self.last_id, 'resync', {'last_id': self.last_id})]
+            start = cursor - oldest + 1
+            return [(event_id, 'update', batch) for event_id, batch in islice(self.batches, start, None)]
+
+    def get_stats(self):
+        """Get publishing statistics"""
+        return {
+            'last_id': self.last_id,
+            'published': self.published,
+            'resyncs': self.resyncs
+        }
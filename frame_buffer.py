@@ -0,0 +1,188 @@
+import threading
+import time
+import numpy as np
+
+
+class FrameRingBuffer:
+    """Fixed-size ring of preallocated frame slots tagged with sequence numbers
+
+    A single producer writes frames into the slots in order, each write getting
+    the next monotonic sequence number and a capture timestamp. Consumers read
+    the latest frame or a specific sequence number and receive a view into the
+    slot, not a copy. A slot is only reused after `size` newer frames have been
+    written, so readers that hold on to a frame for longer should either copy
+    it or call `is_valid(seq)` once they are done to detect an overwrite.
+    """
+
+    def __init__(self, size=8):
+        if size < 2:
+            raise ValueError("Frame ring buffer needs at least 2 slots")
+        self.size = size
+        self.slots = None  # (size, height, width, channels), allocated on first frame
+        self.sequences = np.full(size, -1, dtype=np.int64)
+        self.timestamps = np.zeros(size, dtype=np.float64)
+        self.latest_seq = -1
+        self.generation = 0  # Bumped by reset() to wake waiters
+        self.lock = threading.Lock()
+        self.frame_ready = threading.Condition(self.lock)
+
+    @property
+    def frame_shape(self):
+        """Shape of a single frame slot, or None before the first write"""
+        return None if self.slots is None else self.slots.shape[1:]
+
+    def _allocate(self, shape, dtype):
+        """Allocate (or reallocate after a resolution change) every slot at once"""
+        self.slots = np.empty((self.size,) + tuple(shape), dtype=dtype)
+        self.sequences.fill(-1)
+
+    def next_slot(self):
+        """Get the writable slot for the next frame, or None before allocation
+
+        The slot is marked invalid until `commit` is called, so readers never
+        see a half-written frame under an old sequence number.
+        """
+        with self.lock:
+            if self.slots is None:
+                return None
+            index = (self.latest_seq + 1) % self.size
+            self.sequences[index] = -1
+            return self.slots[index]
+
+    def commit(self, timestamp=None):
+        """Publish the slot returned by `next_slot` and return its sequence number"""
+        with self.lock:
+            seq = self.latest_seq + 1
+            index = seq % self.size
+            self.sequences[index] = seq
+            self.timestamps[index] = timestamp if timestamp is not None else time.time()
+            self.latest_seq = seq
+            self.frame_ready.notify_all()
+            return seq
+
+    def write(self, frame, timestamp=None):
+        """Copy a frame into the next slot and return its sequence number"""
+        with self.lock:
+            if self.slots is None or self.slots.shape[1:] != frame.shape or self.slots.dtype != frame.dtype:
+                self._allocate(frame.shape, frame.dtype)
+
+        slot = self.next_slot()
+        np.copyto(slot, frame)
+        return self.commit(timestamp)
+
+    def latest(self):
+        """Get (seq, timestamp, frame) for the newest frame, or None if empty"""
+        with self.lock:
+            if self.latest_seq < 0:
+                return None
+            index = self.latest_seq % self.size
+            if self.sequences[index] != self.latest_seq:
+                return None
+            return self.latest_seq, float(self.timestamps[index]), self.slots[index]
+
+    def wait_for_frame(self, after_seq=-1, timeout=None):
+        """Block until a frame newer than `after_seq` exists
+
+        Returns (seq, timestamp, frame) for the newest frame, which may skip
+        over several sequence numbers if the consumer fell behind, or None on
+        timeout or when the buffer is reset. After a reset only frames
+        written since count, even if `after_seq` is older.
+        """
+        with self.frame_ready:
+            generation = self.generation
+            self.frame_ready.wait_for(
+                lambda: self.generation != generation or (self.latest_seq > after_seq and self._latest_valid()),
+                timeout
+            )
+            if self.latest_seq <= after_seq or not self._latest_valid():
+                return None
+            index = self.latest_seq % self.size
+            return self.latest_seq, float(self.timestamps[index]), self.slots[index]
+
+    def _latest_valid(self):
+        """Check that the newest slot holds a committed frame (caller holds the lock)"""
+        return self.latest_seq >= 0 and self.sequences[self.latest_seq % self.size] == self.latest_seq
+
+    def get(self, seq):
+        """Get (timestamp, frame) for a sequence number, or None if not available"""
+        with self.lock:
+            if seq < 0 or seq > self.latest_seq:
+                return None
+            index = seq % self.size
+            if self.sequences[index] != seq:
+                return None  # Overwritten by a newer frame
+            return float(self.timestamps[index]), self.slots[index]
+
+    def is_valid(self, seq):
+        """Check that a previously read frame has not been overwritten since"""
+        with self.lock:
+            return seq >= 0 and self.sequences[seq % self.size] == seq
+
+    def reset(self):
+        """Drop all frames and wake waiters (sequence numbers keep increasing)"""
+        with self.lock:
+            self.sequences.fill(-1)
+            self.generation += 1
+            self.frame_ready.notify_all()
+
+
+class FrameChannel:
+    """Latest-value handoff of one frame stream with wake-up on publish
+
+    Used between pipeline stages that only care about the newest result (e.g.
+    detection output feeding the video stream). Consumers remember the last
+    sequence number they handled and block in `wait` until a newer one is
+    published instead of polling on a timer. Each frame can carry a metadata
+    object (e.g. overlay boxes) that is handed out together with it.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.seq = -1
+        self.frame = None
+        self.metadata = None
+        self.timestamp = None
+        self.generation = 0  # Bumped by clear() to wake waiters
+
+    def publish(self, seq, frame, timestamp=None, metadata=None):
+        """Publish a new frame and wake every waiting consumer"""
+        with self.condition:
+            self.seq = seq
+            self.frame = frame
+            self.metadata = metadata
+            self.timestamp = timestamp if timestamp is not None else time.time()
+            self.condition.notify_all()
+
+    def latest(self, with_metadata=False):
+        """Get (seq, frame) for the newest frame, or None if empty
+
+        With `with_metadata` the packet is (seq, frame, metadata).
+        """
+        with self.condition:
+            if self.frame is None:
+                return None
+            return (self.seq, self.frame, self.metadata) if with_metadata else (self.seq, self.frame)
+
+    def wait(self, after_seq=-1, timeout=None, with_metadata=False):
+        """Block until a frame newer than `after_seq` is published
+
+        Returns (seq, frame) (or (seq, frame, metadata) with `with_metadata`),
+        or None on timeout or when the channel is cleared.
+        """
+        with self.condition:
+            generation = self.generation
+            self.condition.wait_for(
+                lambda: self.generation != generation or (self.frame is not None and self.seq > after_seq),
+                timeout
+            )
+            if self.frame is None or self.seq <= after_seq:
+                return None
+            return (self.seq, self.frame, self.metadata) if with_metadata else (self.seq, self.frame)
+
+    def clear(self):
+        """Drop the current frame and wake consumers so they can re-check state"""
+        with self.condition:
+            self.frame = None
+            self.metadata = None
+            self.generation += 1
+            self.condition.notify_all()
@@ -1,11 +1,94 @@
 document.addEventListener('DOMContentLoaded', () => {
-    const socket = io();
+    // Detections and status are pushed by the server (/events); the page only
+    // fetches /status and /recent_alerts once on load and after a resync
+    const recentAlerts = [];
 
-    socket.on('connect', () => {
-        console.log('Connected to server');
-    });
+    function setText(id, value) {
+        const element = document.getElementById(id);
+        if (element) {
+            element.textContent = value;
+        }
+    }
+
+    function renderStatus(status) {
+        const badge = document.getElementById('system-status');
+        if (badge) {
+            const running = status.running;
+            badge.textContent = running ? 'Running' : (status.ready === false ? 'Starting' : 'Stopped');
+            badge.className = `badge ${running ? 'bg-success' : 'bg-secondary'}`;
+        }
+        if (status.detection_count !== undefined) {
+            setText('detection-count', status.detection_count);
+        }
+        if (status.alert_count !== undefined) {
+            setText('alert-count', status.alert_count);
+        }
+        setText('last-update', status.current_time || new Date().toLocaleTimeString());
+    }
+
+    function renderStats(stats) {
+        setText('alerts-today', stats.alerts_today || 0);
+        setText('alerts-week', stats.alerts_week || 0);
+        setText('alert-count', stats.alerts_today || 0);
+        setText('last-update', new Date().toLocaleTimeString());
+    }
+
+    function escapeHtml(text) {
+        const element = document.createElement('div');
+        element.textContent = text;
+        return element.innerHTML;
+    }
+
+    function renderAlerts() {
+        const container = document.getElementById('recent-alerts');
+        if (!container) {
+            return;
+        }
+        if (!recentAlerts.length) {
+            container.innerHTML = '<p class="text-muted">No recent alerts</p>';
+            return;
+        }
+        container.innerHTML = recentAlerts.map((alert) => `
+            <div class="alert alert-${alert.severity === 'High' ? 'danger' : 'warning'} py-2 mb-2">
+                <strong>${escapeHtml(alert.time)}</strong> ${escapeHtml(alert.type)} in ${escapeHtml(alert.zone)}
+                <small class="text-muted">(${escapeHtml(alert.camera)}, ${escapeHtml(alert.confidence)}%)</small>
+            </div>`).join('');
+        setText('detection-count', recentAlerts.length);
+    }
 
-    socket.on('alert', (data) => {
-        alert(`New Alert: ${data.alert_type} in ${data.zone_name}`);
+    function addAlerts(detections) {
+        // Batches arrive oldest first, the list shows newest first
+        detections.forEach((detection) => recentAlerts.unshift(detection));
+        recentAlerts.splice(10);
+        renderAlerts();
+    }
+
+    function loadSnapshot() {
+        fetch('/status').then((response) => response.json()).then(renderStatus).catch(() => {});
+        fetch('/recent_alerts').then((response) => response.json()).then((alerts) => {
+            recentAlerts.splice(0, recentAlerts.length, ...alerts);
+            renderAlerts();
+        }).catch(() => {});
+    }
+
+    loadSnapshot();
+
+    // EventSource reconnects by itself and resumes with Last-Event-ID
+    const events = new EventSource('/events');
+
+    events.addEventListener('update', (event) => {
+        const batch = JSON.parse(event.data);
+        if (batch.detections) {
+            addAlerts(batch.detections);
+        }
+        if (batch.stats) {
+            renderStats(batch.stats);
+        }
+        if (batch.status) {
+            renderStatus(batch.status);
+        }
     });
+
+    // Missed too many updates: reload the current state instead
+    events.addEventListener('resync', loadSnapshot);
 });
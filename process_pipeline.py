@@ -0,0 +1,479 @@
+"""Process-based execution mode for the surveillance pipeline
+
+Capture and motion detection for each camera run in their own processes so
+they are not serialized on the GIL of the web process. Frames never travel
+through pipes: the capture process writes them into a SharedFrameRing
+(multiprocessing.shared_memory), the detection process reads them zero-copy,
+and only small result messages (sequence numbers and motion boxes) go through
+a queue. Overlays are kept as metadata, so no annotated copy is written.
+"""
+import multiprocessing as mp
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+from multiprocessing import shared_memory
+from camera_discovery import discover_camera
+from motion_engine import MotionDetector
+from video_sources import create_video_source
+
+
+class SharedFrameRing:
+    """FrameRingBuffer equivalent backed by shared memory
+
+    Layout: int64 header [latest_seq, seq per slot], float64 timestamp per
+    slot, then the frame slots. Header updates happen under a
+    multiprocessing.Condition that also wakes readers waiting for new frames,
+    so it has to be created before the worker processes are started and passed
+    to them.
+    """
+
+    def __init__(self, shm, size, shape, condition, dtype=np.uint8):
+        self.shm = shm
+        self.size = size
+        self.shape = tuple(shape)
+        self.condition = condition
+
+        header_bytes = 8 * (1 + size) + 8 * size
+        data_offset = (header_bytes + 63) // 64 * 64
+        self.header = np.ndarray((1 + size,), dtype=np.int64, buffer=shm.buf)
+        self.timestamps = np.ndarray((size,), dtype=np.float64, buffer=shm.buf, offset=8 * (1 + size))
+        self.slots = np.ndarray((size,) + self.shape, dtype=dtype, buffer=shm.buf, offset=data_offset)
+
+    @staticmethod
+    def required_bytes(size, shape, dtype=np.uint8):
+        header_bytes = 8 * (1 + size) + 8 * size
+        data_offset = (header_bytes + 63) // 64 * 64
+        return data_offset + size * int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+    @classmethod
+    def create(cls, size, shape, condition, dtype=np.uint8):
+        """Allocate a new shared ring"""
+        shm = shared_memory.SharedMemory(create=True, size=cls.required_bytes(size, shape, dtype))
+        ring = cls(shm, size, shape, condition, dtype)
+        ring.header.fill(-1)
+        ring.timestamps.fill(0)
+        return ring
+
+    @classmethod
+    def attach(cls, name, size, shape, condition, dtype=np.uint8):
+        """Map an existing shared ring created by another process"""
+        return cls(shared_memory.SharedMemory(name=name), size, shape, condition, dtype)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def latest_seq(self):
+        return int(self.header[0])
+
+    @property
+    def frame_shape(self):
+        return self.shape
+
+    def next_slot(self):
+        """Get the writable slot for the next frame"""
+        with self.condition:
+            index = (self.latest_seq + 1) % self.size
+            self.header[1 + index] = -1
+            return self.slots[index]
+
+    def commit(self, timestamp=None):
+        """Publish the slot returned by `next_slot` and return its sequence number"""
+        with self.condition:
+            seq = self.latest_seq + 1
+            index = seq % self.size
+            self.header[1 + index] = seq
+            self.timestamps[index] = timestamp if timestamp is not None else time.time()
+            self.header[0] = seq
+            self.condition.notify_all()
+            return seq
+
+    def write(self, frame, timestamp=None):
+        """Copy a frame into the next slot, resizing if the resolution changed"""
+        slot = self.next_slot()
+        if frame.shape == self.shape:
+            np.copyto(slot, frame)
+        else:
+            cv2.resize(frame, (self.shape[1], self.shape[0]), dst=slot)
+        return self.commit(timestamp)
+
+    def _packet(self, seq):
+        index = seq % self.size
+        if seq < 0 or self.header[1 + index] != seq:
+            return None
+        return seq, float(self.timestamps[index]), self.slots[index]
+
+    def latest(self):
+        """Get (seq, timestamp, frame) for the newest frame, or None if empty"""
+        with self.condition:
+            return self._packet(self.latest_seq)
+
+    def wait_for_frame(self, after_seq=-1, timeout=None):
+        """Block until a committed frame newer than `after_seq` exists"""
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.latest_seq > after_seq and self._packet(self.latest_seq) is not None, timeout)
+            if self.latest_seq <= after_seq:
+                return None
+            return self._packet(self.latest_seq)
+
+    def get(self, seq):
+        """Get (timestamp, frame) for a sequence number, or None if not available"""
+        with self.condition:
+            if seq > self.latest_seq:
+                return None
+            packet = self._packet(seq)
+            return packet[1:] if packet else None
+
+    def is_valid(self, seq):
+        """Check that a previously read frame has not been overwritten since"""
+        with self.condition:
+            return seq >= 0 and self.header[1 + seq % self.size] == seq
+
+    def reset(self):
+        """Drop all frames (sequence numbers keep increasing)"""
+        with self.condition:
+            self.header[1:] = -1
+            self.condition.notify_all()
+
+    def unlink(self):
+        """Remove the shared memory block once every process is done with it
+
+        The local mapping is left for the garbage collector: frame views handed
+        out earlier may still be referenced by stream consumers.
+        """
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def capture_worker(camera_id, source, backend, buffer_size, condition, events, stop_event,
+                   consumer_ready, consumer_timeout):
+    """Capture process: read a VideoSource into a shared ring
+
+    After the first frame it waits (up to `consumer_timeout` seconds) for
+    `consumer_ready`, so frames are not produced before the detection process
+    is there to read them.
+    """
+    video_source = create_video_source(source, backend)
+    ring = None
+    try:
+        if not video_source.open():
+            events.put(('failed', f"Failed to open {video_source.describe()}"))
+            return
+        ret, frame = video_source.read()
+        if not ret or frame is None:
+            events.put(('failed', "Camera opened but cannot read frames"))
+            return
+
+        ring = SharedFrameRing.create(buffer_size, frame.shape, condition)
+        ring.write(frame)
+        events.put(('ready', ring.name, frame.shape, video_source.describe()))
+
+        # Hold at the first frame until the detection process reads the ring
+        deadline = time.time() + consumer_timeout
+        while not consumer_ready.wait(0.1) and not stop_event.is_set() and time.time() < deadline:
+            pass
+
+        frames_captured = 1
+        read_failures = 0
+        reconnects = 0
+        last_fps_time = time.time()
+
+        while not stop_event.is_set():
+            if video_source.finished:
+                events.put(('finished', frames_captured))
+                break
+
+            if not video_source.is_opened():
+                reconnects += 1
+                if not video_source.open():
+                    time.sleep(1)
+                    continue
+
+            # Decode straight into the shared slot when the shape matches
+            slot = ring.next_slot()
+            ret, frame = video_source.read(slot)
+            if not ret or frame is None:
+                read_failures += 1
+                time.sleep(0.1)
+                continue
+            if frame is not slot:
+                ring.write(frame)
+            else:
+                ring.commit(time.time())
+
+            frames_captured += 1
+            if frames_captured % 30 == 0:
+                current_time = time.time()
+                fps = 30 / (current_time - last_fps_time)
+                last_fps_time = current_time
+                events.put(('stats', fps, frames_captured, read_failures, reconnects))
+    except Exception as e:
+        events.put(('failed', f"Capture process error: {e}"))
+    finally:
+        video_source.release()
+
+
+def detection_worker(camera_id, capture_name, shape, buffer_size,
+                     capture_condition, events, stop_event, consumer_ready, motion_options):
+    """Detection process: motion detection on the shared capture ring
+
+    Only the blobs are sent back; the parent reads the untouched frame from
+    the same shared ring and keeps the overlays as metadata. `consumer_ready`
+    is set once the detector is built, releasing the capture process.
+    """
+    capture_ring = SharedFrameRing.attach(capture_name, buffer_size, shape, capture_condition)
+    detector = MotionDetector(**motion_options)
+    last_seq = -1
+    consumer_ready.set()
+
+    while not stop_event.is_set():
+        try:
+            packet = capture_ring.wait_for_frame(last_seq, timeout=0.5)
+            if packet is None:
+                continue
+            seq, timestamp, frame = packet
+            last_seq = seq
+
+            blobs = detector.detect(frame)
+            events.put(('result', seq, timestamp, blobs))
+        except Exception as e:
+            events.put(('error', f"Detection process error: {e}"))
+            time.sleep(0.1)
+
+
+class ProcessCamera:
+    """CameraDebugger-compatible camera whose capture and detection run in processes"""
+
+    def __init__(self, camera_id='default', source=None, backend=None, buffer_size=8,
+                 probe_cache_path=None, probe_timeout=2.0, open_timeout=10.0, consumer_timeout=30.0,
+                 start_method='spawn'):
+        self.camera_id = camera_id
+        self.source = source
+        self.backend = backend
+        self.auto_detect = source is None
+        self.buffer_size = buffer_size
+        self.probe_cache_path = probe_cache_path
+        self.probe_timeout = probe_timeout
+        self.open_timeout = open_timeout
+        # Capture holds at the first frame until detection runs (or this long)
+        self.consumer_timeout = consumer_timeout
+        self.context = mp.get_context(start_method)
+
+        self.frame_buffer = None  # SharedFrameRing mapped in this process
+        self.capture_process = None
+        self.detection_process = None
+        self.event_thread = None
+        self.on_result = None
+        self.running = False
+        self.ready = threading.Event()
+
+        # Health state
+        self.state = 'stopped'
+        self.fps = 0.0
+        self.frames_captured = 0
+        self.read_failures = 0
+        self.reconnects = 0
+        self.results_without_frame = 0  # results whose frame was overwritten first
+        self.last_frame_time = None
+
+    def start_camera(self):
+        """Start the capture process and wait for its first frame"""
+        if self.running:
+            print(f"⚠️ [{self.camera_id}] Camera is already running")
+            return True
+
+        self.state = 'connecting'
+        self.ready.clear()
+
+        source, backend = self.source, self.backend
+        if self.auto_detect:
+            camera_source = discover_camera(timeout=self.probe_timeout, cache_path=self.probe_cache_path)
+            if camera_source is None:
+                print("❌ No working camera found!")
+                self.state = 'failed'
+                return False
+            source, backend = camera_source if isinstance(camera_source, tuple) else (camera_source, None)
+
+        self.events = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.consumer_ready = self.context.Event()
+        self.capture_condition = self.context.Condition()
+
+        self.capture_process = self.context.Process(
+            target=capture_worker,
+            args=(self.camera_id, source, backend, self.buffer_size,
+                  self.capture_condition, self.events, self.stop_event,
+                  self.consumer_ready, self.consumer_timeout),
+            name=f"capture-{self.camera_id}", daemon=True
+        )
+        self.capture_process.start()
+
+        try:
+            message = self.events.get(timeout=self.open_timeout)
+        except queue.Empty:
+            message = ('failed', f"No frame within {self.open_timeout:.0f}s")
+
+        if message[0] != 'ready':
+            print(f"❌ [{self.camera_id}] {message[1]}")
+            self._stop_processes()
+            self.state = 'failed'
+            return False
+
+        _, ring_name, shape, description = message
+        self.frame_buffer = SharedFrameRing.attach(ring_name, self.buffer_size, shape, self.capture_condition)
+        self.last_frame_time = time.time()
+        self.frames_captured = 1
+        self.running = True
+        self.state = 'running'
+        self.ready.set()
+
+        self.event_thread = threading.Thread(target=self._event_loop, daemon=True,
+                                             name=f"events-{self.camera_id}")
+        self.event_thread.start()
+
+        print(f"🚀 [{self.camera_id}] Capture process started ({description}, pid {self.capture_process.pid})")
+        return True
+
+    def start_detection(self, motion_options, on_result):
+        """Start the detection process
+
+        Capture resumes after its first frame once the detection process is
+        ready. `motion_options` are MotionDetector keyword arguments.
+        `on_result(seq, frame, blobs, timestamp)` is called from an event
+        thread in this process for every analyzed frame; frame is a view into
+        the shared capture ring, or None if it was overwritten before this
+        process got to it.
+        """
+        self.on_result = on_result
+        self.detection_process = self.context.Process(
+            target=detection_worker,
+            args=(self.camera_id, self.frame_buffer.name, self.frame_buffer.shape, self.buffer_size,
+                  self.capture_condition, self.events, self.stop_event, self.consumer_ready, motion_options),
+            name=f"detection-{self.camera_id}", daemon=True
+        )
+        self.detection_process.start()
+        print(f"🔍 [{self.camera_id}] Detection process started (pid {self.detection_process.pid})")
+
+    def _event_loop(self):
+        """Relay worker messages (results, stats, failures) into this process"""
+        while self.running:
+            try:
+                message = self.events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            kind = message[0]
+            if kind == 'result':
+                _, seq, timestamp, blobs = message
+                packet = self.frame_buffer.get(seq) if self.frame_buffer else None
+                if packet is None:
+                    # Overwritten before this process got to it: the motion is
+                    # still reported, only the frame is gone
+                    self.results_without_frame += 1
+                if self.on_result:
+                    try:
+                        self.on_result(seq, packet[1] if packet else None, blobs, timestamp)
+                    except Exception as e:
+                        print(f"❌ [{self.camera_id}] Result handler error: {e}")
+            elif kind == 'stats':
+                _, self.fps, self.frames_captured, self.read_failures, self.reconnects = message
+                self.last_frame_time = time.time()
+                print(f"📹 [{self.camera_id}] Camera FPS: {self.fps:.1f}")
+            elif kind == 'finished':
+                self.frames_captured = message[1]
+                self.state = 'finished'
+                print(f"🏁 [{self.camera_id}] Source finished after {self.frames_captured} frames")
+            elif kind in ('failed', 'error'):
+                print(f"❌ [{self.camera_id}] {message[1]}")
+                if kind == 'failed':
+                    # The capture process gave up; stop the detection process too
+                    self.state = 'failed'
+                    self.running = False
+                    self.ready.clear()
+                    self._stop_processes()
+
+    def _stop_processes(self):
+        """Signal, join and if needed terminate the worker processes"""
+        if getattr(self, 'stop_event', None) is not None:
+            self.stop_event.set()
+        for process in (self.detection_process, self.capture_process):
+            if process is None:
+                continue
+            process.join(timeout=2)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout=1)
+        self.detection_process = None
+        self.capture_process = None
+
+    def stop_camera(self):
+        """Stop the worker processes and release the shared memory"""
+        self.running = False
+        self.ready.clear()
+        self._stop_processes()
+
+        if self.event_thread and self.event_thread.is_alive():
+            self.event_thread.join(timeout=2)
+
+        if self.frame_buffer is not None:
+            self.frame_buffer.unlink()
+
+        self.state = 'stopped'
+        self.fps = 0.0
+        print(f"🛑 [{self.camera_id}] Camera stopped")
+
+    @property
+    def current_frame(self):
+        """Latest captured frame (a view into shared memory)"""
+        return self.get_current_frame()
+
+    def get_current_frame(self):
+        """Get current frame"""
+        packet = self.get_latest_packet()
+        return packet[2] if packet else None
+
+    def get_latest_packet(self):
+        """Get (seq, timestamp, frame) for the latest captured frame"""
+        if not self.running or self.frame_buffer is None:
+            return None
+        return self.frame_buffer.latest()
+
+    def get_frame(self, seq):
+        """Get (timestamp, frame) for a specific sequence number if still buffered"""
+        if not self.running or self.frame_buffer is None:
+            return None
+        return self.frame_buffer.get(seq)
+
+    def wait_until_ready(self, timeout=None):
+        """Block until the first frame has been captured"""
+        return self.ready.wait(timeout)
+
+    def is_camera_working(self):
+        """Check if camera is working"""
+        return self.running and self.get_latest_packet() is not None
+
+    def get_health(self):
+        """Get per-camera health and FPS state"""
+        return {
+            'camera_id': self.camera_id,
+            'source': str(self.source) if self.source is not None else 'auto',
+            'state': self.state,
+            'working': self.is_camera_working(),
+            'fps': round(self.fps, 1),
+            'frames_captured': self.frames_captured,
+            'latest_seq': self.frame_buffer.latest_seq if self.frame_buffer is not None else -1,
+            'read_failures': self.read_failures,
+            'reconnects': self.reconnects,
+            'results_without_frame': self.results_without_frame,
+            'last_frame_age': round(time.time() - self.last_frame_time, 2) if self.last_frame_time else None,
+            'capture_pid': self.capture_process.pid if self.capture_process else None,
+            'detection_pid': self.detection_process.pid if self.detection_process else None
+        }
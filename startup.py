@@ -0,0 +1,68 @@
+import threading
+import time
+
+
+class BackgroundLoader:
+    """Build an expensive object in a background thread and report readiness
+
+    Lets the web server come up (and answer health checks) right away while
+    heavy imports, camera setup and model warm-up run in `factory`.
+    """
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.value = None
+        self.error = None
+        self.state = 'pending'
+        self.started_at = None
+        self.finished_at = None
+        self.loaded = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        """Start loading (only once)"""
+        with self.lock:
+            if self.thread is None:
+                self.state = 'loading'
+                self.started_at = time.time()
+                self.thread = threading.Thread(target=self._load, daemon=True, name=f"load-{self.name}")
+                self.thread.start()
+        return self
+
+    def _load(self):
+        try:
+            self.value = self.factory()
+            self.state = 'ready'
+            print(f"✅ {self.name} ready in {time.time() - self.started_at:.2f}s")
+        except Exception as e:
+            self.error = str(e)
+            self.state = 'failed'
+            print(f"❌ Failed to load {self.name}: {e}")
+        finally:
+            self.finished_at = time.time()
+            self.loaded.set()
+
+    @property
+    def ready(self):
+        return self.state == 'ready'
+
+    def get(self, timeout=0):
+        """Get the loaded object, waiting up to `timeout` seconds; None if not ready"""
+        if not self.loaded.wait(timeout):
+            return None
+        return self.value
+
+    def status(self):
+        """Get the loading state for health/readiness endpoints"""
+        if self.started_at is None:
+            load_seconds = None
+        else:
+            load_seconds = round((self.finished_at or time.time()) - self.started_at, 3)
+        return {
+            'state': self.state,
+            'ready': self.ready,
+            'error': self.error,
+            'load_seconds': load_seconds
+        }
@@ -0,0 +1,180 @@
+import threading
+import time
+from collections import OrderedDict
+import cv2
+
+
+class StreamHub:
+    """Encode each processed frame once and share the JPEG bytes with every viewer
+
+    Viewers ask for the next frame after the sequence number they last sent.
+    The first viewer to see a new frame encodes it; everyone else watching the
+    same camera with the same variant (size, quality and whether overlays
+    are burned in) gets the cached bytes. Overlays are rendered from the
+    frame's metadata only for variants that ask for them. A slow viewer just
+    gets the newest frame when it asks again, skipping the ones it missed.
+    At most `max_variants` variants are kept; the least recently used one is
+    evicted.
+    """
+
+    def __init__(self, surveillance, default_quality=85, max_variants=16):
+        self.surveillance = surveillance
+        self.default_quality = default_quality
+        self.max_variants = max_variants
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.viewers = {}
+
+        # Statistics
+        self.frames_encoded = 0
+        self.frames_served = 0
+
+    def _entry(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                # 'encoded' is replaced as one (seq, bytes) tuple so cached() can read it unlocked
+                entry = self.entries[key] = {'lock': threading.Lock(), 'encoded': (-1, None)}
+                while len(self.entries) > self.max_variants:
+                    self.entries.popitem(last=False)
+            self.entries.move_to_end(key)
+            return entry
+
+    @staticmethod
+    def _resize(frame, width, height):
+        """Downscale a frame to the requested size (aspect kept if one side is missing)"""
+        frame_h, frame_w = frame.shape[:2]
+        if width and not height:
+            height = round(frame_h * width / frame_w)
+        elif height and not width:
+            width = round(frame_w * height / frame_h)
+        if not width or (width >= frame_w and height >= frame_h):
+            return frame
+        return cv2.resize(frame, (min(width, frame_w), min(height, frame_h)), interpolation=cv2.INTER_AREA)
+
+    def encode(self, camera_id, seq, frame, quality=None, width=None, height=None,
+               overlay=False, metadata=None):
+        """Get the JPEG bytes of a frame, encoding it only once per variant
+
+        `frame` is the untouched capture frame (a ring buffer view); with
+        `overlay` the metadata overlays are drawn into the resized copy.
+        Returns (seq, bytes); seq may be newer than requested if another
+        viewer already encoded a later frame. The bytes are None if the frame
+        could not be encoded or was overwritten in the ring buffer meanwhile;
+        the viewer should skip that seq.
+        """
+        quality = quality or self.default_quality
+        entry = self._entry((camera_id, quality, width, height, overlay))
+        with entry['lock']:
+            if seq > entry['encoded'][0]:
+                source = frame
+                frame = self._resize(frame, width, height)
+                if overlay and metadata is not None:
+                    if frame is source:
+                        frame = frame.copy()
+                    self.surveillance.draw_overlay(frame, metadata, frame.shape[1] / source.shape[1])
+                ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+                if not ret or not self.surveillance.is_frame_current(camera_id, seq):
+                    return seq, None
+                entry['encoded'] = (seq, buffer.tobytes())
+                self.frames_encoded += 1
+            self.frames_served += 1
+            return entry['encoded']
+
+    def cached(self, camera_id, seq, quality=None, width=None, height=None, overlay=False):
+        """Get (seq, bytes) if this variant already has frame `seq` or a newer one, else None
+
+        Never encodes and never waits for an encode in progress, so it can be
+        called from an event loop; on None, call encode() off the loop.
+        """
+        key = (camera_id, quality or self.default_quality, width, height, overlay)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry['encoded'][0] < seq:
+                return None
+            self.entries.move_to_end(key)
+            self.frames_served += 1
+            return entry['encoded']
+
+    def next_frame(self, camera_id, after_seq, quality=None, width=None, height=None,
+                   overlay=True, timeout=0.5):
+        """Wait for a frame newer than `after_seq` and get it as (seq, jpeg bytes)"""
+        camera_id = camera_id or self.surveillance.default_camera_id()
+        packet = self.surveillance.wait_for_frame_packet(camera_id, after_seq, timeout=timeout)
+        if packet is None:
+            return None
+        seq, frame, metadata = packet
+        return self.encode(camera_id, seq, frame, quality, width, height, overlay, metadata)
+
+    def add_viewer(self, camera_id):
+        camera_id = camera_id or self.surveillance.default_camera_id()
+        with self.lock:
+            self.viewers[camera_id] = self.viewers.get(camera_id, 0) + 1
+
+    def remove_viewer(self, camera_id):
+        camera_id = camera_id or self.surveillance.default_camera_id()
+        with self.lock:
+            self.viewers[camera_id] = max(0, self.viewers.get(camera_id, 0) - 1)
+
+    def reset(self):
+        """Drop cached frames (sequence numbers restart when surveillance restarts)"""
+        with self.lock:
+            self.entries = OrderedDict()
+
+    def get_stats(self):
+        """Get encoding and viewer statistics"""
+        return {
+            'viewers': {camera_id: count for camera_id, count in self.viewers.items() if count},
+            'variants': len(self.entries),
+            'frames_encoded': self.frames_encoded,
+            'frames_served': self.frames_served,
+            'encodes_saved': self.frames_served - self.frames_encoded
+        }
+
+
+class AdaptiveProfile:
+    """Pick a stream profile for one client from how long sends to it block
+
+    `ladder` lists profile names from best to cheapest. Every `window`
+    seconds the share of time spent blocked writing to the client is checked:
+    above `congested` the profile steps down at once, below `idle` for
+    `upgrade_windows` windows in a row it steps back up.
+    """
+
+    def __init__(self, ladder, window=2.0, congested=0.5, idle=0.1, upgrade_windows=5):
+        self.ladder = ladder
+        self.window = window
+        self.congested = congested
+        self.idle = idle
+        self.upgrade_windows = upgrade_windows
+        self.index = 0
+        self.window_start = time.time()
+        self.blocked = 0.0
+        self.idle_windows = 0
+
+    @property
+    def profile(self):
+        return self.ladder[self.index]
+
+    def record_send(self, seconds, now=None):
+        """Record how long one frame took to write to the client"""
+        now = now if now is not None else time.time()
+        self.blocked += seconds
+        elapsed = now - self.window_start
+        if elapsed < self.window:
+            return
+
+        blocked_share = self.blocked / elapsed
+        if blocked_share > self.congested and self.index < len(self.ladder) - 1:
+            self.index += 1
+            self.idle_windows = 0
+        elif blocked_share < self.idle and self.index > 0:
+            self.idle_windows += 1
+            if self.idle_windows >= self.upgrade_windows:
+                self.index -= 1
+                self.idle_windows = 0
+        else:
+            self.idle_windows = 0
+
+        self.window_start = now
+        self.blocked = 0.0
@@ -0,0 +1,126 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class BatchCollector:
+    """Gather frames from one or more cameras into batched detector calls
+
+    Callers submit single frames and get a Future back. A worker thread waits
+    for the first frame, then keeps collecting until `max_batch_size` frames
+    are queued or `max_wait` seconds have passed, and runs them through
+    `ObjectDetector.detect_objects_batch` with one model call per requested
+    input size (`imgsz`, e.g. smaller for ROI crops). Each future gets the
+    detections of its own frame.
+    """
+
+    def __init__(self, detector, max_batch_size=8, max_wait=0.02):
+        self.detector = detector
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.running = False
+        self.worker_thread = None
+
+        # Statistics
+        self.batches_run = 0
+        self.frames_processed = 0
+        self.last_batch_size = 0
+        self.last_batch_latency = 0.0
+
+    def start(self):
+        """Start the batching worker thread"""
+        if self.running:
+            return
+        self.running = True
+        self.worker_thread = threading.Thread(target=self._worker, daemon=True, name="batch-collector")
+        self.worker_thread.start()
+
+    def stop(self):
+        """Stop the worker and fail any frames still waiting"""
+        self.running = False
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.worker_thread.join(timeout=2)
+
+        while True:
+            try:
+                _, _, _, future = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            future.cancel()
+
+    def submit(self, frame, camera_id=None, imgsz=None):
+        """Queue a frame for detection and return a Future of its detections
+
+        `imgsz` overrides the model input size for this frame (None for the
+        model default); frames are only batched with others of the same size.
+        """
+        if not self.running:
+            self.start()
+        future = Future()
+        self.queue.put((camera_id, frame, imgsz, future))
+        return future
+
+    def detect(self, frame, camera_id=None, timeout=None, imgsz=None):
+        """Blocking convenience wrapper around submit()"""
+        return self.submit(frame, camera_id, imgsz).result(timeout)
+
+    def _collect_batch(self):
+        """Block for the first item, then gather more until full or timed out"""
+        try:
+            batch = [self.queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        deadline = time.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        """Run collected batches through the detector"""
+        while self.running:
+            batch = self._collect_batch()
+            batch = [item for item in batch if item[3].set_running_or_notify_cancel()]
+
+            # One model call per input size
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[2], []).append(item)
+
+            for imgsz, group in groups.items():
+                start_time = time.time()
+                try:
+                    results = self.detector.detect_objects_batch([frame for _, frame, _, _ in group], imgsz=imgsz)
+                except Exception as e:
+                    logging.error(f"Batch detection failed: {str(e)}")
+                    for _, _, _, future in group:
+                        future.set_exception(e)
+                    continue
+
+                for (_, _, _, future), detections in zip(group, results):
+                    future.set_result(detections)
+
+                self.batches_run += 1
+                self.frames_processed += len(group)
+                self.last_batch_size = len(group)
+                self.last_batch_latency = time.time() - start_time
+
+    def get_stats(self):
+        """Get batching statistics"""
+        return {
+            'batches_run': self.batches_run,
+            'frames_processed': self.frames_processed,
+            'average_batch_size': round(self.frames_processed / self.batches_run, 2) if self.batches_run else 0,
+            'last_batch_size': self.last_batch_size,
+            'last_batch_latency_ms': round(self.last_batch_latency * 1000, 1),
+            'queued': self.queue.qsize()
+        }
@@ -0,0 +1,81 @@
+import time
+import cv2
+import numpy as np
+
+
+class DetectionCache:
+    """Reuse the last detections while a camera's scene is unchanged
+
+    Each frame is reduced to a tiny grayscale fingerprint (each cell is the
+    mean of a block of pixels). While its mean absolute difference from the
+    fingerprint of the last inferred frame stays under `threshold` and no
+    single cell changed by `cell_threshold` or more (gray levels, so a small
+    object moving still counts), the cached detections are returned instead
+    of running the model. Entries older than `refresh_interval` seconds are
+    always refreshed, so slow drift can't keep stale results alive.
+    """
+
+    def __init__(self, threshold=3.0, cell_threshold=12.0, refresh_interval=5.0, fingerprint_size=(32, 24)):
+        self.threshold = threshold
+        self.cell_threshold = cell_threshold
+        self.refresh_interval = refresh_interval
+        self.fingerprint_size = fingerprint_size
+        self.reset()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.last_difference = None
+
+    def reset(self):
+        """Forget the cached entry"""
+        self.cached_fingerprint = None
+        self.cached_detections = None
+        self.cached_time = None
+
+    def fingerprint(self, frame):
+        """Downsampled grayscale fingerprint of a frame"""
+        small = cv2.resize(frame, self.fingerprint_size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small.astype(np.int16)
+
+    def lookup(self, fingerprint, now=None):
+        """Get cached detections for a similar frame, or None when inference is needed"""
+        now = now if now is not None else time.time()
+        if self.cached_fingerprint is None or fingerprint.shape != self.cached_fingerprint.shape:
+            self.misses += 1
+            return None
+
+        if now - self.cached_time >= self.refresh_interval:
+            # Forced refresh even if the scene looks the same
+            self.refreshes += 1
+            self.misses += 1
+            return None
+
+        difference = np.abs(fingerprint - self.cached_fingerprint)
+        self.last_difference = float(difference.mean())
+        if self.last_difference >= self.threshold or difference.max() >= self.cell_threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self.cached_detections
+
+    def store(self, fingerprint, detections, now=None):
+        """Remember the detections of a freshly inferred frame"""
+        self.cached_fingerprint = fingerprint
+        self.cached_detections = detections
+        self.cached_time = now if now is not None else time.time()
+
+    def get_stats(self):
+        """Get hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'forced_refreshes': self.refreshes,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0,
+            'last_difference': round(self.last_difference, 2) if self.last_difference is not None else None
+        }
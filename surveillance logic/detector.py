@@ -1,18 +1,115 @@
 import cv2
 import numpy as np
-from ultralytics import YOLO
 import logging
+import threading
+import time
 from datetime import datetime
 import os
 
+# Per-frame detection results: one row per box instead of one dict per box
+DETECTION_DTYPE = np.dtype([
+    ('bbox', np.int32, (4,)),  # x1, y1, x2, y2 in frame pixels
+    ('confidence', np.float32),
+    ('class_id', np.int32)
+])
+
+HUMAN_CLASSES = ['person']  # YOLO class name for humans
+
+
+def empty_detections():
+    """Get an empty detection array"""
+    return np.empty(0, dtype=DETECTION_DTYPE)
+
+
+def detection_centers(detections):
+    """Get the (N, 2) bbox center points of a detection array"""
+    bboxes = detections['bbox']
+    return np.stack([(bboxes[:, 0] + bboxes[:, 2]) // 2,
+                     (bboxes[:, 1] + bboxes[:, 3]) // 2], axis=1)
+
+
+def zone_rois(zones, frame_shape):
+    """Pixel bounding rectangles (x1, y1, x2, y2) of normalized zone polygons"""
+    h, w = frame_shape[:2]
+    rois = []
+    for zone in zones:
+        coords = np.array(zone['coords'], dtype=np.float64) * [w, h]
+        x1, y1 = np.floor(coords.min(axis=0)).astype(int)
+        x2, y2 = np.ceil(coords.max(axis=0)).astype(int)
+        rois.append((int(x1), int(y1), int(x2), int(y2)))
+    return rois
+
+
+def merge_rois(rects, frame_shape, padding=32):
+    """Pad rectangles, clip them to the frame and merge any that overlap
+    
+    Returns non-overlapping (x1, y1, x2, y2) rectangles so no region of the
+    frame is run through the detector twice.
+    """
+    h, w = frame_shape[:2]
+    boxes = [[max(0, x1 - padding), max(0, y1 - padding), min(w, x2 + padding), min(h, y2 + padding)]
+             for x1, y1, x2, y2 in rects]
+    boxes = [box for box in boxes if box[2] > box[0] and box[3] > box[1]]
+    
+    merged = True
+    while merged and len(boxes) > 1:
+        merged = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    boxes[i] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                    del boxes[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return [tuple(box) for box in boxes]
+
+
 class ObjectDetector:
-    def __init__(self, model_path='models/yolov8n.pt', confidence_threshold=0.5):
+    def __init__(self, model_path='models/yolov8n.pt', confidence_threshold=0.5,
+                 backend='ultralytics', int8=False, num_threads=0, warmup_runs=2, warmup_shape=(480, 640),
+                 load_async=False):
         self.model_path = model_path
         self.confidence_threshold = confidence_threshold
         self.nms_threshold = 0.4
+        self.backend = backend
+        self.int8 = int8
+        self.num_threads = num_threads
+        self.warmup_runs = warmup_runs
+        self.warmup_shape = warmup_shape
         self.model = None
+        self.runtime = None
         self.class_names = []
-        self.load_model()
+        self.human_class_ids = np.empty(0, dtype=np.int32)
+        
+        # With load_async the model loads and warms up in a background thread;
+        # detection returns no results until it is ready (or for good if
+        # loading failed, see load_error)
+        self.loaded = threading.Event()
+        self.load_error = None
+        self.loader_thread = None
+        if load_async:
+            self.loader_thread = threading.Thread(target=self._load_in_background, daemon=True, name="model-loader")
+            self.loader_thread.start()
+        else:
+            self.load_model()
+    
+    def _load_in_background(self):
+        try:
+            self.load_model()
+        except Exception as e:
+            self.load_error = str(e)
+            logging.error(f"Model failed to load, object detection is disabled: {self.load_error}")
+    
+    def is_ready(self):
+        """Check if the model is loaded and warmed up"""
+        return self.loaded.is_set()
+    
+    def wait_until_ready(self, timeout=None):
+        """Block until the model is loaded; returns False on timeout"""
+        return self.loaded.wait(timeout)
     
     def load_model(self):
         """Load YOLO model"""
@@ -20,49 +117,141 @@ class ObjectDetector:
             # Ensure models directory exists
             os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
             
-            # Load YOLO model (will download if not exists)
-            self.model = YOLO(self.model_path)
-            self.class_names = self.model.names
-            logging.info(f"Model loaded successfully: {self.model_path}")
+            if self.backend == 'onnxruntime':
+                # Exported ONNX (cached next to the .pt) on a tuned ORT session
+                from inference_backend import OnnxRuntimeModel, export_model
+                self.runtime = OnnxRuntimeModel(
+                    export_model(self.model_path, 'onnxruntime', self.int8), self.num_threads
+                )
+                self.class_names = self.runtime.names
+                loaded_path = self.runtime.path
+            elif self.backend == 'openvino':
+                from inference_backend import export_model
+                from ultralytics import YOLO
+                loaded_path = export_model(self.model_path, 'openvino')
+                self.model = YOLO(loaded_path, task='detect')
+                self.class_names = self.model.names
+            else:
+                # Load YOLO model (will download if not exists)
+                from ultralytics import YOLO
+                self.model = YOLO(self.model_path)
+                self.class_names = self.model.names
+                loaded_path = self.model_path
+            
+            self.human_class_ids = np.array(
+                [class_id for class_id, name in self.class_names.items() if name in HUMAN_CLASSES],
+                dtype=np.int32
+            )
+            logging.info(f"Model loaded successfully: {loaded_path} ({self.backend})")
+            self.warmup()
+            self.loaded.set()
             
         except Exception as e:
             logging.error(f"Error loading model: {str(e)}")
             raise
     
+    def warmup(self):
+        """Run dummy frames so the first real frame doesn't pay for lazy initialization"""
+        if self.warmup_runs <= 0:
+            return
+        frame = np.zeros((*self.warmup_shape, 3), dtype=np.uint8)
+        start_time = time.time()
+        for _ in range(self.warmup_runs):
+            self._predict([frame])
+        logging.info(f"Model warm-up done in {time.time() - start_time:.2f}s")
+    
+    def _predict(self, frames, imgsz=None):
+        """Run the loaded backend on a list of frames, one detection array per frame"""
+        if self.runtime is not None:
+            return self.runtime.predict(frames, conf=self.confidence_threshold, imgsz=imgsz)
+        
+        options = {'imgsz': imgsz} if imgsz else {}
+        results = self.model(list(frames), conf=self.confidence_threshold, verbose=False, **options)
+        return [self._parse_result(result) for result in results]
+    
     def detect_objects(self, frame):
         """Detect objects in frame"""
+        if not self.loaded.is_set():
+            return empty_detections()
+        
         try:
             # Run inference
-            results = self.model(frame, conf=self.confidence_threshold, verbose=False)
-            
-            detections = []
-            for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # Get coordinates
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        confidence = box.conf[0].cpu().numpy()
-                        class_id = int(box.cls[0].cpu().numpy())
-                        class_name = self.class_names[class_id]
-                        
-                        detections.append({
-                            'bbox': [int(x1), int(y1), int(x2), int(y2)],
-                            'confidence': float(confidence),
-                            'class_id': class_id,
-                            'class_name': class_name
-                        })
-            
-            return detections
+            return self._predict([frame])[0]
             
         except Exception as e:
             logging.error(f"Detection error: {str(e)}")
+            return empty_detections()
+    
+    def detect_objects_batch(self, frames, imgsz=None):
+        """Detect objects in several frames with a single model call
+        
+        Frames may come from different cameras and have different sizes.
+        Returns one detection array per frame, in the same order. `imgsz`
+        overrides the model input size (smaller crops can run smaller).
+        """
+        if not frames:
             return []
+        if not self.loaded.is_set():
+            return [empty_detections() for _ in frames]
+        
+        try:
+            return self._predict(frames, imgsz)
+            
+        except Exception as e:
+            logging.error(f"Batch detection error: {str(e)}")
+            return [empty_detections() for _ in frames]
+    
+    def detect_objects_roi(self, frame, rois, max_coverage=0.6, detect_batch=None):
+        """Detect objects only inside regions of interest
+        
+        `rois` are non-overlapping (x1, y1, x2, y2) pixel rectangles (see
+        merge_rois). Crops run through one batched call at an input size
+        matching the largest crop, and boxes are shifted back to frame
+        coordinates. Falls back to the full frame when the regions cover more
+        than `max_coverage` of it, and returns nothing when there are none.
+        `detect_batch(frames, imgsz)` replaces both model calls, including the
+        full-frame fallback (e.g. to go through a BatchCollector).
+        """
+        if not rois:
+            return empty_detections()
+        
+        frame_area = frame.shape[0] * frame.shape[1]
+        roi_area = sum((x2 - x1) * (y2 - y1) for x1, y1, x2, y2 in rois)
+        if roi_area > max_coverage * frame_area:
+            if detect_batch is not None:
+                return detect_batch([frame], None)[0]
+            return self.detect_objects(frame)
+        
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in rois]
+        longest_side = max(max(crop.shape[:2]) for crop in crops)
+        imgsz = min(640, (longest_side + 31) // 32 * 32)
+        
+        if detect_batch is not None:
+            results = detect_batch(crops, imgsz)
+        else:
+            results = self.detect_objects_batch(crops, imgsz=imgsz)
+        
+        for (x1, y1, _, _), detections in zip(rois, results):
+            detections['bbox'] += np.array([x1, y1, x1, y1], dtype=np.int32)
+        return np.concatenate([empty_detections()] + list(results))
+    
+    def _parse_result(self, result):
+        """Convert one Ultralytics result into a DETECTION_DTYPE array"""
+        boxes = result.boxes
+        if boxes is None or len(boxes) == 0:
+            return empty_detections()
+        
+        # One device-to-host transfer for all boxes: x1, y1, x2, y2, [track id,] conf, cls
+        data = boxes.data.cpu().numpy()
+        detections = np.empty(len(data), dtype=DETECTION_DTYPE)
+        detections['bbox'] = data[:, :4]
+        detections['confidence'] = data[:, -2]
+        detections['class_id'] = data[:, -1]
+        return detections
     
     def filter_human_detections(self, detections):
         """Filter only human detections"""
-        human_classes = ['person']  # YOLO class name for humans
-        return [det for det in detections if det['class_name'] in human_classes]
+        return detections[np.isin(detections['class_id'], self.human_class_ids)]
     
     def draw_detections(self, frame, detections, zones=None):
         """Draw detection boxes and zones on frame"""
@@ -78,11 +267,16 @@ class ObjectDetector:
                            (pts[0][0], pts[0][1] - 10),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
         
+        # Tracked detections carry a stable id
+        track_ids = (detections['track_id'].tolist() if 'track_id' in detections.dtype.names
+                     else [None] * len(detections))
+        
         # Draw detections
-        for detection in detections:
-            x1, y1, x2, y2 = detection['bbox']
-            confidence = detection['confidence']
-            class_name = detection['class_name']
+        for (x1, y1, x2, y2), confidence, class_id, track_id in zip(detections['bbox'].tolist(),
+                                                                    detections['confidence'].tolist(),
+                                                                    detections['class_id'].tolist(),
+                                                                    track_ids):
+            class_name = self.class_names[class_id]
             
             # Choose color based on class
             color = (0, 255, 0) if class_name == 'person' else (255, 0, 0)
@@ -92,6 +286,8 @@ class ObjectDetector:
             
             # Draw label
             label = f"{class_name}: {confidence:.2f}"
+            if track_id is not None:
+                label = f"#{track_id} {label}"
             label_size = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
             cv2.rectangle(annotated_frame, (x1, y1 - label_size[1] - 10), 
                          (x1 + label_size[0], y1), color, -1)
@@ -100,16 +296,23 @@ class ObjectDetector:
         
         return annotated_frame
     
-    def is_in_zone(self, detection_bbox, zone_coords, frame_shape):
-        """Check if detection is within a zone"""
-        x1, y1, x2, y2 = detection_bbox
-        center_x = (x1 + x2) // 2
-        center_y = (y1 + y2) // 2
-        
-        # Convert zone coordinates to pixel coordinates
-        zone_pixels = [(int(x * frame_shape[1]), int(y * frame_shape[0])) 
-                      for x, y in zone_coords]
-        
-        # Check if center point is inside polygon
-        return cv2.pointPolygonTest(np.array(zone_pixels, np.int32), 
-                                   (center_x, center_y), False) >= 0
\ No newline at end of file
+    def describe_detections(self, detections):
+        """Detections as JSON-friendly overlay boxes with the labels draw_detections uses"""
+        track_ids = (detections['track_id'].tolist() if 'track_id' in detections.dtype.names
+                     else [None] * len(detections))
+        boxes = []
+        for bbox, confidence, class_id, track_id in zip(detections['bbox'].tolist(),
+                                                        detections['confidence'].tolist(),
+                                                        detections['class_id'].tolist(),
+                                                        track_ids):
+            label = f"{self.class_names[class_id]}: {confidence:.2f}"
+            if track_id is not None:
+                label = f"#{track_id} {label}"
+            boxes.append({
+                'bbox': [int(value) for value in bbox],
+                'label': label,
+                'class_name': self.class_names[class_id],
+                'confidence': round(confidence, 3),
+                'track_id': track_id
+            })
+        return boxes
@@ -0,0 +1,143 @@
+"""Exported CPU inference backends for ObjectDetector
+
+The Ultralytics .pt model is exported once to ONNX (optionally INT8
+quantized) or OpenVINO, and the artifact is cached next to the model file.
+It is re-exported only when the .pt file is newer than the cached artifact.
+"""
+import ast
+import logging
+import os
+import cv2
+import numpy as np
+from detector import DETECTION_DTYPE, empty_detections
+
+BACKENDS = ('ultralytics', 'onnxruntime', 'openvino')
+
+
+def _is_fresh(artifact_path, model_path):
+    """Check that a cached export exists and is not older than the source model"""
+    return (os.path.exists(artifact_path) and
+            (not os.path.exists(model_path) or os.path.getmtime(artifact_path) >= os.path.getmtime(model_path)))
+
+
+def export_model(model_path, backend, int8=False):
+    """Export the .pt model for a backend (cached) and return the artifact path"""
+    stem = os.path.splitext(model_path)[0]
+    if backend == 'onnxruntime':
+        artifact_path = f"{stem}.onnx"
+    elif backend == 'openvino':
+        artifact_path = f"{stem}_openvino_model"
+    else:
+        raise ValueError(f"Unknown inference backend: {backend}")
+
+    if not _is_fresh(artifact_path, model_path):
+        from ultralytics import YOLO
+        logging.info(f"Exporting {model_path} for {backend}...")
+        options = {'format': 'onnx', 'dynamic': True} if backend == 'onnxruntime' else {'format': 'openvino'}
+        exported = YOLO(model_path).export(verbose=False, **options)
+        if os.path.abspath(exported) != os.path.abspath(artifact_path):
+            os.replace(exported, artifact_path)
+
+    if backend == 'onnxruntime' and int8:
+        return quantize_onnx(artifact_path)
+    return artifact_path
+
+
+def quantize_onnx(onnx_path):
+    """Dynamically quantize an ONNX model's weights to INT8 (cached)"""
+    int8_path = f"{os.path.splitext(onnx_path)[0]}.int8.onnx"
+    if not _is_fresh(int8_path, onnx_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        logging.info(f"Quantizing {onnx_path} to INT8...")
+        quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+    return int8_path
+
+
+def letterbox(frame, size):
+    """Resize keeping the aspect ratio and pad to size x size
+
+    Returns the padded image, the scale ratio and the (x, y) padding offsets.
+    """
+    h, w = frame.shape[:2]
+    ratio = min(size / h, size / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    padded = np.full((size, size, 3), 114, dtype=np.uint8)
+    if (new_w, new_h) != (w, h):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    padded[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = frame
+    return padded, ratio, (pad_x, pad_y)
+
+
+class OnnxRuntimeModel:
+    """YOLOv8 detection on ONNX Runtime with a CPU-tuned session
+
+    Pre-processing (letterbox, BGR to RGB, NCHW float) and post-processing
+    (confidence filter, class-aware NMS, rescaling) produce DETECTION_DTYPE
+    arrays directly, without going through the Ultralytics predictor.
+    """
+
+    def __init__(self, onnx_path, num_threads=0, imgsz=640):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = num_threads or os.cpu_count() or 1
+        options.inter_op_num_threads = 1
+
+        self.path = onnx_path
+        self.imgsz = imgsz
+        self.session = ort.InferenceSession(onnx_path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+        # Ultralytics stores the class names in the model metadata
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata['names']) if 'names' in metadata else {}
+
+    def predict(self, frames, conf=0.25, iou=0.7, imgsz=None, max_det=300):
+        """Detect objects in a list of BGR frames, one detection array per frame"""
+        size = imgsz or self.imgsz
+        letterboxed = [letterbox(frame, size) for frame in frames]
+        blob = cv2.dnn.blobFromImages([image for image, _, _ in letterboxed], 1 / 255.0, swapRB=True)
+
+        # (batch, 4 + classes, anchors)
+        outputs = self.session.run(None, {self.input_name: blob})[0]
+
+        results = []
+        for prediction, frame, (_, ratio, (pad_x, pad_y)) in zip(outputs, frames, letterboxed):
+            results.append(self._postprocess(prediction.T, frame.shape, ratio, pad_x, pad_y, conf, iou, max_det))
+        return results
+
+    def _postprocess(self, prediction, frame_shape, ratio, pad_x, pad_y, conf, iou, max_det):
+        """Turn (anchors, 4 + classes) raw output into a detection array"""
+        scores = prediction[:, 4:]
+        class_ids = scores.argmax(axis=1)
+        confidences = scores[np.arange(len(scores)), class_ids]
+        keep = confidences >= conf
+        if not keep.any():
+            return empty_detections()
+
+        # Center xywh in letterbox space to top-left xywh for NMS
+        boxes = prediction[keep, :4].copy()
+        boxes[:, :2] -= boxes[:, 2:] / 2
+        confidences, class_ids = confidences[keep], class_ids[keep]
+
+        indices = cv2.dnn.NMSBoxesBatched(boxes.tolist(), confidences.tolist(), class_ids.tolist(), conf, iou)
+        indices = np.asarray(indices, dtype=np.int64).reshape(-1)[:max_det]
+
+        # Back to frame pixels
+        xyxy = boxes[indices].copy()
+        xyxy[:, 2:] += xyxy[:, :2]
+        xyxy -= [pad_x, pad_y, pad_x, pad_y]
+        xyxy /= ratio
+        h, w = frame_shape[:2]
+        xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, w)
+        xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, h)
+
+        detections = np.empty(len(indices), dtype=DETECTION_DTYPE)
+        detections['bbox'] = xyxy
+        detections['confidence'] = confidences[indices]
+        detections['class_id'] = class_ids[indices]
+        return detections
@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+from collections import deque
+
+
+class InferenceExecutor:
+    """Run detection off the capture loop with a bounded, drop-oldest queue
+
+    The capture loop submits (seq, frame, context) and keeps going. A worker
+    thread runs `infer(frame, context)` on the newest queued frame; when the
+    queue is full the oldest pending frame is dropped (latest frame wins).
+    Finished results are collected with poll(), ordered by frame sequence.
+    """
+
+    def __init__(self, infer, max_queue=1, name='inference'):
+        self.infer = infer
+        self.max_queue = max(1, max_queue)
+        self.name = name
+        self.pending = deque()
+        self.results = deque()
+        self.condition = threading.Condition()
+        self.running = False
+        self.worker_thread = None
+        self.last_result_seq = -1
+
+        # Statistics
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.stale = 0
+        self.last_inference_time = 0.0
+        self.last_latency = 0.0  # queue wait plus inference
+        self.total_latency = 0.0
+
+    def start(self):
+        """Start the inference worker thread"""
+        if self.running:
+            return
+        self.running = True
+        self.worker_thread = threading.Thread(target=self._worker, daemon=True, name=self.name)
+        self.worker_thread.start()
+
+    def stop(self):
+        """Stop the worker and discard pending frames and results"""
+        with self.condition:
+            self.running = False
+            self.pending.clear()
+            self.condition.notify_all()
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.worker_thread.join(timeout=2)
+        self.results.clear()
+        self.last_result_seq = -1
+
+    def submit(self, seq, frame, context=None, timestamp=None):
+        """Queue a frame for inference, dropping the oldest pending one if full
+
+        `timestamp` is the frame's capture time (defaults to now); results
+        carry it with their `seq` so late detections can be placed in time.
+        """
+        with self.condition:
+            if len(self.pending) >= self.max_queue:
+                self.pending.popleft()
+                self.dropped += 1
+            submitted_at = time.time()
+            self.pending.append((seq, frame, context, timestamp if timestamp is not None else submitted_at,
+                                 submitted_at))
+            self.submitted += 1
+            self.condition.notify()
+
+    def poll(self):
+        """Get finished results as dicts with seq, timestamp, detections, frame_shape and latency"""
+        results = []
+        while self.results:
+            result = self.results.popleft()
+            if result['seq'] <= self.last_result_seq:
+                self.stale += 1
+                continue
+            self.last_result_seq = result['seq']
+            results.append(result)
+        return results
+
+    def _worker(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait(timeout=0.5)
+                if not self.running:
+                    return
+                seq, frame, context, timestamp, submitted_at = self.pending.popleft()
+
+            started_at = time.time()
+            try:
+                detections = self.infer(frame, context)
+            except Exception as e:
+                logging.error(f"Inference error: {str(e)}")
+                continue
+
+            finished_at = time.time()
+            self.last_inference_time = finished_at - started_at
+            self.last_latency = finished_at - submitted_at
+            self.total_latency += self.last_latency
+            self.completed += 1
+            self.results.append({
+                'seq': seq,
+                'timestamp': timestamp,
+                'detections': detections,
+                'frame_shape': frame.shape,
+                'latency': self.last_latency
+            })
+
+    def get_stats(self):
+        """Get queue depth, drop and latency statistics"""
+        return {
+            'queue_depth': len(self.pending),
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'dropped': self.dropped,
+            'stale_results': self.stale,
+            'last_inference_ms': round(self.last_inference_time * 1000, 1),
+            'last_latency_ms': round(self.last_latency * 1000, 1),
+            'average_latency_ms': round(self.total_latency * 1000 / self.completed, 1) if self.completed else 0
+        }
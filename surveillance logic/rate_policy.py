@@ -0,0 +1,92 @@
+import time
+
+
+class InferenceRatePolicy:
+    """Decide per frame whether to run the object detector, driven by motion
+
+    While the scene is active (foreground area above `motion_area`, or people
+    detected by the last inference) the detector runs every `active_interval`
+    frames. Once activity stops for `cooldown` seconds the interval between
+    inferences doubles after every quiet inference until it reaches
+    `heartbeat` seconds, so a static scene is still re-checked regularly.
+    """
+
+    def __init__(self, motion_area=1500, active_interval=1, cooldown=2.0, heartbeat=5.0,
+                 min_idle_interval=0.25):
+        self.motion_area = motion_area
+        self.active_interval = max(1, active_interval)
+        self.cooldown = cooldown
+        self.heartbeat = heartbeat
+        self.min_idle_interval = min_idle_interval
+
+        self.state = 'idle'
+        self.idle_interval = min_idle_interval
+        self.last_activity_time = None
+        self.last_inference_time = None
+        self.frames_since_inference = 0
+
+        # Observability
+        self.frames_seen = 0
+        self.inferences_run = 0
+        self.last_decision = None
+
+    def _record(self, now, run, reason, motion_area):
+        self.last_decision = {
+            'time': now,
+            'run': run,
+            'reason': reason,
+            'state': self.state,
+            'motion_area': int(motion_area)
+        }
+        if run:
+            self.inferences_run += 1
+            self.last_inference_time = now
+            self.frames_since_inference = 0
+        return run
+
+    def should_infer(self, motion_area, now=None):
+        """Decide whether to run inference on the current frame"""
+        now = now if now is not None else time.time()
+        self.frames_seen += 1
+        self.frames_since_inference += 1
+
+        if motion_area >= self.motion_area:
+            self.last_activity_time = now
+
+        active = (self.last_activity_time is not None and
+                  now - self.last_activity_time < self.cooldown)
+
+        if self.last_inference_time is None:
+            self.state = 'active' if active else 'idle'
+            return self._record(now, True, 'first frame', motion_area)
+
+        if active:
+            # Ramp straight to the active rate
+            self.state = 'active'
+            self.idle_interval = self.min_idle_interval
+            if self.frames_since_inference >= self.active_interval:
+                return self._record(now, True, 'activity', motion_area)
+            return self._record(now, False, 'active interval', motion_area)
+
+        # Quiet scene: back off towards the heartbeat
+        self.state = 'idle' if self.idle_interval >= self.heartbeat else 'cooling'
+        if now - self.last_inference_time >= self.idle_interval:
+            self.idle_interval = min(self.heartbeat, self.idle_interval * 2)
+            return self._record(now, True, 'heartbeat' if self.state == 'idle' else 'cooldown', motion_area)
+        return self._record(now, False, 'static scene', motion_area)
+
+    def notify_detections(self, count, now=None):
+        """Treat detected objects as activity (people standing still make no motion)"""
+        if count > 0:
+            self.last_activity_time = now if now is not None else time.time()
+
+    def get_stats(self):
+        """Get policy state and counters"""
+        return {
+            'state': self.state,
+            'frames_seen': self.frames_seen,
+            'inferences_run': self.inferences_run,
+            'inference_ratio': round(self.inferences_run / self.frames_seen, 3) if self.frames_seen else 0,
+            'idle_interval': round(self.idle_interval, 2),
+            'last_decision': self.last_decision
+        }
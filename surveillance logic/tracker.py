@@ -0,0 +1,162 @@
+import numpy as np
+from detector import DETECTION_DTYPE
+
+# Tracked detections: a detection row plus its stable track id
+TRACK_DTYPE = np.dtype(DETECTION_DTYPE.descr + [('track_id', np.int32)])
+
+
+def iou_matrix(boxes_a, boxes_b):
+    """Pairwise IoU of (N, 4) and (M, 4) x1, y1, x2, y2 boxes"""
+    a = boxes_a.astype(np.float64)[:, None]
+    b = boxes_b.astype(np.float64)[None]
+    inter_w = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def greedy_match(scores, threshold, exclude_rows=(), exclude_cols=()):
+    """Greedily pair rows and columns with the highest scores at or above threshold"""
+    pairs = np.argwhere(scores >= threshold)
+    order = np.argsort(-scores[pairs[:, 0], pairs[:, 1]], kind='stable')
+    used_rows, used_cols = set(exclude_rows), set(exclude_cols)
+    matches = []
+    for row, col in pairs[order].tolist():
+        if row not in used_rows and col not in used_cols:
+            used_rows.add(row)
+            used_cols.add(col)
+            matches.append((row, col))
+    return matches
+
+
+class ObjectTracker:
+    """IoU/centroid tracker that keeps detections' identities across frames
+
+    The detector only has to run on keyframes. predict() moves every track by
+    its constant-velocity estimate once per frame, and update() matches a new
+    detection array to the predicted boxes: first by IoU, then by centroid
+    distance (relative to the box diagonal) for fast movers. Unmatched
+    detections start new tracks. Tracks missed on more than `max_missed`
+    keyframes in a row are dropped. Detections that arrive late (asynchronous
+    inference) are matched at the frame they were taken on and then predicted
+    forward to the current frame.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_distance=0.5, max_missed=3,
+                 max_predict_frames=30, velocity_smoothing=0.5):
+        self.iou_threshold = iou_threshold
+        self.max_distance = max_distance
+        self.max_missed = max_missed
+        self.max_predict_frames = max_predict_frames
+        self.velocity_smoothing = velocity_smoothing
+        self.next_id = 1
+        self.reset()
+
+    def reset(self):
+        """Drop all tracks"""
+        self.ids = np.empty(0, dtype=np.int32)
+        self.boxes = np.empty((0, 4), dtype=np.float64)  # predicted boxes
+        self.observed = np.empty((0, 4), dtype=np.float64)  # last detected boxes
+        self.velocities = np.empty((0, 4), dtype=np.float64)  # pixels per frame
+        self.confidences = np.empty(0, dtype=np.float32)
+        self.class_ids = np.empty(0, dtype=np.int32)
+        self.frames_since_update = np.empty(0, dtype=np.int32)
+        self.missed = np.empty(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def predict(self):
+        """Advance every track by one frame"""
+        moving = self.frames_since_update < self.max_predict_frames
+        self.boxes[moving] += self.velocities[moving]
+        self.frames_since_update += 1
+        return self.tracked()
+
+    def _centroid_scores(self, track_boxes, det_boxes):
+        """Closeness of track and detection centers, 1 at the same point, 0 at max_distance"""
+        track_centers = (track_boxes[:, :2] + track_boxes[:, 2:]) / 2
+        det_centers = (det_boxes[:, :2] + det_boxes[:, 2:]) / 2
+        distance = np.linalg.norm(track_centers[:, None] - det_centers[None], axis=2)
+        diagonal = np.linalg.norm(track_boxes[:, 2:] - track_boxes[:, :2], axis=1)[:, None]
+        return 1 - distance / np.maximum(diagonal * self.max_distance, 1e-6)
+
+    def _boxes_at(self, frames_ago):
+        """Predicted track boxes as of `frames_ago` frames before the current one"""
+        if not frames_ago:
+            return self.boxes
+        frames = np.clip(self.frames_since_update - frames_ago, 0, self.max_predict_frames)
+        return self.observed + self.velocities * frames[:, None]
+
+    def update(self, detections, frames_ago=0):
+        """Match a keyframe's detections to the tracks and return tracked detections
+
+        `frames_ago` is how many predict() calls ago the keyframe was captured
+        (the lag of asynchronous inference); 0 for the current frame.
+        """
+        det_boxes = detections['bbox'].astype(np.float64)
+
+        matches = []
+        if len(self.ids) and len(det_boxes):
+            track_boxes = self._boxes_at(frames_ago)
+            matches = greedy_match(iou_matrix(track_boxes, det_boxes), self.iou_threshold)
+            matches += greedy_match(self._centroid_scores(track_boxes, det_boxes), 1e-9,
+                                    [row for row, _ in matches], [col for _, col in matches])
+
+        # Matched tracks: blend in the observed velocity and predict the
+        # detected box forward to the current frame
+        if matches:
+            rows, cols = np.array(matches).T
+            elapsed = np.maximum(self.frames_since_update[rows] - frames_ago, 1)
+            observed_velocity = (det_boxes[cols] - self.observed[rows]) / elapsed[:, None]
+            self.velocities[rows] = (self.velocity_smoothing * self.velocities[rows] +
+                                     (1 - self.velocity_smoothing) * observed_velocity)
+            self.boxes[rows] = det_boxes[cols] + self.velocities[rows] * min(frames_ago, self.max_predict_frames)
+            self.observed[rows] = det_boxes[cols]
+            self.confidences[rows] = detections['confidence'][cols]
+            self.class_ids[rows] = detections['class_id'][cols]
+            self.frames_since_update[rows] = frames_ago
+
+        # Unmatched tracks: count the miss and drop stale ones
+        matched = np.zeros(len(self.ids), dtype=bool)
+        matched[[row for row, _ in matches]] = True
+        self.missed = np.where(matched, 0, self.missed + 1)
+        keep = self.missed <= self.max_missed
+        for name in ('ids', 'boxes', 'observed', 'velocities', 'confidences',
+                     'class_ids', 'frames_since_update', 'missed'):
+            setattr(self, name, getattr(self, name)[keep])
+
+        # Unmatched detections: start new tracks
+        new = np.ones(len(det_boxes), dtype=bool)
+        new[[col for _, col in matches]] = False
+        count = int(np.count_nonzero(new))
+        if count:
+            self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + count, dtype=np.int32)])
+            self.next_id += count
+            self.boxes = np.concatenate([self.boxes, det_boxes[new]])
+            self.observed = np.concatenate([self.observed, det_boxes[new]])
+            self.velocities = np.concatenate([self.velocities, np.zeros((count, 4))])
+            self.confidences = np.concatenate([self.confidences, detections['confidence'][new]])
+            self.class_ids = np.concatenate([self.class_ids, detections['class_id'][new]])
+            self.frames_since_update = np.concatenate([self.frames_since_update,
+                                                       np.full(count, frames_ago, dtype=np.int32)])
+            self.missed = np.concatenate([self.missed, np.zeros(count, dtype=np.int32)])
+
+        return self.tracked()
+
+    def tracked(self):
+        """Get the tracks seen on the last keyframe as a TRACK_DTYPE array"""
+        visible = self.missed == 0
+        tracks = np.empty(int(np.count_nonzero(visible)), dtype=TRACK_DTYPE)
+        tracks['bbox'] = np.rint(self.boxes[visible])
+        tracks['confidence'] = self.confidences[visible]
+        tracks['class_id'] = self.class_ids[visible]
+        tracks['track_id'] = self.ids[visible]
+        return tracks
+
+    def active_ids(self):
+        """Get the ids of all live tracks, including ones currently missed"""
+        return set(self.ids.tolist())
@@ -3,93 +3,79 @@ import threading
 import time
 from datetime import datetime
 import numpy as np
+from frame_buffer import FrameRingBuffer, FrameChannel
+from camera_discovery import discover_camera, CameraProbeCache
+from video_sources import create_video_source
+from motion_engine import MotionDetector, draw_motion_overlay, motion_overlay, summarize_motion
+from process_pipeline import ProcessCamera
+from zone_index import ZoneGrid
 
 class CameraDebugger:
-    def __init__(self):
+    def __init__(self, camera_id='default', source=None, backend=None, buffer_size=8,
+                 probe_cache_path=None, probe_timeout=2.0):
+        self.camera_id = camera_id
+        self.source = source
+        self.backend = backend
+        self.auto_detect = source is None
+        self.probe_cache_path = probe_cache_path
+        self.probe_timeout = probe_timeout
         self.cap = None
-        self.current_frame = None
+        self.frame_buffer = FrameRingBuffer(buffer_size)
         self.running = False
         self.camera_thread = None
+        self.ready = threading.Event()  # Set once the first frame is captured
         
-    def test_camera_sources(self):
-        """Test different camera sources to find working one"""
-        print("🔍 Testing camera sources...")
-        
-        # Test different camera indices
-        for i in range(5):
-            print(f"Testing camera index {i}...")
-            cap = cv2.VideoCapture(i)
-            
-            if cap.isOpened():
-                ret, frame = cap.read()
-                if ret and frame is not None:
-                    print(f"✅ Camera {i} is working!")
-                    print(f"   Resolution: {frame.shape[1]}x{frame.shape[0]}")
-                    cap.release()
-                    return i
-                else:
-                    print(f"❌ Camera {i} opened but no frame received")
-            else:
-                print(f"❌ Camera {i} failed to open")
-            cap.release()
-        
-        # Test with different backends
-        backends = [
-            (cv2.CAP_DSHOW, "DirectShow"),
-            (cv2.CAP_V4L2, "Video4Linux2"),
-            (cv2.CAP_GSTREAMER, "GStreamer"),
-            (cv2.CAP_FFMPEG, "FFMPEG")
-        ]
-        
-        for backend, name in backends:
-            try:
-                print(f"Testing {name} backend...")
-                cap = cv2.VideoCapture(0, backend)
-                if cap.isOpened():
-                    ret, frame = cap.read()
-                    if ret and frame is not None:
-                        print(f"✅ {name} backend works!")
-                        cap.release()
-                        return (0, backend)
-                cap.release()
-            except Exception as e:
-                print(f"❌ {name} backend failed: {e}")
+        # Health state
+        self.state = 'stopped'
+        self.fps = 0.0
+        self.frames_captured = 0
+        self.read_failures = 0
+        self.reconnects = 0
+        self.last_frame_time = None
         
-        return None
+    def test_camera_sources(self, refresh=False):
+        """Test different camera sources to find working one"""
+        return discover_camera(
+            timeout=self.probe_timeout,
+            cache_path=self.probe_cache_path,
+            refresh=refresh
+        )
     
     def initialize_camera(self, camera_index=0, backend=None):
         """Initialize camera with proper settings"""
+        # Remember the source so reconnects reopen the same camera
+        self.source = camera_index
+        self.backend = backend
+        
         try:
-            if backend:
-                self.cap = cv2.VideoCapture(camera_index, backend)
-            else:
-                self.cap = cv2.VideoCapture(camera_index)
+            # Camera index, stream URL, video file or synthetic source
+            self.cap = create_video_source(camera_index, backend)
             
-            if not self.cap.isOpened():
-                print("❌ Failed to open camera")
+            if not self.cap.open():
+                print(f"❌ [{self.camera_id}] Failed to open {self.cap.describe()}")
                 return False
             
-            # Set camera properties
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-            self.cap.set(cv2.CAP_PROP_FPS, 30)
-            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer size
-            
             # Test frame capture
             ret, frame = self.cap.read()
             if not ret or frame is None:
-                print("❌ Camera opened but cannot read frames")
+                print(f"❌ [{self.camera_id}] Camera opened but cannot read frames")
                 self.cap.release()
                 return False
             
-            print("✅ Camera initialized successfully!")
+            # The test frame is a real capture: publish and count it
+            self.last_frame_time = time.time()
+            self.frame_buffer.write(frame, self.last_frame_time)
+            self.frames_captured += 1
+            self.ready.set()
+            
+            print(f"✅ [{self.camera_id}] Camera initialized successfully! ({self.cap.describe()})")
             print(f"   Resolution: {int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))}x{int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))}")
             print(f"   FPS: {self.cap.get(cv2.CAP_PROP_FPS)}")
             
             return True
             
         except Exception as e:
-            print(f"❌ Camera initialization error: {e}")
+            print(f"❌ [{self.camera_id}] Camera initialization error: {e}")
             return False
     
     def camera_loop(self):
@@ -99,69 +85,111 @@ class CameraDebugger:
         
         while self.running:
             try:
-                if self.cap is None or not self.cap.isOpened():
-                    print("⚠️ Camera connection lost, attempting to reconnect...")
-                    if not self.initialize_camera():
+                if self.cap is not None and self.cap.finished:
+                    # Finite source (file without looping, bounded synthetic run)
+                    print(f"🏁 [{self.camera_id}] Source finished after {self.frames_captured} frames")
+                    self.state = 'finished'
+                    break
+                
+                if self.cap is None or not self.cap.is_opened():
+                    print(f"⚠️ [{self.camera_id}] Camera connection lost, attempting to reconnect...")
+                    self.state = 'reconnecting'
+                    self.reconnects += 1
+                    if not self.initialize_camera(self.source, self.backend):
                         time.sleep(1)
                         continue
+                    self.state = 'running'
                 
-                ret, frame = self.cap.read()
+                # Decode straight into the next ring buffer slot when possible
+                slot = self.frame_buffer.next_slot()
+                ret, frame = self.cap.read(slot) if slot is not None else self.cap.read()
                 
                 if not ret or frame is None:
-                    print("⚠️ Failed to read frame, retrying...")
+                    if self.cap.finished:
+                        continue
+                    print(f"⚠️ [{self.camera_id}] Failed to read frame, retrying...")
+                    self.read_failures += 1
                     time.sleep(0.1)
                     continue
                 
-                # Store the current frame
-                self.current_frame = frame.copy()
+                # Publish the frame; only copy if the decoder allocated a new array
+                # (first frame or resolution change)
+                self.last_frame_time = time.time()
+                if slot is not None and frame is slot:
+                    self.frame_buffer.commit(self.last_frame_time)
+                else:
+                    self.frame_buffer.write(frame, self.last_frame_time)
+                self.ready.set()
+                self.frames_captured += 1
                 frame_count += 1
                 
                 # Calculate and print FPS every 30 frames
                 if frame_count % 30 == 0:
                     current_time = time.time()
-                    fps = 30 / (current_time - last_fps_time)
-                    print(f"📹 Camera FPS: {fps:.1f}")
+                    self.fps = 30 / (current_time - last_fps_time)
+                    print(f"📹 [{self.camera_id}] Camera FPS: {self.fps:.1f}")
                     last_fps_time = current_time
                 
-                # Small delay to prevent excessive CPU usage
-                time.sleep(0.033)  # ~30 FPS
-                
             except Exception as e:
-                print(f"❌ Camera loop error: {e}")
+                print(f"❌ [{self.camera_id}] Camera loop error: {e}")
                 time.sleep(0.1)
     
     def start_camera(self):
         """Start camera capture"""
         if self.running:
-            print("⚠️ Camera is already running")
+            print(f"⚠️ [{self.camera_id}] Camera is already running")
             return True
         
-        # Find working camera
-        camera_source = self.test_camera_sources()
-        if camera_source is None:
-            print("❌ No working camera found!")
-            return False
+        self.state = 'connecting'
+        self.ready.clear()
         
-        # Initialize camera
-        if isinstance(camera_source, tuple):
-            camera_index, backend = camera_source
-            if not self.initialize_camera(camera_index, backend):
+        if not self.auto_detect:
+            # Configured source (index, RTSP URL or video file)
+            camera_source = (self.source, self.backend) if self.backend else self.source
+            if not self._open_source(camera_source):
+                self.state = 'failed'
                 return False
         else:
-            if not self.initialize_camera(camera_source):
+            # Find working camera (cached on disk between runs)
+            probe_cache = CameraProbeCache(self.probe_cache_path)
+            from_cache = probe_cache.load() is not None
+            camera_source = self.test_camera_sources()
+            opened = camera_source is not None and self._open_source(camera_source)
+            if not opened and from_cache:
+                # The cached source is stale; probe again from scratch
+                probe_cache.invalidate()
+                camera_source = self.test_camera_sources(refresh=True)
+                opened = camera_source is not None and self._open_source(camera_source)
+            if not opened:
+                print("❌ No working camera found!")
+                self.state = 'failed'
                 return False
         
         # Start camera thread
         self.running = True
-        self.camera_thread = threading.Thread(target=self.camera_loop, daemon=True)
+        self.state = 'running'
+        self.camera_thread = threading.Thread(target=self.camera_loop, daemon=True,
+                                              name=f"camera-{self.camera_id}")
         self.camera_thread.start()
         
-        print("🚀 Camera started successfully!")
+        print(f"🚀 [{self.camera_id}] Camera started successfully!")
         return True
     
+    def _open_source(self, camera_source):
+        """Initialize a camera from an index/URL or an (index, backend) tuple"""
+        if isinstance(camera_source, tuple):
+            camera_index, backend = camera_source
+            return self.initialize_camera(camera_index, backend)
+        return self.initialize_camera(camera_source)
+    
+    def wait_until_ready(self, timeout=None):
+        """Block until the first frame has been captured"""
+        return self.ready.wait(timeout)
+    
     def stop_camera(self):
         """Stop camera capture"""
         self.running = False
+        self.ready.clear()
         
         if self.camera_thread and self.camera_thread.is_alive():
             self.camera_thread.join(timeout=2)
@@ -170,34 +198,196 @@ class CameraDebugger:
             self.cap.release()
             self.cap = None
         
-        print("🛑 Camera stopped")
+        self.frame_buffer.reset()
+        self.state = 'stopped'
+        self.fps = 0.0
+        print(f"🛑 [{self.camera_id}] Camera stopped")
+    
+    @property
+    def current_frame(self):
+        """Latest captured frame (a view into the ring buffer)"""
+        return self.get_current_frame()
     
     def get_current_frame(self):
         """Get current frame"""
-        return self.current_frame
+        packet = self.frame_buffer.latest()
+        return packet[2] if packet else None
+    
+    def get_frame(self, seq):
+        """Get (timestamp, frame) for a specific sequence number if still buffered"""
+        return self.frame_buffer.get(seq)
     
     def is_camera_working(self):
         """Check if camera is working"""
-        return self.running and self.current_frame is not None
+        return self.running and self.frame_buffer.latest() is not None
+    
+    def get_health(self):
+        """Get per-camera health and FPS state"""
+        return {
+            'camera_id': self.camera_id,
+            'source': str(self.source) if self.source is not None else 'auto',
+            'state': self.state,
+            'working': self.is_camera_working(),
+            'fps': round(self.fps, 1),
+            'frames_captured': self.frames_captured,
+            'latest_seq': self.frame_buffer.latest_seq,
+            'read_failures': self.read_failures,
+            'reconnects': self.reconnects,
+            'last_frame_age': round(time.time() - self.last_frame_time, 2) if self.last_frame_time else None
+        }
+
+
+class CameraManager:
+    """Own one capture worker per configured camera source"""
+    
+    def __init__(self, camera_sources=None, camera_class=None, **camera_options):
+        # CameraDebugger (threads) or ProcessCamera (processes), and the options
+        # passed to every camera (buffer_size, probe_cache_path, ...)
+        self.camera_class = camera_class or CameraDebugger
+        self.camera_options = camera_options
+        self.cameras = {}
+        self.camera_settings = {}
+        self.configure(camera_sources or [])
+    
+    def configure(self, camera_sources):
+        """Create capture workers from a list of camera source configs
+        
+        Each entry is a dict like {'id': 'lobby', 'source': 0} where source may be
+        a camera index, an RTSP/HTTP URL or a video file path. Plain values are
+        accepted too. An empty list falls back to a single auto-detected camera.
+        Extra keys (e.g. 'motion_scale') are kept as per-camera settings.
+        """
+        self.stop_all()
+        self.cameras = {}
+        self.camera_settings = {}
+        
+        if not camera_sources:
+            self.cameras['default'] = self.camera_class('default', **self.camera_options)
+            return
+        
+        for i, entry in enumerate(camera_sources):
+            if not isinstance(entry, dict):
+                entry = {'source': entry}
+            camera_id = str(entry.get('id', f"cam{i}"))
+            if camera_id in self.cameras:
+                raise ValueError(f"Duplicate camera id: {camera_id}")
+            self.camera_settings[camera_id] = entry
+            self.cameras[camera_id] = self.camera_class(
+                camera_id, source=entry.get('source'), backend=entry.get('backend'),
+                **self.camera_options
+            )
+    
+    def get_setting(self, camera_id, key, default=None):
+        """Get a per-camera setting from the source config"""
+        return self.camera_settings.get(camera_id, {}).get(key, default)
+    
+    def camera_ids(self):
+        """Get configured camera ids in configuration order"""
+        return list(self.cameras.keys())
+    
+    def get_camera(self, camera_id=None):
+        """Get a camera by id, or the first configured camera"""
+        if camera_id is None:
+            return next(iter(self.cameras.values()), None)
+        return self.cameras.get(camera_id)
+    
+    def get_current_frame(self, camera_id=None):
+        """Get the latest frame from a camera"""
+        camera = self.get_camera(camera_id)
+        return camera.get_current_frame() if camera else None
+    
+    def start_all(self):
+        """Start every camera in parallel and return the ids that started"""
+        results = {}
+        
+        def start(camera_id, camera):
+            results[camera_id] = camera.start_camera()
+        
+        # Opening RTSP streams can block for seconds, so don't open them one by one
+        threads = [threading.Thread(target=start, args=item, daemon=True)
+                   for item in self.cameras.items()]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        return [camera_id for camera_id in self.cameras if results.get(camera_id)]
+    
+    def stop_all(self):
+        """Stop every running camera"""
+        for camera in self.cameras.values():
+            if camera.running:
+                camera.stop_camera()
+    
+    def wait_until_ready(self, camera_ids, timeout=2.0):
+        """Wait (up to a shared deadline) for cameras to deliver their first frame"""
+        deadline = time.time() + timeout
+        for camera_id in camera_ids:
+            self.cameras[camera_id].wait_until_ready(max(0.0, deadline - time.time()))
+        return [camera_id for camera_id in camera_ids if self.cameras[camera_id].ready.is_set()]
+    
+    def is_any_working(self):
+        """Check if at least one camera is delivering frames"""
+        return any(camera.is_camera_working() for camera in self.cameras.values())
+    
+    def get_health(self):
+        """Get health state for every camera"""
+        return {camera_id: camera.get_health() for camera_id, camera in self.cameras.items()}
 
 
 class SurveillanceCore:
     def __init__(self, config=None):
         self.config = config or {}
-        self.camera_debugger = CameraDebugger()
+        
+        # 'threads' runs capture and detection as threads in this process,
+        # 'processes' runs them as worker processes sharing frames via shared memory
+        self.execution_mode = self.config.get('execution_mode', 'threads')
+        if self.execution_mode not in ('threads', 'processes'):
+            raise ValueError(f"Unknown execution mode: {self.execution_mode}")
+        
+        self.camera_manager = CameraManager(
+            self.config.get('camera_sources'),
+            camera_class=ProcessCamera if self.execution_mode == 'processes' else CameraDebugger,
+            buffer_size=self.config.get('frame_buffer_size', 8),
+            probe_cache_path=self.config.get('camera_probe_cache'),
+            probe_timeout=self.config.get('camera_probe_timeout', 2.0)
+        )
         self.detection_callback = None
-        self.processed_frame = None
+        self.processed_channels = {}
         self.running = False
-        self.detection_thread = None
+        self.detection_threads = {}
         
         # Detection settings
         self.motion_threshold = 1000
-        self.background_subtractor = cv2.createBackgroundSubtractorMOG2()
-        
+        self.motion_detectors = {}
+        self.zone_grid = ZoneGrid([
+            ["Top Left", "Center Top", "Top Right"],
+            ["Bottom Left", "Center Bottom", "Bottom Right"]
+        ])
+    
+    @property
+    def camera_debugger(self):
+        """Get the default camera (first configured source)"""
+        return self.camera_manager.get_camera()
+    
     @property
     def current_frame(self):
-        """Get current frame from camera"""
-        return self.camera_debugger.get_current_frame()
+        """Get current frame from the default camera"""
+        return self.camera_manager.get_current_frame()
+    
+    @property
+    def processed_frame(self):
+        """Get processed frame (with overlays) from the default camera"""
+        return self.get_processed_frame()
+    
+    def default_camera_id(self):
+        """Get the id of the default camera"""
+        camera = self.camera_manager.get_camera()
+        return camera.camera_id if camera else None
+    
+    def get_camera_ids(self):
+        """Get all configured camera ids"""
+        return self.camera_manager.camera_ids()
     
     def set_detection_callback(self, callback):
         """Set callback function for live detection updates"""
@@ -205,23 +395,78 @@ class SurveillanceCore:
     
     def is_running(self):
         """Check if surveillance system is running"""
-        return self.running and self.camera_debugger.is_camera_working()
+        return self.running and self.camera_manager.is_any_working()
+    
+    def is_camera_running(self, camera_id=None):
+        """Check if surveillance is running for a specific camera"""
+        camera = self.camera_manager.get_camera(camera_id)
+        return self.running and camera is not None and camera.is_camera_working()
+    
+    def get_processed_channel(self, camera_id=None):
+        """Get the channel that detection publishes processed frames on"""
+        if camera_id is None:
+            camera_id = self.default_camera_id()
+        if camera_id not in self.processed_channels:
+            self.processed_channels[camera_id] = FrameChannel()
+        return self.processed_channels[camera_id]
     
-    def get_processed_frame(self):
-        """Get the current processed frame with detection overlays"""
-        if self.processed_frame is not None:
-            return self.processed_frame
-        return self.current_frame
+    def get_processed_frame(self, camera_id=None, overlay=True):
+        """Get the current processed frame, with overlays rendered into a copy"""
+        packet = self.get_processed_channel(camera_id).latest(with_metadata=True)
+        if packet is None:
+            return self.camera_manager.get_current_frame(camera_id)
+        _, frame, metadata = packet
+        return self.draw_overlay(frame.copy(), metadata) if overlay else frame
+    
+    def wait_for_frame_packet(self, camera_id=None, after_seq=-1, timeout=None):
+        """Block until an analyzed frame newer than `after_seq` is available
+        
+        Returns (seq, frame, metadata) or None. The frame is the untouched
+        capture frame, a view into the camera's ring buffer: copy it or check
+        is_frame_current() after use. metadata['overlay'] describes the
+        overlays (see motion_overlay).
+        """
+        return self.get_processed_channel(camera_id).wait(after_seq, timeout, with_metadata=True)
+    
+    def is_frame_current(self, camera_id, seq):
+        """Check that a frame from wait_for_frame_packet was not overwritten since"""
+        camera = self.camera_manager.get_camera(camera_id)
+        return camera is not None and camera.get_frame(seq) is not None
+    
+    def draw_overlay(self, frame, metadata, scale=1.0):
+        """Render a frame's overlay metadata into `frame` in place"""
+        return draw_motion_overlay(frame, metadata['overlay'], scale)
+    
+    def get_overlay(self, camera_id=None):
+        """Get the overlay metadata of the latest analyzed frame (for client-side rendering)"""
+        packet = self.get_processed_channel(camera_id).latest(with_metadata=True)
+        if packet is None:
+            return None
+        seq, frame, metadata = packet
+        height, width = frame.shape[:2]
+        return dict(metadata['overlay'], seq=seq, width=width, height=height)
     
     def get_system_status(self):
         """Get system status"""
         return {
             'running': self.is_running(),
-            'camera_connected': self.camera_debugger.is_camera_working(),
+            'camera_connected': self.camera_manager.is_any_working(),
             'detection_active': self.running,
+            'execution_mode': self.execution_mode,
+            'cameras': self.camera_manager.get_health(),
             'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
     
+    def get_motion_options(self, camera_id):
+        """Get MotionDetector options for a camera (per-camera scale overrides the default)"""
+        return {
+            'motion_threshold': self.motion_threshold,
+            'scale': self.camera_manager.get_setting(
+                camera_id, 'motion_scale', self.config.get('motion_scale', 1.0)),
+            'morph_kernel': self.config.get('motion_morph_kernel', 3),
+            'merge_distance': self.config.get('motion_merge_distance', 20)
+        }
+    
     def get_settings(self):
         """Get current surveillance settings"""
         return getattr(self, 'settings', {
@@ -237,15 +482,18 @@ class SurveillanceCore:
         self.settings.update(new_settings)
         print(f"🔧 Settings updated: {new_settings}")
     
-    def process_detection(self, detection_type, zone, confidence, severity='Low'):
+    def process_detection(self, detection_type, zone, confidence, severity='Low', camera_id=None, extra=None):
         """Process a detection and notify the web interface"""
         detection_data = {
             'type': detection_type,
             'zone': zone,
             'confidence': confidence,
             'severity': severity,
+            'camera': camera_id or self.default_camera_id(),
             'timestamp': datetime.now().isoformat()
         }
+        if extra:
+            detection_data.update(extra)
         
         # Call the callback if set
         if self.detection_callback:
@@ -256,83 +504,68 @@ class SurveillanceCore:
         
         return detection_data
     
-    def detection_loop(self):
-        """Main detection loop"""
-        print("🔍 Starting detection loop...")
+    def detection_loop(self, camera_id):
+        """Main detection loop for one camera"""
+        print(f"🔍 [{camera_id}] Starting detection loop...")
+        camera = self.camera_manager.get_camera(camera_id)
+        motion_detector = self.motion_detectors[camera_id]
+        last_seq = -1
         
-        while self.running:
+        while self.running and camera.running:
             try:
-                frame = self.current_frame
-                if frame is None:
-                    time.sleep(0.1)
+                # Sleep until the camera publishes a newer frame; if we fell
+                # behind this skips straight to the newest one
+                packet = camera.frame_buffer.wait_for_frame(last_seq, timeout=0.5)
+                if packet is None:
                     continue
                 
-                # Create a copy for processing
-                processed_frame = frame.copy()
+                # Frame is a view into the camera's ring buffer, not a copy
+                seq, timestamp, frame = packet
+                last_seq = seq
                 
                 # Simple motion detection
-                fg_mask = self.background_subtractor.apply(frame)
-                contours, _ = cv2.findContours(fg_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+                blobs = motion_detector.detect(frame)
                 
-                motion_detected = False
-                for contour in contours:
-                    area = cv2.contourArea(contour)
-                    if area > self.motion_threshold:
-                        motion_detected = True
-                        
-                        # Draw bounding box
-                        x, y, w, h = cv2.boundingRect(contour)
-                        cv2.rectangle(processed_frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                        cv2.putText(processed_frame, 'Motion Detected', (x, y - 10), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                        
-                        # Process detection
-                        confidence = min(100, int((area / 10000) * 100))
-                        self.process_detection(
-                            detection_type='Motion Detected',
-                            zone=self.determine_zone(x + w//2, y + h//2, frame.shape),
-                            confidence=confidence,
-                            severity='Medium' if area > 5000 else 'Low'
-                        )
-                
-                # Add timestamp to frame
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                cv2.putText(processed_frame, timestamp, (10, 30), 
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                
-                # Add system status
-                status_text = "SURVEILLANCE ACTIVE" if motion_detected else "MONITORING"
-                cv2.putText(processed_frame, status_text, (10, processed_frame.shape[0] - 10), 
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0) if motion_detected else (255, 255, 255), 2)
-                
-                # Store processed frame
-                self.processed_frame = processed_frame
-                
-                time.sleep(0.1)  # Prevent excessive CPU usage
+                # Overlays travel as metadata; the frame itself is left untouched
+                self.handle_motion_result(camera_id, seq, frame, blobs, timestamp)
                 
             except Exception as e:
-                print(f"❌ Detection loop error: {e}")
+                print(f"❌ [{camera_id}] Detection loop error: {e}")
                 time.sleep(0.1)
     
+    def handle_motion_result(self, camera_id, seq, frame, blobs, timestamp=None):
+        """Report the frame's motion and publish the frame with its overlay metadata (both execution modes)
+        
+        `frame` is None when it was overwritten before the result arrived
+        (process mode under load); the motion is still reported but nothing
+        is published.
+        """
+        motion = summarize_motion(blobs)
+        frame_shape = frame.shape if frame is not None else getattr(
+            self.camera_manager.get_current_frame(camera_id), 'shape', None)
+        if motion and frame_shape is not None:
+            # One aggregated detection per frame, described by its largest blob
+            x, y, w, h = motion['largest']['bbox']
+            area = motion['largest']['area']
+            confidence = min(100, int((area / 10000) * 100))
+            self.process_detection(
+                detection_type='Motion Detected',
+                zone=self.determine_zone(x + w//2, y + h//2, frame_shape),
+                confidence=confidence,
+                severity='Medium' if area > 5000 else 'Low',
+                camera_id=camera_id,
+                extra={'regions': motion['regions'], 'motion_area': int(motion['total_area'])}
+            )
+        
+        # Publish the frame and its overlays to the stream consumers
+        if frame is None:
+            return
+        self.get_processed_channel(camera_id).publish(
+            seq, frame, timestamp, metadata={'overlay': motion_overlay(blobs, timestamp)})
+    
     def determine_zone(self, x, y, frame_shape):
         """Determine which zone the detection occurred in"""
-        h, w = frame_shape[:2]
-        
-        if x < w // 3:
-            if y < h // 2:
-                return "Top Left"
-            else:
-                return "Bottom Left"
-        elif x < 2 * w // 3:
-            if y < h // 2:
-                return "Center Top"
-            else:
-                return "Center Bottom"
-        else:
-            if y < h // 2:
-                return "Top Right"
-            else:
-                return "Bottom Right"
+        return self.zone_grid.lookup(x, y, frame_shape)
     
     def start_surveillance(self):
         """Start surveillance system"""
@@ -342,20 +575,36 @@ class SurveillanceCore:
         
         print("🚀 Starting surveillance system...")
         
-        # Start camera first
-        if not self.camera_debugger.start_camera():
+        # Start cameras first
+        started = self.camera_manager.start_all()
+        if not started:
             print("❌ Failed to start camera")
             return False
         
-        # Wait a moment for camera to stabilize
-        time.sleep(2)
+        # Wait for the first frames instead of a fixed delay
+        ready = self.camera_manager.wait_until_ready(
+            started, timeout=self.config.get('camera_ready_timeout', 2.0)
+        )
+        if len(ready) < len(started):
+            print(f"⚠️ Cameras not ready yet: {sorted(set(started) - set(ready))}")
         
-        # Start detection
+        # Start one detection worker per running camera
         self.running = True
-        self.detection_thread = threading.Thread(target=self.detection_loop, daemon=True)
-        self.detection_thread.start()
+        for camera_id in started:
+            if self.execution_mode == 'processes':
+                self.camera_manager.get_camera(camera_id).start_detection(
+                    self.get_motion_options(camera_id),
+                    lambda seq, frame, blobs, timestamp, camera_id=camera_id:
+                        self.handle_motion_result(camera_id, seq, frame, blobs, timestamp)
+                )
+                continue
+            self.motion_detectors[camera_id] = MotionDetector(**self.get_motion_options(camera_id))
+            thread = threading.Thread(target=self.detection_loop, args=(camera_id,),
+                                      daemon=True, name=f"detection-{camera_id}")
+            self.detection_threads[camera_id] = thread
+            thread.start()
         
-        print("✅ Surveillance system started successfully!")
+        print(f"✅ Surveillance system started successfully! ({len(started)} camera(s), {self.execution_mode})")
         return True
     
     def stop_surveillance(self):
@@ -364,12 +613,19 @@ class SurveillanceCore:
         
         self.running = False
         
-        # Stop detection thread
-        if self.detection_thread and self.detection_thread.is_alive():
-            self.detection_thread.join(timeout=2)
+        # Stop detection threads
+        for thread in self.detection_threads.values():
+            if thread.is_alive():
+                thread.join(timeout=2)
+        self.detection_threads = {}
+        # A restart learns the background from scratch
+        self.motion_detectors = {}
+        
+        # Stop cameras (and detection processes in process mode)
+        self.camera_manager.stop_all()
         
-        # Stop camera
-        self.camera_debugger.stop_camera()
+        for channel in self.processed_channels.values():
+            channel.clear()
         
         print("✅ Surveillance system stopped")
 
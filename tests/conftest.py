@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The app runs with the repository root and its module folders on the path
+# (the root comes first: its surveillance_core is the one the app imports)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ('Flask application', 'detection module', 'surveillance logic', ''):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
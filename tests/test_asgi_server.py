@@ -0,0 +1,149 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from flask import Flask
+import app as web
+from asgi_server import AsgiServer
+from event_bus import EventBus
+from stream_hub import StreamHub
+
+
+class FakeSurveillance:
+    """One camera that publishes a single frame with seq 0"""
+
+    def __init__(self):
+        self.frame = np.full((48, 64, 3), 90, dtype=np.uint8)
+
+    def get_camera_ids(self):
+        return ['cam0']
+
+    def default_camera_id(self):
+        return 'cam0'
+
+    def is_camera_running(self, camera_id=None):
+        return True
+
+    def wait_for_frame_packet(self, camera_id, after_seq=-1, timeout=None):
+        if after_seq < 0:
+            return 0, self.frame, {}
+        time.sleep(timeout or 0)
+        return None
+
+    def is_frame_current(self, camera_id, seq):
+        return True
+
+    def draw_overlay(self, frame, metadata, scale=1.0):
+        return frame
+
+
+class CountingPool(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+async def request(server, path, query=b'', headers=(), disconnect_after=0.0):
+    """Run one HTTP request through the ASGI app and collect what it sends"""
+    sent = []
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.sleep(disconnect_after)
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+             'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '',
+             'query_string': query, 'headers': list(headers), 'server': ('test', 80),
+             'client': ('127.0.0.1', 1234)}
+    await server(scope, receive, send)
+    return sent
+
+
+def response(sent):
+    """(status, headers, body) of collected ASGI messages"""
+    start = sent[0]
+    body = b''.join(message.get('body', b'') for message in sent[1:])
+    return start['status'], dict(start['headers']), body
+
+
+@pytest.fixture
+def surveillance(monkeypatch):
+    fake = FakeSurveillance()
+    monkeypatch.setattr(web, 'get_surveillance', lambda timeout=0: fake)
+    monkeypatch.setattr(web, 'stream_hub', StreamHub(fake))
+    return fake
+
+
+def test_streams_over_the_limit_get_503_with_retry_after(surveillance):
+    server = AsgiServer(web.app, max_streams=0)
+    status, headers, body = response(asyncio.run(request(server, '/video_feed')))
+
+    assert status == 503
+    assert headers[b'retry-after'] == b'5'
+    assert json.loads(body)['limit'] == 0
+    assert server.rejected_streams == 1
+
+
+def test_status_is_served_natively(monkeypatch):
+    monkeypatch.setattr(web, 'build_status', lambda: {'running': False})
+    server = AsgiServer(web.app, max_streams=7)
+    status, _, body = response(asyncio.run(request(server, '/status')))
+
+    assert status == 200
+    assert json.loads(body) == {'running': False,
+                                'asgi': {'streams': 0, 'max_streams': 7, 'rejected_streams': 0}}
+
+
+def test_events_resume_after_last_event_id(monkeypatch):
+    bus = EventBus(tick=0.01).start()
+    monkeypatch.setattr(web, 'event_bus', bus)
+    bus.publish('detections', {'type': 'Motion Detected'})
+    assert bus.wait(0, timeout=2) == 1
+
+    server = AsgiServer(web.app)
+    status, headers, body = response(asyncio.run(
+        request(server, '/events', headers=[(b'last-event-id', b'0')], disconnect_after=0.2)))
+
+    assert status == 200
+    assert headers[b'content-type'] == b'text/event-stream'
+    assert body.startswith(b'retry: 2000\n\n')
+    assert b'id: 1\nevent: update\ndata: {"detections": [{"type": "Motion Detected"}]}' in body
+
+
+def test_other_routes_fall_through_to_the_wsgi_app():
+    flask_app = Flask('fallthrough')
+    flask_app.add_url_rule('/hello', 'hello', lambda: 'hi')
+    status, _, body = response(asyncio.run(request(AsgiServer(flask_app), '/hello')))
+    assert (status, body) == (200, b'hi')
+
+
+def test_cached_frames_skip_the_encode_pool(surveillance):
+    server = AsgiServer(web.app)
+    server.encode_pool = CountingPool()
+    # Already encoded for the 'full' profile without overlays
+    web.stream_hub.encode('cam0', 0, surveillance.frame, 85)
+
+    async def two_viewers():
+        return await asyncio.gather(*[request(server, '/video_feed', b'profile=full&overlay=0',
+                                              disconnect_after=0.3) for _ in range(2)])
+
+    for sent in asyncio.run(two_viewers()):
+        status, _, body = response(sent)
+        assert status == 200
+        assert body.count(b'--frame') == 1
+
+    assert server.encode_pool.submitted == 0
+    assert web.stream_hub.get_stats()['frames_encoded'] == 1
+    assert server.active_streams == 0
@@ -0,0 +1,55 @@
+import numpy as np
+from batch_collector import BatchCollector
+from detector import ObjectDetector, empty_detections
+
+
+class RecordingDetector:
+    """Stands in for ObjectDetector and records every model call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def detect_objects_batch(self, frames, imgsz=None):
+        self.calls.append((len(frames), imgsz))
+        return [np.full(1, frame[0, 0, 0], dtype=empty_detections().dtype) for frame in frames]
+
+
+def make_frame(value):
+    return np.full((8, 8, 3), value, dtype=np.uint8)
+
+
+def test_batches_frames_and_returns_each_its_own_result():
+    detector = RecordingDetector()
+    collector = BatchCollector(detector, max_batch_size=4, max_wait=0.2)
+    try:
+        futures = [collector.submit(make_frame(i), f"cam{i}") for i in range(4)]
+        assert [future.result(2)['confidence'][0] for future in futures] == [0, 1, 2, 3]
+        assert detector.calls == [(4, None)]
+    finally:
+        collector.stop()
+
+
+def test_frames_are_grouped_by_input_size():
+    detector = RecordingDetector()
+    collector = BatchCollector(detector, max_batch_size=8, max_wait=0.2)
+    try:
+        futures = [collector.submit(make_frame(i), imgsz=320 if i % 2 else None) for i in range(4)]
+        for future in futures:
+            future.result(2)
+        assert sorted(detector.calls, key=str) == [(2, 320), (2, None)]
+        assert collector.get_stats()['frames_processed'] == 4
+    finally:
+        collector.stop()
+
+
+def test_roi_crops_keep_their_smaller_input_size():
+    detector = ObjectDetector.__new__(ObjectDetector)
+    requested = []
+
+    def detect_batch(crops, imgsz=None):
+        requested.append(imgsz)
+        return [empty_detections() for _ in crops]
+
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    detector.detect_objects_roi(frame, [(0, 0, 100, 150), (300, 300, 400, 350)], detect_batch=detect_batch)
+    assert requested == [160]
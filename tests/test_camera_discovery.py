@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+import camera_discovery
+from camera_discovery import CameraProbeCache, discover_camera, probe_parallel
+
+
+def test_cache_round_trip(tmp_path):
+    cache = CameraProbeCache(str(tmp_path / 'probe.json'))
+    assert cache.load() is None
+    cache.save([0, 200])
+    assert cache.load() == [0, 200]
+    cache.invalidate()
+    assert cache.load() is None
+
+
+def test_cache_expires_after_max_age(tmp_path, monkeypatch):
+    cache = CameraProbeCache(str(tmp_path / 'probe.json'), max_age=60)
+    cache.save(1)
+    now = time.time()
+    monkeypatch.setattr(camera_discovery.time, 'time', lambda: now + 30)
+    assert cache.load() == 1
+    monkeypatch.setattr(camera_discovery.time, 'time', lambda: now + 61)
+    assert cache.load() is None
+
+
+def test_device_change_invalidates_cache(tmp_path, monkeypatch):
+    cache = CameraProbeCache(str(tmp_path / 'probe.json'))
+    monkeypatch.setattr(camera_discovery, 'device_fingerprint',
+                        lambda: {'platform': 'linux', 'opencv': '4', 'devices': [['/dev/video0', 1.0]]})
+    cache.save(0)
+    assert cache.load() == 0
+
+    monkeypatch.setattr(camera_discovery, 'device_fingerprint',
+                        lambda: {'platform': 'linux', 'opencv': '4', 'devices': [['/dev/video0', 2.0]]})
+    assert cache.load() is None
+
+
+def test_cache_from_another_version_is_ignored(tmp_path):
+    path = tmp_path / 'probe.json'
+    cache = CameraProbeCache(str(path))
+    cache.save(0)
+    entry = json.loads(path.read_text())
+    entry['version'] = camera_discovery.PROBE_CACHE_VERSION + 1
+    path.write_text(json.dumps(entry))
+    assert cache.load() is None
+
+
+def fake_probes(monkeypatch, working):
+    """Replace probe_source; records concurrent opens per index"""
+    lock = threading.Lock()
+    open_now, overlaps, attempts = {}, [], []
+
+    def probe(index, backend=None, cancelled=None):
+        with lock:
+            attempts.append((index, backend))
+            open_now[index] = open_now.get(index, 0) + 1
+            if open_now[index] > 1:
+                overlaps.append(index)
+        time.sleep(0.02)
+        with lock:
+            open_now[index] -= 1
+        if (index, backend) in working:
+            return {'index': index, 'backend': backend, 'width': 640, 'height': 480}
+        return None
+
+    monkeypatch.setattr(camera_discovery, 'probe_source', probe)
+    return attempts, overlaps
+
+
+def test_backends_of_one_index_are_probed_in_turn(monkeypatch):
+    attempts, overlaps = fake_probes(monkeypatch, working={(0, 'b')})
+
+    found = probe_parallel([(0, 'a'), (1, None), (0, 'b'), (0, 'c')], timeout=2.0)
+
+    assert found == [{'index': 0, 'backend': 'b', 'width': 640, 'height': 480}]
+    assert overlaps == []
+    assert (0, 'c') not in attempts  # stops at the first backend that works
+
+
+def test_discovery_prefers_default_backend_and_caches(tmp_path, monkeypatch):
+    attempts, _ = fake_probes(monkeypatch, working={(2, None), (0, 'b')})
+    monkeypatch.setattr(camera_discovery, 'candidate_backends', lambda: [('a', 'A'), ('b', 'B')])
+    cache_path = str(tmp_path / 'probe.json')
+
+    assert discover_camera(indices=range(3), timeout=2.0, cache_path=cache_path) == 2
+
+    attempts.clear()
+    assert discover_camera(indices=range(3), timeout=2.0, cache_path=cache_path) == 2
+    assert attempts == []
+
+
+def test_discovery_falls_back_to_an_explicit_backend(monkeypatch):
+    fake_probes(monkeypatch, working={(0, 'b')})
+    monkeypatch.setattr(camera_discovery, 'candidate_backends', lambda: [('a', 'A'), ('b', 'B')])
+    assert discover_camera(indices=range(2), timeout=2.0) == (0, 'b')
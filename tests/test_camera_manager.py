@@ -0,0 +1,79 @@
+import time
+import pytest
+from surveillance_core import CameraManager, SurveillanceCore
+from video_sources import SyntheticSource, VideoSource
+
+
+class BrokenSource(VideoSource):
+    """A source that takes a while to fail to open"""
+
+    def open(self):
+        time.sleep(0.3)
+        return False
+
+    def is_opened(self):
+        return False
+
+
+def synthetic(seed=0):
+    return SyntheticSource(width=64, height=48, fps=100, seed=seed)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_cameras_start_and_stop_independently():
+    manager = CameraManager([{'id': 'lobby', 'source': synthetic(0)},
+                             {'id': 'gate', 'source': synthetic(1)}])
+    try:
+        assert manager.start_all() == ['lobby', 'gate']
+        assert manager.wait_until_ready(['lobby', 'gate'], timeout=2.0) == ['lobby', 'gate']
+
+        manager.get_camera('lobby').stop_camera()
+        captured = manager.get_health()['gate']['frames_captured']
+        assert wait_for(lambda: manager.get_health()['gate']['frames_captured'] > captured + 5)
+
+        health = manager.get_health()
+        assert (health['lobby']['state'], health['lobby']['working']) == ('stopped', False)
+        assert (health['gate']['state'], health['gate']['working']) == ('running', True)
+        assert manager.is_any_working()
+    finally:
+        manager.stop_all()
+    assert not manager.is_any_working()
+
+
+def test_failing_source_does_not_block_the_others():
+    manager = CameraManager([{'id': 'broken', 'source': BrokenSource()},
+                             {'id': 'gate', 'source': synthetic()}])
+    try:
+        assert manager.start_all() == ['gate']
+        assert manager.wait_until_ready(['broken', 'gate'], timeout=0.5) == ['gate']
+
+        health = manager.get_health()
+        assert (health['broken']['state'], health['broken']['working']) == ('failed', False)
+        assert health['gate']['working'] and health['gate']['frames_captured'] > 0
+    finally:
+        manager.stop_all()
+
+
+def test_duplicate_camera_ids_are_rejected():
+    with pytest.raises(ValueError):
+        CameraManager([{'id': 'a', 'source': synthetic()}, {'id': 'a', 'source': synthetic()}])
+
+
+def test_restart_gets_fresh_motion_detectors():
+    core = SurveillanceCore({'camera_sources': [{'id': 'lobby', 'source': synthetic()}]})
+    assert core.start_surveillance()
+    first = core.motion_detectors['lobby']
+    core.stop_surveillance()
+    assert core.motion_detectors == {}
+
+    assert core.start_surveillance()
+    try:
+        assert core.motion_detectors['lobby'] is not first
+    finally:
+        core.stop_surveillance()
@@ -0,0 +1,93 @@
+import sqlite3
+import threading
+import time
+from database import WriteBehindWriter
+
+INSERT = 'INSERT INTO events (value) VALUES (?)'
+
+
+def make_writer(tmp_path, **options):
+    db_path = str(tmp_path / 'test.db')
+    with sqlite3.connect(db_path) as conn:
+        conn.execute('CREATE TABLE events (id INTEGER PRIMARY KEY AUTOINCREMENT, value INTEGER)')
+    return WriteBehindWriter(db_path, **options)
+
+
+def stored_values(writer):
+    with sqlite3.connect(writer.db_path) as conn:
+        return [row[0] for row in conn.execute('SELECT value FROM events ORDER BY id')]
+
+
+def block_writes(writer):
+    """Hold the writer thread inside _write until the returned gate is set"""
+    entered, gate = threading.Event(), threading.Event()
+    write = writer._write
+
+    def blocked_write(conn, rows):
+        entered.set()
+        gate.wait(5)
+        write(conn, rows)
+
+    writer._write = blocked_write
+    return entered, gate
+
+
+def test_flush_writes_queued_rows_in_one_batch(tmp_path):
+    writer = make_writer(tmp_path, flush_interval=5.0)
+    for value in range(5):
+        assert writer.submit(INSERT, (value,))
+
+    assert writer.flush()
+    assert stored_values(writer) == [0, 1, 2, 3, 4]
+    assert (writer.written, writer.batches) == (5, 1)
+    writer.close()
+
+
+def test_batches_are_capped_at_batch_size(tmp_path):
+    writer = make_writer(tmp_path, batch_size=2, flush_interval=5.0)
+    entered, gate = block_writes(writer)
+    writer.submit(INSERT, (0,))
+    writer.submit(INSERT, (1,))
+    assert entered.wait(2)
+    for value in range(2, 5):
+        writer.submit(INSERT, (value,))
+    gate.set()
+
+    assert writer.flush()
+    assert stored_values(writer) == [0, 1, 2, 3, 4]
+    assert writer.batches == 3
+    writer.close()
+
+
+def test_close_writes_pending_rows_then_stops(tmp_path):
+    writer = make_writer(tmp_path, flush_interval=5.0)
+    for value in range(3):
+        writer.submit(INSERT, (value,))
+
+    writer.close()
+    assert not writer.thread.is_alive()
+    assert stored_values(writer) == [0, 1, 2]
+    assert not writer.submit(INSERT, (3,))
+    assert not writer.flush()
+
+
+def test_full_queue_drops_rows_and_does_not_block_flush_or_close(tmp_path):
+    writer = make_writer(tmp_path, max_queue=2, flush_interval=0.01, put_timeout=0.01)
+    entered, gate = block_writes(writer)
+    writer.submit(INSERT, (0,))
+    assert entered.wait(2)
+    assert writer.submit(INSERT, (1,))
+    assert writer.submit(INSERT, (2,))
+    assert not writer.submit(INSERT, (3,))
+    assert writer.dropped == 1
+
+    started = time.time()
+    assert not writer.flush(timeout=0.1)
+    writer.close(timeout=0.1)
+    assert time.time() - started < 1.0
+
+    gate.set()
+    deadline = time.time() + 2
+    while writer.written < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    assert stored_values(writer) == [0, 1, 2]
@@ -0,0 +1,49 @@
+import numpy as np
+from detection_cache import DetectionCache
+from detector import empty_detections
+
+
+def scene(value=60):
+    return np.full((240, 320, 3), value, dtype=np.uint8)
+
+
+def test_unchanged_scene_reuses_detections():
+    cache = DetectionCache()
+    detections = empty_detections()
+    fingerprint = cache.fingerprint(scene())
+    assert cache.lookup(fingerprint, now=0.0) is None
+    cache.store(fingerprint, detections, now=0.0)
+
+    assert cache.lookup(cache.fingerprint(scene(61)), now=1.0) is detections
+    assert cache.get_stats()['hits'] == 1
+
+
+def test_small_moving_object_invalidates_the_cache():
+    cache = DetectionCache(threshold=3.0, cell_threshold=12.0)
+    cache.store(cache.fingerprint(scene()), empty_detections(), now=0.0)
+
+    frame = scene()
+    frame[100:120, 150:170] = 255  # Barely moves the frame mean, but one cell changes a lot
+    assert cache.lookup(cache.fingerprint(frame), now=1.0) is None
+
+
+def test_global_change_invalidates_the_cache():
+    cache = DetectionCache()
+    cache.store(cache.fingerprint(scene(60)), empty_detections(), now=0.0)
+    assert cache.lookup(cache.fingerprint(scene(70)), now=1.0) is None
+
+
+def test_entries_are_refreshed_after_the_interval():
+    cache = DetectionCache(refresh_interval=5.0)
+    fingerprint = cache.fingerprint(scene())
+    cache.store(fingerprint, empty_detections(), now=0.0)
+    assert cache.lookup(fingerprint, now=4.9) is not None
+    assert cache.lookup(fingerprint, now=5.0) is None
+    assert cache.get_stats()['forced_refreshes'] == 1
+
+
+def test_resolution_change_misses():
+    cache = DetectionCache()
+    cache.store(cache.fingerprint(scene()), empty_detections(), now=0.0)
+    cache.fingerprint_size = (16, 12)
+    assert cache.lookup(cache.fingerprint(scene()), now=1.0) is None
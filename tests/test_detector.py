@@ -0,0 +1,74 @@
+import threading
+import numpy as np
+import pytest
+from detector import DETECTION_DTYPE, ObjectDetector
+
+
+def test_failed_background_load_is_reported(tmp_path, caplog):
+    pytest.importorskip('ultralytics')
+    model_path = tmp_path / 'empty.pt'
+    model_path.write_bytes(b'')
+
+    detector = ObjectDetector(str(model_path), load_async=True)
+    detector.loader_thread.join(timeout=60)
+
+    assert detector.load_error
+    assert not detector.is_ready()
+    assert 'Model failed to load' in caplog.text
+    assert len(detector.detect_objects(np.zeros((48, 64, 3), dtype=np.uint8))) == 0
+
+
+def make_ready_detector(calls):
+    """A detector without a model whose backend returns one box per frame"""
+    detector = ObjectDetector.__new__(ObjectDetector)
+    detector.loaded = threading.Event()
+    detector.loaded.set()
+
+    def predict(frames, imgsz=None):
+        calls.append(([frame.shape for frame in frames], imgsz))
+        return [one_box() for _ in frames]
+
+    detector._predict = predict
+    return detector
+
+
+def one_box():
+    detections = np.empty(1, dtype=DETECTION_DTYPE)
+    detections['bbox'] = (1, 2, 11, 12)
+    detections['confidence'] = 0.9
+    detections['class_id'] = 0
+    return detections
+
+
+def test_roi_crops_run_in_one_batch_and_boxes_return_to_frame_coordinates():
+    calls = []
+    detector = make_ready_detector(calls)
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    detections = detector.detect_objects_roi(frame, [(100, 50, 200, 150), (400, 300, 500, 340)])
+
+    assert calls == [([(100, 100, 3), (40, 100, 3)], 128)]
+    assert detections['bbox'].tolist() == [[101, 52, 111, 62], [401, 302, 411, 312]]
+
+
+def test_roi_without_regions_skips_the_model():
+    calls = []
+    detector = make_ready_detector(calls)
+    assert len(detector.detect_objects_roi(np.zeros((48, 64, 3), dtype=np.uint8), [])) == 0
+    assert calls == []
+
+
+def test_roi_full_frame_fallback_goes_through_detect_batch():
+    calls, batched = [], []
+    detector = make_ready_detector(calls)
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    def detect_batch(frames, imgsz=None):
+        batched.append(([f.shape for f in frames], imgsz))
+        return [one_box() for _ in frames]
+
+    detections = detector.detect_objects_roi(frame, [(0, 0, 600, 450)], detect_batch=detect_batch)
+
+    assert batched == [([(480, 640, 3)], None)]
+    assert calls == []
+    assert detections['bbox'].tolist() == [[1, 2, 11, 12]]
@@ -0,0 +1,67 @@
+import json
+from event_bus import EventBus, format_sse
+
+
+def wait_for_batch(bus, after_id):
+    assert bus.wait(after_id, timeout=2.0) > after_id
+    return bus.last_id
+
+
+def test_events_in_one_tick_become_one_batch():
+    bus = EventBus(tick=0.05).start()
+    bus.publish('detections', {'type': 'person'})
+    bus.publish('detections', {'type': 'car'})
+    bus.publish('status', {'running': False})
+    bus.publish('status', {'running': True})
+
+    last_id = wait_for_batch(bus, 0)
+    messages = bus.read(0, timeout=0)
+    assert messages == [(last_id, 'update', {
+        'detections': [{'type': 'person'}, {'type': 'car'}],
+        'status': {'running': True}
+    })]
+    assert bus.get_stats()['published'] == 4
+
+
+def test_reader_resumes_after_its_cursor():
+    bus = EventBus(tick=0.01).start()
+    ids = []
+    for index in range(3):
+        bus.publish('detections', index)
+        ids.append(wait_for_batch(bus, ids[-1] if ids else 0))
+
+    messages = bus.read(ids[0], timeout=0)
+    assert [event_id for event_id, _, _ in messages] == ids[1:]
+    assert [data['detections'] for _, _, data in messages] == [[1], [2]]
+    assert bus.read(ids[-1], timeout=0.01) == []
+
+
+def test_lagging_reader_gets_a_single_resync():
+    bus = EventBus(tick=0.01, max_lag=2).start()
+    last_id = 0
+    for index in range(4):
+        bus.publish('detections', index)
+        last_id = wait_for_batch(bus, last_id)
+
+    assert bus.read(0, timeout=0) == [(last_id, 'resync', {'last_id': last_id})]
+    assert bus.read(last_id - 2, timeout=0)[0][1] == 'update'
+    assert bus.get_stats()['resyncs'] == 1
+
+
+def test_lost_history_or_unknown_cursor_resyncs():
+    bus = EventBus(tick=0.01, history=2, max_lag=50).start()
+    last_id = 0
+    for index in range(4):
+        bus.publish('detections', index)
+        last_id = wait_for_batch(bus, last_id)
+
+    assert bus.read(1, timeout=0)[0][1] == 'resync'
+    assert bus.read(last_id + 10, timeout=0)[0][1] == 'resync'
+
+
+def test_format_sse():
+    message = format_sse(7, 'update', {'count': 2})
+    assert message.endswith('\n\n')
+    lines = message.strip().split('\n')
+    assert lines[:2] == ['id: 7', 'event: update']
+    assert json.loads(lines[2][len('data: '):]) == {'count': 2}
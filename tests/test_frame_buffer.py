@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from frame_buffer import FrameRingBuffer
+
+
+def make_frame(value, shape=(4, 6, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_sequence_numbers_increase_per_write():
+    ring = FrameRingBuffer(size=4)
+    assert ring.latest() is None
+    assert [ring.write(make_frame(i)) for i in range(3)] == [0, 1, 2]
+
+    seq, timestamp, frame = ring.latest()
+    assert seq == 2
+    assert timestamp > 0
+    assert frame[0, 0, 0] == 2
+
+
+def test_get_returns_buffered_frames_without_copying():
+    ring = FrameRingBuffer(size=4)
+    ring.write(make_frame(7), timestamp=12.5)
+
+    timestamp, frame = ring.get(0)
+    assert timestamp == 12.5
+    assert frame[0, 0, 0] == 7
+    assert np.shares_memory(frame, ring.slots)
+
+
+def test_overwritten_frames_are_reported_invalid():
+    ring = FrameRingBuffer(size=3)
+    for i in range(3):
+        ring.write(make_frame(i))
+    assert ring.is_valid(0)
+
+    ring.write(make_frame(3))  # Reuses slot 0
+    assert not ring.is_valid(0)
+    assert ring.get(0) is None
+    assert ring.get(3)[1][0, 0, 0] == 3
+    assert ring.get(4) is None
+
+
+def test_next_slot_is_invalid_until_commit():
+    ring = FrameRingBuffer(size=3)
+    ring.write(make_frame(0))
+    ring.write(make_frame(1))
+    ring.write(make_frame(2))
+
+    slot = ring.next_slot()  # Slot of seq 0, about to become seq 3
+    assert not ring.is_valid(0)
+    slot[:] = 9
+    assert ring.commit() == 3
+    assert ring.latest()[2][0, 0, 0] == 9
+
+
+def test_resolution_change_reallocates_slots():
+    ring = FrameRingBuffer(size=3)
+    ring.write(make_frame(1))
+    ring.write(make_frame(2, shape=(8, 10, 3)))
+
+    assert ring.frame_shape == (8, 10, 3)
+    assert ring.get(0) is None
+    assert ring.latest()[0] == 1
+
+
+def test_ring_needs_two_slots():
+    with pytest.raises(ValueError):
+        FrameRingBuffer(size=1)
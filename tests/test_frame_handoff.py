@@ -0,0 +1,81 @@
+import threading
+import time
+import numpy as np
+from frame_buffer import FrameChannel, FrameRingBuffer
+
+
+def make_frame(value):
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def run_later(delay, function, *args):
+    timer = threading.Timer(delay, function, args)
+    timer.start()
+    return timer
+
+
+def test_wait_for_frame_wakes_on_commit():
+    ring = FrameRingBuffer(size=4)
+    run_later(0.05, ring.write, make_frame(5))
+
+    started = time.time()
+    seq, _, frame = ring.wait_for_frame(-1, timeout=2)
+    assert seq == 0 and frame[0, 0, 0] == 5
+    assert time.time() - started < 1
+
+
+def test_wait_for_frame_skips_to_newest():
+    ring = FrameRingBuffer(size=4)
+    for i in range(3):
+        ring.write(make_frame(i))
+    assert ring.wait_for_frame(0, timeout=0)[0] == 2
+    assert ring.wait_for_frame(2, timeout=0.05) is None
+
+
+def test_wait_after_reset_blocks_until_new_frame():
+    ring = FrameRingBuffer(size=4)
+    ring.write(make_frame(1))
+    ring.write(make_frame(2))
+    ring.reset()
+
+    # A restarted consumer must not get an empty result straight away
+    started = time.time()
+    assert ring.wait_for_frame(-1, timeout=0.1) is None
+    assert time.time() - started >= 0.09
+
+    run_later(0.05, ring.write, make_frame(3))
+    seq, _, frame = ring.wait_for_frame(-1, timeout=2)
+    assert seq == 2 and frame[0, 0, 0] == 3
+
+
+def test_reset_wakes_waiters():
+    ring = FrameRingBuffer(size=4)
+    ring.write(make_frame(1))
+    run_later(0.05, ring.reset)
+
+    started = time.time()
+    assert ring.wait_for_frame(0, timeout=2) is None
+    assert time.time() - started < 1
+
+
+def test_channel_hands_out_latest_with_metadata():
+    channel = FrameChannel()
+    assert channel.latest() is None
+    channel.publish(3, make_frame(3), metadata={'overlay': []})
+    channel.publish(4, make_frame(4), metadata={'overlay': [1]})
+
+    assert channel.latest()[0] == 4
+    assert channel.latest(with_metadata=True)[2] == {'overlay': [1]}
+    assert channel.wait(3, timeout=0)[0] == 4
+    assert channel.wait(4, timeout=0.05) is None
+
+
+def test_channel_clear_wakes_waiters():
+    channel = FrameChannel()
+    channel.publish(0, make_frame(0))
+    run_later(0.05, channel.clear)
+
+    started = time.time()
+    assert channel.wait(0, timeout=2) is None
+    assert time.time() - started < 1
+    assert channel.latest() is None
@@ -0,0 +1,79 @@
+import threading
+import time
+import numpy as np
+from inference_executor import InferenceExecutor
+
+
+def make_frame():
+    return np.zeros((4, 4, 3), dtype=np.uint8)
+
+
+def wait_for_results(executor, count, timeout=2.0):
+    results = []
+    deadline = time.time() + timeout
+    while len(results) < count and time.time() < deadline:
+        results.extend(executor.poll())
+        time.sleep(0.01)
+    return results
+
+
+def test_full_queue_drops_the_oldest_frame():
+    release = threading.Event()
+    started = threading.Event()
+
+    def infer(frame, context):
+        started.set()
+        release.wait(2)
+        return context
+
+    executor = InferenceExecutor(infer, max_queue=2)
+    executor.start()
+    try:
+        executor.submit(0, make_frame(), 'busy')
+        assert started.wait(2)
+        # Worker is busy with seq 0: queue 1 and 2, then 3 pushes out 1
+        for seq in (1, 2, 3):
+            executor.submit(seq, make_frame(), f"frame {seq}")
+        release.set()
+
+        results = wait_for_results(executor, 3)
+        assert [result['seq'] for result in results] == [0, 2, 3]
+        assert executor.get_stats()['dropped'] == 1
+    finally:
+        executor.stop()
+
+
+def test_results_carry_seq_and_capture_timestamp():
+    executor = InferenceExecutor(lambda frame, context: context)
+    executor.start()
+    try:
+        executor.submit(7, make_frame(), 'detections', timestamp=123.5)
+        (result,) = wait_for_results(executor, 1)
+        assert (result['seq'], result['timestamp'], result['detections']) == (7, 123.5, 'detections')
+        assert result['frame_shape'] == (4, 4, 3)
+    finally:
+        executor.stop()
+
+
+def test_out_of_order_results_are_discarded_as_stale():
+    executor = InferenceExecutor(lambda frame, context: context)
+    executor.results.extend([{'seq': 5}, {'seq': 3}, {'seq': 6}])
+    assert [result['seq'] for result in executor.poll()] == [5, 6]
+    assert executor.get_stats()['stale_results'] == 1
+
+
+def test_inference_errors_do_not_stop_the_worker():
+    def infer(frame, context):
+        if context == 'bad':
+            raise RuntimeError("model failed")
+        return context
+
+    executor = InferenceExecutor(infer, max_queue=4)
+    executor.start()
+    try:
+        executor.submit(0, make_frame(), 'bad')
+        executor.submit(1, make_frame(), 'good')
+        results = wait_for_results(executor, 1)
+        assert [result['seq'] for result in results] == [1]
+    finally:
+        executor.stop()
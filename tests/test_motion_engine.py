@@ -0,0 +1,77 @@
+import numpy as np
+from motion_engine import MotionDetector, summarize_motion
+
+
+def detector_with_mask(mask, **options):
+    """A MotionDetector whose foreground mask is fixed (no MOG2 warm-up)"""
+    detector = MotionDetector(motion_threshold=0, morph_kernel=1, **options)
+    detector.foreground_mask = lambda frame: mask
+    return detector
+
+
+def blank_mask(shape=(120, 160)):
+    return np.zeros(shape, dtype=np.uint8)
+
+
+def test_nearby_blobs_merge_and_distant_ones_stay_apart():
+    mask = blank_mask()
+    mask[10:20, 10:20] = 255
+    mask[10:20, 30:40] = 255  # 10 px gap: merged
+    mask[80:90, 100:110] = 255  # far away: separate
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+
+    blobs = detector_with_mask(mask, merge_distance=20).detect(frame)
+
+    assert [(blob['bbox'], blob['area']) for blob in blobs] == [((10, 10, 30, 10), 200.0),
+                                                                 ((100, 80, 10, 10), 100.0)]
+    assert len(detector_with_mask(mask, merge_distance=5).detect(frame)) == 3
+
+
+def test_chain_of_blobs_merges_into_one():
+    mask = blank_mask((40, 640))
+    for x in range(0, 600, 20):
+        mask[10:20, x:x + 10] = 255
+
+    blobs = detector_with_mask(mask, merge_distance=12).detect(np.zeros((40, 640, 3), dtype=np.uint8))
+
+    assert len(blobs) == 1
+    assert blobs[0]['bbox'] == (0, 10, 590, 10)
+    assert blobs[0]['area'] == 30 * 100
+
+
+def test_noise_specks_are_dropped_before_merging():
+    mask = blank_mask()
+    mask[50:60, 50:60] = 255
+    mask[50:53, 62:65] = 255  # 9 px speck right next to the blob
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+
+    blobs = detector_with_mask(mask, merge_distance=20, noise_area=50).detect(frame)
+
+    assert [(blob['bbox'], blob['area']) for blob in blobs] == [((50, 50, 10, 10), 100.0)]
+
+
+def test_downscaled_boxes_and_areas_are_in_frame_coordinates():
+    mask = blank_mask((60, 80))  # half of the 120x160 frame
+    mask[10:20, 20:30] = 255
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+
+    blobs = detector_with_mask(mask, scale=0.5, noise_area=50).detect(frame)
+
+    assert [(blob['bbox'], blob['area']) for blob in blobs] == [((40, 20, 20, 20), 400.0)]
+
+
+def test_mog2_reports_a_new_object():
+    detector = MotionDetector(motion_threshold=100)
+    background = np.full((120, 160, 3), 40, dtype=np.uint8)
+    for _ in range(30):
+        detector.detect(background)
+
+    frame = background.copy()
+    frame[40:80, 60:100] = 220
+    blobs = detector.detect(frame)
+
+    assert len(blobs) == 1
+    x, y, w, h = blobs[0]['bbox']
+    assert abs(x - 60) <= 2 and abs(y - 40) <= 2 and abs(w - 40) <= 4 and abs(h - 40) <= 4
+    assert summarize_motion(blobs)['regions'] == 1
+    assert summarize_motion([]) is None
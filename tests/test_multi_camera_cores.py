@@ -0,0 +1,69 @@
+import importlib.util
+import os
+import threading
+import numpy as np
+from config import Config
+from detector import empty_detections
+
+# The YOLO core shares its module name with the root motion core
+_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                     'Flask application', 'surveillance_core.py')
+_spec = importlib.util.spec_from_file_location('yolo_surveillance_core', _path)
+yolo_core = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(yolo_core)
+
+
+class FakeDetector:
+    """Records the size of every batched model call"""
+
+    load_error = None
+
+    def __init__(self):
+        self.batches = []
+
+    def is_ready(self):
+        return True
+
+    def detect_objects_batch(self, frames, imgsz=None):
+        self.batches.append(len(frames))
+        return [empty_detections() for _ in frames]
+
+    def filter_human_detections(self, detections):
+        return detections
+
+
+def make_config(tmp_path):
+    class TestConfig(Config):
+        DATABASE_PATH = str(tmp_path / 'database' / 'test.db')
+        CAMERA_SOURCES = [{'id': 'lobby', 'source': 'synthetic://?realtime=0'},
+                          {'id': 'gate', 'source': 'synthetic://?realtime=0'}]
+        INFERENCE_BATCH_SIZE = 2
+        INFERENCE_BATCH_WAIT = 1.0
+        ROI_INFERENCE = {'enabled': False}
+        DETECTION_CACHE = {'enabled': False}
+        TRACKER = {'enabled': False}
+        INFERENCE_ASYNC = False
+    return TestConfig
+
+
+def test_shared_collector_batches_frames_from_two_cores(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the cores log to ./logs
+    detector = FakeDetector()
+    cores = yolo_core.create_multi_camera_cores(make_config(tmp_path), detector=detector)
+    assert list(cores) == ['lobby', 'gate']
+    collector = cores['lobby'].batch_collector
+    assert cores['gate'].batch_collector is collector and cores['gate'].detector is detector
+
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    threads = [threading.Thread(target=core._infer, args=(frame, [])) for core in cores.values()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert detector.batches == [2]
+    assert collector.get_stats()['frames_processed'] == 2
+
+    yolo_core.stop_multi_camera_cores(cores)
+    assert not collector.running
+    assert not collector.worker_thread.is_alive()
@@ -0,0 +1,72 @@
+import numpy as np
+from stream_hub import StreamHub
+from surveillance_core import SurveillanceCore
+from video_sources import SyntheticSource
+
+BLOBS = [{'bbox': (10, 12, 20, 16), 'area': 300}]
+
+
+def make_core():
+    return SurveillanceCore({'camera_sources': [{'id': 'lobby', 'source': SyntheticSource(width=64, height=48)}]})
+
+
+def capture(core, value):
+    """Put a frame into the camera ring as the capture loop would"""
+    frame = np.full((48, 64, 3), value, dtype=np.uint8)
+    camera = core.camera_manager.get_camera('lobby')
+    seq = camera.frame_buffer.write(frame, 1.0)
+    return seq, camera.get_frame(seq)[1]
+
+
+def test_overlay_is_drawn_on_demand_once_per_seq():
+    core = make_core()
+    drawn = []
+    draw_overlay = core.draw_overlay
+    core.draw_overlay = lambda frame, metadata, scale=1.0: drawn.append(scale) or draw_overlay(frame, metadata, scale)
+    hub = StreamHub(core)
+
+    seq, frame = capture(core, 60)
+    core.handle_motion_result('lobby', seq, frame, BLOBS, 1.0)
+    for _ in range(3):
+        assert hub.next_frame('lobby', -1, timeout=0)[0] == seq
+    assert len(drawn) == 1
+
+    # The published frame is the untouched capture frame
+    assert core.get_processed_frame('lobby', overlay=False) is frame
+    assert (frame == 60).all()
+
+    seq, frame = capture(core, 70)
+    core.handle_motion_result('lobby', seq, frame, [], 2.0)
+    assert hub.next_frame('lobby', seq - 1, timeout=0)[0] == seq
+    assert hub.next_frame('lobby', seq - 1, timeout=0)[0] == seq
+    assert len(drawn) == 2
+
+    # A snapshot with overlays is rendered into a copy
+    assert not np.array_equal(core.get_processed_frame('lobby'), frame)
+    assert (frame == 70).all()
+
+
+def test_get_overlay_describes_the_published_frame():
+    core = make_core()
+    seq, frame = capture(core, 60)
+    core.handle_motion_result('lobby', seq, frame, BLOBS, 1.0)
+
+    overlay = core.get_overlay('lobby')
+    assert (overlay['seq'], overlay['width'], overlay['height']) == (seq, 64, 48)
+    assert overlay['boxes'] == [{'bbox': [10, 12, 20, 16], 'label': 'Motion Detected'}]
+    assert overlay['status'] == 'SURVEILLANCE ACTIVE'
+    assert core.wait_for_frame_packet('lobby', -1, timeout=0)[2]['overlay'] == {
+        key: value for key, value in overlay.items() if key not in ('seq', 'width', 'height')}
+
+
+def test_result_without_frame_reports_motion_but_publishes_nothing():
+    core = make_core()
+    detections = []
+    core.set_detection_callback(detections.append)
+    seq, frame = capture(core, 60)
+    core.handle_motion_result('lobby', seq, frame, [], 1.0)
+
+    core.handle_motion_result('lobby', seq + 1, None, BLOBS, 2.0)
+
+    assert [(d['type'], d['camera']) for d in detections] == [('Motion Detected', 'lobby')]
+    assert core.get_overlay('lobby')['seq'] == seq
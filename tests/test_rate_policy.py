@@ -0,0 +1,45 @@
+from rate_policy import InferenceRatePolicy
+
+
+def test_first_frame_always_runs():
+    policy = InferenceRatePolicy()
+    assert policy.should_infer(0, now=0.0)
+    assert policy.get_stats()['last_decision']['reason'] == 'first frame'
+
+
+def test_active_scene_runs_every_interval():
+    policy = InferenceRatePolicy(motion_area=100, active_interval=3)
+    decisions = [policy.should_infer(500, now=i * 0.1) for i in range(7)]
+    assert decisions == [True, False, False, True, False, False, True]
+    assert policy.state == 'active'
+
+
+def test_quiet_scene_backs_off_to_heartbeat():
+    policy = InferenceRatePolicy(motion_area=100, cooldown=1.0, heartbeat=2.0, min_idle_interval=0.25)
+    runs = [t / 20 for t in range(200) if policy.should_infer(0, now=t / 20)]
+
+    # Gaps double (0.25, 0.5, 1, 2) and then stay at the heartbeat
+    gaps = [round(b - a, 2) for a, b in zip(runs, runs[1:])]
+    assert gaps[:4] == [0.25, 0.5, 1.0, 2.0]
+    assert set(gaps[4:]) == {2.0}
+    assert policy.state == 'idle'
+
+
+def test_motion_resets_to_active_rate():
+    policy = InferenceRatePolicy(motion_area=100, cooldown=1.0, heartbeat=4.0)
+    for t in range(100):
+        policy.should_infer(0, now=t / 10)
+    assert policy.idle_interval == 4.0
+
+    assert policy.should_infer(500, now=10.0)
+    assert policy.state == 'active'
+    assert policy.idle_interval == policy.min_idle_interval
+
+
+def test_detections_count_as_activity():
+    policy = InferenceRatePolicy(motion_area=100, cooldown=1.0)
+    policy.should_infer(0, now=0.0)
+    policy.notify_detections(2, now=0.5)
+    assert policy.should_infer(0, now=0.6)
+    assert policy.state == 'active'
+    assert policy.get_stats()['inferences_run'] == 2
@@ -0,0 +1,108 @@
+import multiprocessing as mp
+import queue
+import threading
+import numpy as np
+from process_pipeline import ProcessCamera, SharedFrameRing, capture_worker
+
+
+def make_frame(value, shape=(4, 6, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_sequence_and_overwrite_semantics():
+    ring = SharedFrameRing.create(3, (4, 6, 3), mp.get_context('spawn').Condition())
+    try:
+        assert ring.latest() is None
+        assert [ring.write(make_frame(i)) for i in range(4)] == [0, 1, 2, 3]
+
+        seq, _, frame = ring.latest()
+        assert seq == 3 and frame[0, 0, 0] == 3
+        assert ring.get(0) is None  # Overwritten by seq 3
+        assert not ring.is_valid(0)
+        assert ring.get(2)[1][0, 0, 0] == 2
+        assert ring.get(4) is None
+    finally:
+        ring.unlink()
+
+
+def test_attached_ring_sees_writes_without_copying():
+    condition = mp.get_context('spawn').Condition()
+    ring = SharedFrameRing.create(4, (4, 6, 3), condition)
+    try:
+        reader = SharedFrameRing.attach(ring.name, 4, (4, 6, 3), condition)
+        ring.write(make_frame(5), timestamp=1.5)
+
+        seq, timestamp, frame = reader.wait_for_frame(-1, timeout=1)
+        assert (seq, timestamp, frame[0, 0, 0]) == (0, 1.5, 5)
+        assert not frame.flags.owndata
+        assert reader.wait_for_frame(0, timeout=0.05) is None
+    finally:
+        ring.unlink()
+
+
+def test_write_resizes_to_ring_shape():
+    ring = SharedFrameRing.create(2, (4, 6, 3), mp.get_context('spawn').Condition())
+    try:
+        ring.write(make_frame(9, shape=(8, 12, 3)))
+        assert ring.latest()[2].shape == (4, 6, 3)
+    finally:
+        ring.unlink()
+
+
+def test_capture_process_waits_for_consumer():
+    context = mp.get_context('spawn')
+    condition, events = context.Condition(), context.Queue()
+    stop_event, consumer_ready = context.Event(), context.Event()
+    process = context.Process(target=capture_worker, daemon=True, args=(
+        'test', 'synthetic://?realtime=0&max_frames=20&width=32&height=24', None, 4,
+        condition, events, stop_event, consumer_ready, 30))
+    process.start()
+    ring = None
+    try:
+        kind, name, shape, _ = events.get(timeout=30)
+        assert kind == 'ready'
+        ring = SharedFrameRing.attach(name, 4, shape, condition)
+
+        # Only the first frame exists until a consumer is ready
+        assert ring.wait_for_frame(0, timeout=0.3) is None
+        assert ring.latest_seq == 0
+
+        consumer_ready.set()
+        assert events.get(timeout=30) == ('finished', 20)
+        assert ring.latest_seq == 19
+    finally:
+        stop_event.set()
+        process.join(timeout=5)
+        if ring is not None:
+            ring.unlink()
+
+
+def test_results_are_relayed_even_when_their_frame_was_overwritten():
+    camera = ProcessCamera('cam0', source='synthetic', buffer_size=2)
+    camera.frame_buffer = SharedFrameRing.create(2, (4, 6, 3), mp.get_context('spawn').Condition())
+    try:
+        for i in range(3):
+            camera.frame_buffer.write(make_frame(i))
+        results = []
+        camera.on_result = lambda seq, frame, blobs, timestamp: results.append((seq, frame, blobs))
+        camera.events = queue.Queue()
+        camera.running = True
+        blobs = [{'bbox': (0, 0, 2, 2), 'area': 4}]
+        camera.events.put(('result', 0, 1.0, blobs))
+        camera.events.put(('result', 2, 2.0, blobs))
+        camera.events.put(('failed', 'Capture process error: gone'))
+
+        thread = threading.Thread(target=camera._event_loop)
+        thread.start()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert [(seq, frame is None, b) for seq, frame, b in results] == [(0, True, blobs), (2, False, blobs)]
+        assert results[1][1][0, 0, 0] == 2
+
+        # A failure after start leaves the camera stopped, not running with dead workers
+        health = camera.get_health()
+        assert (health['state'], health['working'], health['results_without_frame']) == ('failed', False, 1)
+        assert not camera.running
+    finally:
+        camera.frame_buffer.unlink()
@@ -0,0 +1,109 @@
+import threading
+import pytest
+import app as web
+from startup import BackgroundLoader
+
+
+class FakeSurveillance:
+    def get_system_status(self):
+        return {'running': False, 'cameras': {}}
+
+
+def counting_factory(gate=None, error=None):
+    calls = []
+
+    def factory():
+        calls.append(threading.current_thread().name)
+        if gate is not None:
+            gate.wait(5)
+        if error:
+            raise RuntimeError(error)
+        return FakeSurveillance()
+
+    return factory, calls
+
+
+@pytest.fixture
+def fresh_services(monkeypatch):
+    """Let each test start the app services from scratch with its own loader"""
+    def install(factory):
+        monkeypatch.setattr(web, 'stats_thread', None)
+        monkeypatch.setattr(web, 'surveillance_loader', BackgroundLoader('Surveillance system', factory))
+        return web.surveillance_loader
+    return install
+
+
+def test_loader_runs_the_factory_once_and_reports_timing():
+    factory, calls = counting_factory()
+    loader = BackgroundLoader('thing', factory)
+    assert loader.status()['state'] == 'pending'
+    assert loader.get() is None
+
+    loader.start()
+    loader.start()
+    assert isinstance(loader.get(timeout=2), FakeSurveillance)
+    assert len(calls) == 1
+
+    status = loader.status()
+    assert (status['state'], status['ready'], status['error']) == ('ready', True, None)
+    assert status['load_seconds'] >= 0
+
+
+def test_loader_failure_is_reported():
+    factory, _ = counting_factory(error='no camera')
+    loader = BackgroundLoader('thing', factory).start()
+    assert loader.get(timeout=2) is None
+    assert loader.status()['state'] == 'failed'
+    assert loader.status()['error'] == 'no camera'
+
+
+def test_status_reports_not_ready_until_the_system_is_loaded(fresh_services):
+    gate = threading.Event()
+    factory, _ = counting_factory(gate)
+    loader = fresh_services(factory)
+    client = web.app.test_client()
+
+    status = client.get('/status').get_json()
+    assert status['ready'] is False
+    assert status['startup']['state'] == 'loading'
+
+    gate.set()
+    assert loader.loaded.wait(2)
+    status = client.get('/status').get_json()
+    assert status['ready'] is True
+    assert status['startup']['state'] == 'ready'
+
+
+def test_status_shows_a_loader_failure(fresh_services):
+    factory, _ = counting_factory(error='camera exploded')
+    loader = fresh_services(factory)
+    web.start_services()
+    assert loader.loaded.wait(2)
+
+    status = web.app.test_client().get('/status').get_json()
+    assert status['ready'] is False
+    assert status['startup'] == dict(status['startup'], state='failed', error='camera exploded')
+
+
+def test_concurrent_start_services_builds_the_system_once(fresh_services):
+    gate = threading.Event()
+    factory, calls = counting_factory(gate)
+    loader = fresh_services(factory)
+    barrier = threading.Barrier(8)
+
+    def start():
+        barrier.wait()
+        web.start_services()
+
+    threads = [threading.Thread(target=start) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    stats_thread = web.stats_thread
+    gate.set()
+
+    assert loader.loaded.wait(2)
+    assert len(calls) == 1
+    web.start_services()
+    assert web.stats_thread is stats_thread
@@ -0,0 +1,136 @@
+import cv2
+import numpy as np
+from stream_hub import AdaptiveProfile, StreamHub
+
+
+class FakeSurveillance:
+    """Just enough of SurveillanceCore for the hub"""
+
+    def __init__(self):
+        self.overwritten = set()
+        self.overlays_drawn = 0
+
+    def default_camera_id(self):
+        return 'cam0'
+
+    def is_frame_current(self, camera_id, seq):
+        return seq not in self.overwritten
+
+    def draw_overlay(self, frame, metadata, scale=1.0):
+        self.overlays_drawn += 1
+        frame[:10, :10] = 255
+
+
+def make_frame(value=80):
+    return np.full((120, 160, 3), value, dtype=np.uint8)
+
+
+def decode(jpeg):
+    return cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+
+
+def test_each_frame_is_encoded_once_for_all_viewers():
+    hub = StreamHub(FakeSurveillance())
+    frame = make_frame()
+    first = hub.encode('cam0', 0, frame)
+    for _ in range(4):
+        assert hub.encode('cam0', 0, frame) == first
+
+    stats = hub.get_stats()
+    assert (stats['frames_encoded'], stats['frames_served'], stats['encodes_saved']) == (1, 5, 4)
+    assert decode(first[1]).shape == (120, 160, 3)
+
+
+def test_slow_viewer_gets_the_newest_encoded_frame():
+    hub = StreamHub(FakeSurveillance())
+    hub.encode('cam0', 5, make_frame(50))
+    seq, jpeg = hub.encode('cam0', 3, make_frame(30))
+    assert seq == 5
+    assert abs(int(decode(jpeg).mean()) - 50) <= 2
+
+
+def test_overwritten_frame_is_not_cached():
+    surveillance = FakeSurveillance()
+    surveillance.overwritten.add(1)
+    hub = StreamHub(surveillance)
+    assert hub.encode('cam0', 1, make_frame()) == (1, None)
+    assert hub.encode('cam0', 2, make_frame())[1] is not None
+
+
+def test_reset_drops_cached_frames():
+    hub = StreamHub(FakeSurveillance())
+    hub.encode('cam0', 9, make_frame())
+    hub.reset()
+    assert hub.encode('cam0', 0, make_frame())[0] == 0
+
+
+def test_variants_are_encoded_separately():
+    surveillance = FakeSurveillance()
+    hub = StreamHub(surveillance)
+    frame = make_frame()
+    _, full = hub.encode('cam0', 0, frame)
+    _, small = hub.encode('cam0', 0, frame, width=80)
+    _, overlaid = hub.encode('cam0', 0, frame, width=80, overlay=True, metadata={})
+
+    assert decode(full).shape[:2] == (120, 160)
+    assert decode(small).shape[:2] == (60, 80)
+    assert small != overlaid
+    assert surveillance.overlays_drawn == 1
+    assert hub.get_stats()['frames_encoded'] == 3
+    # The overlay is drawn into a copy, never into the ring buffer frame
+    assert frame.max() == 80
+
+
+def test_least_recently_used_variant_is_evicted():
+    hub = StreamHub(FakeSurveillance(), max_variants=2)
+    frame = make_frame()
+    hub.encode('cam0', 0, frame, quality=50)
+    hub.encode('cam0', 0, frame, quality=60)
+    hub.encode('cam0', 0, frame, quality=50)
+    hub.encode('cam0', 0, frame, quality=70)
+
+    assert hub.get_stats()['variants'] == 2
+    hub.encode('cam0', 0, frame, quality=50)
+    assert hub.get_stats()['frames_encoded'] == 3
+
+
+def test_adaptive_profile_steps_down_when_congested_and_back_up_when_idle():
+    profile = AdaptiveProfile(['high', 'medium', 'low'], window=1.0, upgrade_windows=2)
+    start = profile.window_start
+
+    profile.record_send(0.8, now=start + 1.0)
+    assert profile.profile == 'medium'
+    profile.record_send(0.9, now=start + 2.0)
+    assert profile.profile == 'low'
+    profile.record_send(0.9, now=start + 3.0)
+    assert profile.profile == 'low'
+
+    profile.record_send(0.01, now=start + 4.0)
+    assert profile.profile == 'low'
+    profile.record_send(0.01, now=start + 5.0)
+    assert profile.profile == 'medium'
+
+
+def test_adaptive_profile_needs_consecutive_idle_windows():
+    profile = AdaptiveProfile(['high', 'low'], window=1.0, upgrade_windows=2)
+    start = profile.window_start
+    profile.record_send(0.9, now=start + 1.0)
+
+    profile.record_send(0.01, now=start + 2.0)
+    profile.record_send(0.3, now=start + 3.0)
+    profile.record_send(0.01, now=start + 4.0)
+    assert profile.profile == 'low'
+    profile.record_send(0.01, now=start + 5.0)
+    assert profile.profile == 'high'
+
+
+def test_cached_returns_encoded_frames_without_encoding():
+    hub = StreamHub(FakeSurveillance())
+    assert hub.cached('cam0', 0) is None
+    encoded = hub.encode('cam0', 3, make_frame(), width=80)
+
+    assert hub.cached('cam0', 3, width=80) == encoded
+    assert hub.cached('cam0', 2, width=80) == encoded  # a newer frame is fine
+    assert hub.cached('cam0', 4, width=80) is None
+    assert hub.cached('cam0', 3) is None  # other variant
+    assert hub.get_stats()['frames_encoded'] == 1
@@ -0,0 +1,100 @@
+import numpy as np
+from detector import DETECTION_DTYPE
+from tracker import ObjectTracker, greedy_match, iou_matrix
+
+
+def detections(*boxes):
+    result = np.zeros(len(boxes), dtype=DETECTION_DTYPE)
+    if boxes:
+        result['bbox'] = boxes
+    result['confidence'] = 0.9
+    return result
+
+
+def ids_by_x(tracks):
+    return {int(box[0]): int(track_id) for box, track_id in zip(tracks['bbox'], tracks['track_id'])}
+
+
+def test_iou_matrix():
+    scores = iou_matrix(np.array([[0, 0, 10, 10]]), np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]]))
+    assert np.allclose(scores, [[1.0, 1 / 3, 0.0]])
+
+
+def test_greedy_match_prefers_highest_scores():
+    scores = np.array([[0.9, 0.8], [0.85, 0.1]])
+    assert greedy_match(scores, 0.5) == [(0, 0)]
+    assert greedy_match(scores, 0.05, exclude_rows=[0]) == [(1, 0)]
+
+
+def test_ids_stay_stable_while_objects_move():
+    tracker = ObjectTracker()
+    first = ids_by_x(tracker.update(detections([0, 0, 50, 100], [300, 0, 350, 100])))
+    assert sorted(first.values()) == [1, 2]
+
+    for step in range(1, 10):
+        tracker.predict()
+        tracks = tracker.update(detections([step * 8, 0, 50 + step * 8, 100],
+                                           [300 - step * 8, 0, 350 - step * 8, 100]))
+    assert ids_by_x(tracks) == {72: first[0], 228: first[300]}
+
+
+def test_fast_mover_is_kept_by_centroid_distance():
+    tracker = ObjectTracker(iou_threshold=0.3, max_distance=0.5)
+    track_id = int(tracker.update(detections([0, 0, 40, 80]))['track_id'][0])
+    tracker.predict()
+    # No overlap with the old box, but the center is within half a diagonal
+    tracks = tracker.update(detections([42, 0, 82, 80]))
+    assert tracks['track_id'].tolist() == [track_id]
+
+
+def test_predict_moves_tracks_by_their_velocity():
+    tracker = ObjectTracker(velocity_smoothing=0.0)
+    tracker.update(detections([0, 0, 50, 100]))
+    tracker.predict()
+    tracker.update(detections([10, 0, 60, 100]))
+    assert tracker.predict()['bbox'].tolist() == [[20, 0, 70, 100]]
+
+
+def test_missed_tracks_are_hidden_then_dropped():
+    tracker = ObjectTracker(max_missed=2)
+    track_id = int(tracker.update(detections([0, 0, 50, 100]))['track_id'][0])
+    for _ in range(2):
+        assert len(tracker.update(detections())) == 0
+        assert tracker.active_ids() == {track_id}
+    tracker.update(detections())
+    assert tracker.active_ids() == set()
+
+    # A new object gets a new id
+    assert tracker.update(detections([0, 0, 50, 100]))['track_id'].tolist() == [track_id + 1]
+
+
+def test_late_detections_are_matched_in_the_past_and_predicted_forward():
+    tracker = ObjectTracker(velocity_smoothing=0.0)
+    tracker.update(detections([0, 0, 50, 100]))
+    for _ in range(4):
+        tracker.predict()
+    tracks = tracker.update(detections([40, 0, 90, 100]))  # 10 px per frame
+    track_id = int(tracks['track_id'][0])
+
+    # Five frames later a result for the frame two frames after that keyframe arrives
+    for _ in range(5):
+        tracker.predict()
+    tracks = tracker.update(detections([60, 0, 110, 100]), frames_ago=3)
+
+    assert tracks['track_id'].tolist() == [track_id]
+    # Not snapped back to where the object was 3 frames ago
+    assert tracks['bbox'].tolist() == [[90, 0, 140, 100]]
+    assert tracker.predict()['bbox'].tolist() == [[100, 0, 150, 100]]
+
+
+def test_lagging_result_still_matches_a_fast_track():
+    tracker = ObjectTracker(velocity_smoothing=0.0, iou_threshold=0.3, max_distance=0.1)
+    tracker.update(detections([0, 0, 20, 40]))
+    tracker.predict()
+    track_id = int(tracker.update(detections([5, 0, 25, 40]))['track_id'][0])
+    for _ in range(6):
+        tracker.predict()
+
+    # Taken 4 frames ago: no overlap with the current prediction, right where the track was then
+    tracks = tracker.update(detections([15, 0, 35, 40]), frames_ago=4)
+    assert tracks['track_id'].tolist() == [track_id]
@@ -0,0 +1,51 @@
+import threading
+import time
+import numpy as np
+from video_sources import LockstepSource, SyntheticSource, create_video_source
+
+
+def read_all(source):
+    frames = []
+    source.open()
+    while not source.finished:
+        ret, frame = source.read()
+        assert ret
+        frames.append(frame.copy())
+    source.release()
+    return frames
+
+
+def test_synthetic_source_is_deterministic():
+    first = read_all(SyntheticSource(width=64, height=48, seed=3, realtime=False, max_frames=5))
+    second = read_all(SyntheticSource(width=64, height=48, seed=3, realtime=False, max_frames=5))
+    assert len(first) == 5
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+
+
+def test_create_video_source_parses_synthetic_spec():
+    source = create_video_source("synthetic://?objects=2&seed=1&realtime=0&max_frames=4")
+    assert isinstance(source, SyntheticSource)
+    assert source.objects == 2 and source.max_frames == 4 and not source.realtime
+
+
+def test_lockstep_source_waits_for_consumer():
+    credits = threading.Semaphore(0)
+    source = LockstepSource("synthetic://?realtime=0&max_frames=3&width=32&height=24", credits, timeout=2)
+    assert source.open()
+    assert source.read()[0]
+
+    # The second frame is only read once the first one was released
+    threading.Timer(0.1, credits.release).start()
+    started = time.time()
+    assert source.read()[0]
+    assert time.time() - started >= 0.09
+    assert source.stalls == 0
+
+
+def test_lockstep_source_counts_stalls_instead_of_blocking():
+    source = LockstepSource("synthetic://?realtime=0&max_frames=3&width=32&height=24",
+                            threading.Semaphore(0), timeout=0.05)
+    source.open()
+    source.read()
+    assert source.read()[0]
+    assert source.stalls == 1
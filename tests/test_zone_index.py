@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from zone_index import ZoneGrid, ZoneIndex
+
+ZONES = [
+    {'name': 'left', 'coords': [[0.0, 0.0], [0.5, 0.0], [0.5, 1.0], [0.0, 1.0]]},
+    {'name': 'top', 'coords': [[0.0, 0.0], [1.0, 0.0], [1.0, 0.5], [0.0, 0.5]]},
+]
+SHAPE = (100, 200, 3)
+
+
+def test_bitmask_marks_every_zone_containing_a_point():
+    index = ZoneIndex(ZONES)
+    points = np.array([[10, 10], [10, 90], [190, 10], [190, 90]])
+    assert index.classify(points, SHAPE).tolist() == [0b11, 0b01, 0b10, 0b00]
+    assert index.membership(points, SHAPE).tolist() == [
+        [True, True], [True, False], [False, True], [False, False]]
+
+
+def test_points_outside_the_frame_are_clipped():
+    index = ZoneIndex(ZONES)
+    assert index.classify(np.array([[-50, -50], [500, 500]]), SHAPE).tolist() == [0b11, 0b00]
+
+
+def test_empty_points():
+    index = ZoneIndex(ZONES)
+    assert index.membership(np.empty((0, 2)), SHAPE).shape == (0, 2)
+
+
+def test_raster_is_rebuilt_only_on_resolution_or_zone_change():
+    index = ZoneIndex(ZONES)
+    index.classify(np.array([[1, 1]]), SHAPE)
+    index.classify(np.array([[1, 1]]), SHAPE)
+    assert index.rebuilds == 1
+
+    index.classify(np.array([[1, 1]]), (50, 100, 3))
+    assert index.rebuilds == 2
+
+    index.set_zones(ZONES[:1])
+    assert index.classify(np.array([[190, 10]]), (50, 100, 3)).tolist() == [0]
+    assert index.rebuilds == 3
+
+
+def test_dtype_grows_with_zone_count():
+    zones = [dict(ZONES[0], name=f"z{i}") for i in range(20)]
+    index = ZoneIndex(zones)
+    assert index.build(SHAPE).dtype == np.uint32
+    assert index.classify(np.array([[10, 10]]), SHAPE)[0] == (1 << 20) - 1
+
+    with pytest.raises(ValueError):
+        ZoneIndex([dict(ZONES[0], name=f"z{i}") for i in range(65)]).build(SHAPE)
+
+
+def test_zone_grid_lookup():
+    grid = ZoneGrid([['a', 'b'], ['c', 'd']])
+    assert [grid.lookup(x, y, SHAPE) for x, y in ((0, 0), (199, 0), (0, 99), (100, 50), (-5, 500))] == \
+        ['a', 'b', 'c', 'd', 'c']
@@ -0,0 +1,385 @@
+import cv2
+import os
+import time
+import numpy as np
+from urllib.parse import urlparse, parse_qs
+
+
+class VideoSource:
+    """Common interface for anything the capture loop can read frames from
+
+    Mirrors the small part of cv2.VideoCapture the surveillance code uses
+    (read with an optional output buffer, get, release), so alert recording and
+    the capture loops work the same on cameras, files and synthetic input.
+    """
+
+    # Live sources block in read() until the device delivers a frame; the
+    # others pace themselves (or run as fast as possible when benchmarking)
+    live = False
+
+    def open(self):
+        """Open the source, returns True on success"""
+        raise NotImplementedError
+
+    def read(self, out=None):
+        """Read the next frame into `out` if possible, returns (ok, frame)"""
+        raise NotImplementedError
+
+    def release(self):
+        """Release the underlying resources"""
+
+    def is_opened(self):
+        """Check if the source is open and can deliver frames"""
+        raise NotImplementedError
+
+    @property
+    def finished(self):
+        """True once a finite source has delivered its last frame"""
+        return False
+
+    def get(self, prop):
+        """Get a cv2.CAP_PROP_* value"""
+        return 0.0
+
+    def set(self, prop, value):
+        """Set a cv2.CAP_PROP_* value, returns True if applied"""
+        return False
+
+    def describe(self):
+        """Short human readable description of the source"""
+        return self.__class__.__name__
+
+
+class _PacedSource(VideoSource):
+    """Base for non-live sources that can emulate a real-time frame rate"""
+
+    def __init__(self, fps=30, realtime=True):
+        self.fps = fps
+        self.realtime = realtime
+        self._next_frame_time = None
+
+    def _pace(self):
+        """Sleep until the next frame is due when emulating real time"""
+        if not self.realtime or not self.fps:
+            return
+        interval = 1.0 / self.fps
+        now = time.time()
+        if self._next_frame_time is None:
+            self._next_frame_time = now
+        # Don't try to catch up on frames missed while the consumer stalled
+        self._next_frame_time = max(self._next_frame_time + interval, now - interval)
+        delay = self._next_frame_time - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class CameraSource(VideoSource):
+    """Live camera index or network stream (RTSP/HTTP) via cv2.VideoCapture"""
+
+    live = True
+
+    def __init__(self, source=0, backend=None, width=640, height=480, fps=30):
+        self.source = source
+        self.backend = backend
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.cap = None
+
+    def open(self):
+        if self.backend:
+            self.cap = cv2.VideoCapture(self.source, self.backend)
+        else:
+            self.cap = cv2.VideoCapture(self.source)
+
+        if not self.cap.isOpened():
+            return False
+
+        # Set camera properties
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Reduce buffer size
+        return True
+
+    def read(self, out=None):
+        if self.cap is None:
+            return False, None
+        return self.cap.read(out) if out is not None else self.cap.read()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+    def is_opened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop) if self.cap is not None else 0.0
+
+    def set(self, prop, value):
+        return self.cap.set(prop, value) if self.cap is not None else False
+
+    def describe(self):
+        return f"camera:{self.source}"
+
+
+class FileSource(_PacedSource):
+    """Video file, paced to its native frame rate or replayed at max rate"""
+
+    def __init__(self, path, realtime=True, loop=True):
+        super().__init__(fps=None, realtime=realtime)
+        self.path = path
+        self.loop = loop
+        self.cap = None
+        self._finished = False
+
+    def open(self):
+        if not os.path.isfile(self.path):
+            return False
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+        self._finished = False
+        self._next_frame_time = None
+        return True
+
+    def read(self, out=None):
+        if self.cap is None or self._finished:
+            return False, None
+
+        self._pace()
+        ret, frame = self.cap.read(out) if out is not None else self.cap.read()
+        if not ret and self.loop:
+            # Rewind and continue from the first frame
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(out) if out is not None else self.cap.read()
+        if not ret:
+            self._finished = True
+        return ret, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+
+    def is_opened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    @property
+    def finished(self):
+        return self._finished
+
+    def get(self, prop):
+        return self.cap.get(prop) if self.cap is not None else 0.0
+
+    def describe(self):
+        mode = 'realtime' if self.realtime else 'max-rate'
+        return f"file:{self.path} ({mode})"
+
+
+class SyntheticSource(_PacedSource):
+    """Deterministic generator of moving rectangles on a static background
+
+    Useful for benchmarking and regression tests on machines without a
+    camera: the same seed always produces the same frames.
+    """
+
+    def __init__(self, width=640, height=480, fps=30, objects=3, seed=0,
+                 realtime=True, max_frames=None, noise=0):
+        super().__init__(fps=fps, realtime=realtime)
+        self.width = width
+        self.height = height
+        self.objects = objects
+        self.seed = seed
+        self.max_frames = max_frames
+        self.noise = noise
+        self.frame_index = 0
+        self.opened = False
+
+    def open(self):
+        rng = np.random.default_rng(self.seed)
+        # Static textured background so background subtraction has something to learn
+        self.background = rng.integers(40, 90, (self.height, self.width, 3), dtype=np.uint8)
+        self.positions = rng.uniform([0, 0], [self.width, self.height], (self.objects, 2))
+        self.velocities = rng.uniform(-6, 6, (self.objects, 2))
+        self.sizes = rng.integers([30, 60], [80, 160], (self.objects, 2))
+        self.colors = rng.integers(120, 255, (self.objects, 3))
+        self.noise_rng = np.random.default_rng(self.seed + 1)
+        self.frame_index = 0
+        self.last_boxes = []
+        self._next_frame_time = None
+        self.opened = True
+        return True
+
+    def object_boxes(self):
+        """Ground-truth (x1, y1, x2, y2) boxes of the objects in the last frame"""
+        return self.last_boxes
+
+    def _current_boxes(self):
+        """Boxes of the objects at their current positions"""
+        boxes = []
+        for (x, y), (w, h) in zip(self.positions, self.sizes):
+            x1, y1 = int(x) - w // 2, int(y) - h // 2
+            boxes.append((max(0, x1), max(0, y1),
+                          min(self.width, x1 + w), min(self.height, y1 + h)))
+        return boxes
+
+    def _advance(self):
+        """Move the objects, bouncing them off the frame edges"""
+        self.positions += self.velocities
+        for axis, limit in ((0, self.width), (1, self.height)):
+            out_of_range = (self.positions[:, axis] < 0) | (self.positions[:, axis] > limit)
+            self.velocities[out_of_range, axis] *= -1
+            np.clip(self.positions[:, axis], 0, limit, out=self.positions[:, axis])
+
+    def read(self, out=None):
+        if not self.opened or self.finished:
+            return False, None
+
+        self._pace()
+        frame = out if out is not None and out.shape == self.background.shape else np.empty_like(self.background)
+        np.copyto(frame, self.background)
+        self.last_boxes = self._current_boxes()
+        for (x1, y1, x2, y2), color in zip(self.last_boxes, self.colors):
+            cv2.rectangle(frame, (x1, y1), (x2, y2), tuple(int(c) for c in color), -1)
+        if self.noise:
+            noise = self.noise_rng.integers(-self.noise, self.noise + 1, frame.shape, dtype=np.int16)
+            np.clip(frame.astype(np.int16) + noise, 0, 255, out=noise)
+            frame[...] = noise
+
+        self._advance()
+        self.frame_index += 1
+        return True, frame
+
+    def release(self):
+        self.opened = False
+
+    def is_opened(self):
+        return self.opened
+
+    @property
+    def finished(self):
+        return self.max_frames is not None and self.frame_index >= self.max_frames
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.frame_index)
+        return 0.0
+
+    def describe(self):
+        mode = 'realtime' if self.realtime else 'max-rate'
+        return f"synthetic:{self.objects} objects {self.width}x{self.height} ({mode})"
+
+
+class LockstepSource(VideoSource):
+    """Wrap a source so each frame is only read once the previous one was consumed
+
+    Benchmarks use this to push every frame through the pipeline instead of
+    letting detection skip to the newest one: each read after a delivered
+    frame waits until `credits` (a threading or multiprocessing semaphore) is
+    released by whoever consumed that frame. After `timeout` seconds without a
+    credit the read goes ahead anyway and is counted in `stalls`, so a lost
+    frame cannot deadlock the pipeline.
+    """
+
+    def __init__(self, source, credits, timeout=5.0):
+        self.source = source
+        self.credits = credits
+        self.timeout = timeout
+        self.inner = None
+        self.waiting = False
+        self.stalls = 0
+
+    def open(self):
+        self.inner = create_video_source(self.source)
+        self.waiting = False
+        return self.inner.open()
+
+    def read(self, out=None):
+        if self.inner is None:
+            return False, None
+        if self.waiting and not self.credits.acquire(timeout=self.timeout):
+            self.stalls += 1
+        ret, frame = self.inner.read(out)
+        self.waiting = ret
+        return ret, frame
+
+    def release(self):
+        if self.inner is not None:
+            self.inner.release()
+
+    def is_opened(self):
+        return self.inner is not None and self.inner.is_opened()
+
+    @property
+    def finished(self):
+        return self.inner is not None and self.inner.finished
+
+    def get(self, prop):
+        return self.inner.get(prop) if self.inner is not None else 0.0
+
+    def set(self, prop, value):
+        return self.inner.set(prop, value) if self.inner is not None else False
+
+    def describe(self):
+        inner = self.inner.describe() if self.inner is not None else str(self.source)
+        return f"{inner} (lockstep)"
+
+
+def _query_options(query):
+    """Parse '?a=1&b=x' into a dict with numeric values converted"""
+    options = {}
+    for key, values in parse_qs(query).items():
+        value = values[-1]
+        try:
+            options[key] = int(value)
+        except ValueError:
+            try:
+                options[key] = float(value)
+            except ValueError:
+                options[key] = value
+    return options
+
+
+def create_video_source(spec, backend=None, **options):
+    """Build a VideoSource from a camera config value
+
+    Accepted specs:
+      - a VideoSource instance (returned as is)
+      - a camera index, e.g. 0 or "0"
+      - "synthetic://?objects=3&seed=1&fps=30&realtime=0&max_frames=300"
+      - "replay://path/to/video.mp4" to replay a file as fast as possible
+      - a path to an existing video file (paced to real time, looping)
+      - anything else is handed to cv2.VideoCapture (RTSP/HTTP URLs)
+    """
+    if isinstance(spec, VideoSource):
+        return spec
+
+    if isinstance(spec, str) and spec.isdigit():
+        spec = int(spec)
+
+    if isinstance(spec, int):
+        return CameraSource(spec, backend, **options)
+
+    parsed = urlparse(spec)
+    if parsed.scheme == 'synthetic':
+        query_options = _query_options(parsed.query)
+        if 'realtime' in query_options:
+            query_options['realtime'] = bool(query_options['realtime'])
+        return SyntheticSource(**{**options, **query_options})
+
+    if parsed.scheme == 'replay':
+        path = spec[len('replay://'):]
+        return FileSource(path, realtime=False, loop=options.get('loop', False))
+
+    if os.path.isfile(spec):
+        return FileSource(spec, realtime=options.get('realtime', True), loop=options.get('loop', True))
+
+    return CameraSource(spec, backend, **options)
@@ -0,0 +1,106 @@
+import cv2
+import numpy as np
+
+
+class ZoneIndex:
+    """Per-pixel zone bitmask for classifying many points at once
+
+    Bit i of raster[y, x] is set when pixel (x, y) lies inside zone i, so
+    overlapping zones are supported. The raster is built once per
+    (resolution, zone config) and rebuilt automatically when either changes.
+    Zones are dicts with a 'name' and normalized polygon 'coords'.
+    """
+
+    MAX_ZONES = 64
+
+    def __init__(self, zones):
+        self.zones = zones
+        self.raster = None
+        self.key = None
+        self.rebuilds = 0
+
+    @staticmethod
+    def _zones_key(zones):
+        return tuple((zone['name'], tuple(tuple(point) for point in zone['coords'])) for zone in zones)
+
+    def _bitmask_dtype(self):
+        for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+            if len(self.zones) <= np.iinfo(dtype).bits:
+                return dtype
+        raise ValueError(f"ZoneIndex supports at most {self.MAX_ZONES} zones")
+
+    def set_zones(self, zones):
+        """Replace the zone config (the raster is rebuilt on next use)"""
+        self.zones = zones
+
+    def build(self, frame_shape):
+        """Rasterize the zones for a frame resolution if needed"""
+        h, w = frame_shape[:2]
+        key = ((h, w), self._zones_key(self.zones))
+        if key == self.key:
+            return self.raster
+
+        dtype = self._bitmask_dtype()
+        raster = np.zeros((h, w), dtype=dtype)
+        zone_mask = np.zeros((h, w), dtype=np.uint8)
+        for bit, zone in enumerate(self.zones):
+            zone_mask[:] = 0
+            # Same pixel mapping as the zone outlines in draw_detections
+            polygon = (np.array(zone['coords'], dtype=np.float64) * [w, h]).astype(np.int32)
+            cv2.fillPoly(zone_mask, [polygon], 1)
+            raster[zone_mask.view(bool)] |= dtype(1 << bit)
+
+        self.raster = raster
+        self.key = key
+        self.rebuilds += 1
+        return raster
+
+    def classify(self, points, frame_shape):
+        """Get the zone bitmask of each (x, y) point in an (N, 2) array"""
+        raster = self.build(frame_shape)
+        points = np.asarray(points)
+        if len(points) == 0:
+            return np.zeros(0, dtype=raster.dtype)
+        h, w = raster.shape
+        xs = np.clip(points[:, 0], 0, w - 1).astype(np.intp)
+        ys = np.clip(points[:, 1], 0, h - 1).astype(np.intp)
+        return raster[ys, xs]
+
+    def membership(self, points, frame_shape):
+        """Get an (N, zones) boolean matrix of which zones contain each point"""
+        bits = self.classify(points, frame_shape).astype(np.uint64)
+        shifts = np.arange(len(self.zones), dtype=np.uint64)
+        return ((bits[:, None] >> shifts) & np.uint64(1)).astype(bool)
+
+
+class ZoneGrid:
+    """Fixed grid of named regions with per-resolution lookup tables
+
+    `names[row][col]` names each cell; column and row boundaries fall at
+    `i * w // cols` and `i * h // rows`. The pixel-to-cell tables are cached
+    per resolution, so a lookup is two array indexes.
+    """
+
+    def __init__(self, names):
+        self.names = names
+        self.rows = len(names)
+        self.cols = len(names[0])
+        self.tables = {}
+
+    def _tables(self, frame_shape):
+        h, w = frame_shape[:2]
+        tables = self.tables.get((h, w))
+        if tables is None:
+            col_edges = [i * w // self.cols for i in range(1, self.cols)]
+            row_edges = [i * h // self.rows for i in range(1, self.rows)]
+            tables = (np.searchsorted(col_edges, np.arange(w), side='right'),
+                      np.searchsorted(row_edges, np.arange(h), side='right'))
+            self.tables[(h, w)] = tables
+        return tables
+
+    def lookup(self, x, y, frame_shape):
+        """Get the name of the cell containing a point"""
+        col_of_x, row_of_y = self._tables(frame_shape)
+        col = col_of_x[min(max(int(x), 0), len(col_of_x) - 1)]
+        row = row_of_y[min(max(int(y), 0), len(row_of_y) - 1)]
+        return self.names[row][col]